@@ -0,0 +1,94 @@
+"""Chart-sized aggregations pushed into SQL.
+
+A chart with one bar per city or per food item stops being readable, and
+gets expensive to send, long before the tables stop growing. These helpers
+wrap a query so that SQLite returns only what the chart draws:
+
+- top_n_query(): the n largest rows plus one "Other" row for the rest,
+- binned_query(): equal-width bins of a numeric column, as many as fit in
+  max_bins (one per value when the range is small).
+
+Both take the wrapped query's SQL and params and return (sql, params).
+top_n_frame() does what top_n_query() does to a result already in memory.
+"""
+import pandas as pd
+
+# SQL aggregates top_n_frame() can apply, as pandas aggregations
+PANDAS_AGGREGATES = {'SUM': 'sum', 'AVG': 'mean', 'MIN': 'min', 'MAX': 'max', 'COUNT': 'count'}
+
+
+def _base(sql):
+    return sql.strip().rstrip(';')
+
+
+def top_n_query(sql, params=(), label=None, measures=None, n=10, order_by=None, other='Other'):
+    """The n rows of sql with the largest order_by, plus a row labelled other aggregating the rest.
+
+    measures maps each value column to the aggregate that combines it for
+    the other row (SUM, MAX, ...); order_by defaults to the first measure.
+    With other=None the rest is dropped. Rows come back in rank order, the
+    other row last.
+    """
+    order_by = order_by or next(iter(measures))
+    columns = ', '.join([label] + list(measures))
+    query = f"""
+    WITH base AS ({_base(sql)}),
+    ranked AS (
+        SELECT {columns}, ROW_NUMBER() OVER (ORDER BY {order_by} DESC, {label}) AS Chart_Rank
+        FROM base
+    )
+    SELECT {columns} FROM (
+        SELECT {columns}, Chart_Rank FROM ranked WHERE Chart_Rank <= ?"""
+    params = list(params) + [int(n)]
+    if other is not None:
+        aggregates = ', '.join(f"{aggregate}({column}) AS {column}" for column, aggregate in measures.items())
+        query += f"""
+        UNION ALL
+        SELECT ? AS {label}, {aggregates}, ? + 1 FROM ranked WHERE Chart_Rank > ? HAVING COUNT(*) > 0"""
+        params += [other, int(n), int(n)]
+    query += """
+    )
+    ORDER BY Chart_Rank"""
+    return query, params
+
+
+def binned_query(sql, params=(), column=None, measures=(), max_bins=20):
+    """Rows of sql counted in at most max_bins equal-width integer bins of column.
+
+    Values are floored to integers first. Returns Bin (a label such as
+    "3" or "4-7"), Bin_Start, Bin_End, Rows and the SUM of each measure,
+    in bin order.
+    """
+    carried = ''.join(f", {measure}" for measure in measures)
+    sums = ''.join(f", SUM({measure}) AS {measure}" for measure in measures)
+    query = f"""
+    WITH base AS ({_base(sql)}),
+    value AS (
+        SELECT CAST({column} AS INTEGER) - ({column} < CAST({column} AS INTEGER)) AS Value{carried}
+        FROM base WHERE {column} IS NOT NULL
+    ),
+    bounds AS (SELECT MIN(Value) AS Low, (MAX(Value) - MIN(Value)) / ? + 1 AS Width FROM value),
+    binned AS (
+        SELECT Low + ((Value - Low) / Width) * Width AS Bin_Start, Width{carried}
+        FROM value, bounds
+    )
+    SELECT CASE WHEN Width = 1 THEN CAST(Bin_Start AS TEXT) ELSE Bin_Start || '-' || (Bin_Start + Width - 1) END AS Bin,
+           Bin_Start, Bin_Start + Width - 1 AS Bin_End, COUNT(*) AS Rows{sums}
+    FROM binned
+    GROUP BY Bin_Start
+    ORDER BY Bin_Start"""
+    return query, list(params) + [int(max_bins)]
+
+
+def top_n_frame(df, label=None, measures=None, n=10, order_by=None, other='Other'):
+    """top_n_query() applied to the DataFrame df instead of a query"""
+    order_by = order_by or next(iter(measures))
+    columns = [label] + list(measures)
+    ranked = df[columns].sort_values([order_by, label], ascending=[False, True], na_position='first', kind='stable')
+    top, rest = ranked.iloc[:int(n)], ranked.iloc[int(n):]
+    if other is None or rest.empty:
+        return top.reset_index(drop=True)
+    other_row = {label: other}
+    other_row.update({column: rest[column].agg(PANDAS_AGGREGATES[aggregate.upper()])
+                      for column, aggregate in measures.items()})
+    return pd.concat([top, pd.DataFrame([other_row])], ignore_index=True)
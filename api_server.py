@@ -0,0 +1,456 @@
+"""Headless JSON API for partner systems, served next to the Streamlit UI.
+
+An asyncio HTTP/1.1 server (standard library only, keep-alive) that hands
+every request's blocking work - SQLite reads through a ConnectionPool,
+writes through the DatabaseWriter and crud.py - to a thread pool.
+
+Endpoints (TABLE is providers, receivers, food_listings or claims):
+
+    GET    /health
+    GET    /queries                        the 15 analytics queries
+    GET    /queries/N?limit=&offset=       rows of query N
+    GET    /near-expiry?days=&city=&food_type=&limit=
+    GET    /search?q=&limit=               full-text matches per table (search.py)
+    GET    /changes?since=&limit=          change feed (changes.py): current rows and
+                                           deleted keys changed after cursor `since`;
+                                           "reset" means reload from the new cursor
+    GET    /TABLE?after_id=&limit=         keyset pages (food_listings also
+                                           filters on Location, Food_Type, Meal_Type)
+    GET    /TABLE/ID
+    POST   /TABLE                          insert one row (JSON object)
+    POST   /TABLE/batch                    insert {"rows": [...]} (not claims)
+    POST   /claims                         {"Food_ID", "Receiver_ID", "Quantity"}:
+                                           reserves the quantity (claims.py)
+    PATCH  /TABLE/ID                       Contact, Quantity or Status
+    DELETE /TABLE/ID
+
+GET responses carry an ETag built from the stored data version, which
+triggers bump on every committed write, so If-None-Match returns 304
+without touching the query. JSON bodies of 1 KB or more are gzipped when
+the client accepts it.
+
+Inserted rows are cleaned like CSV rows (ingest.clean_row): a malformed
+row or a negative Quantity is a 400, and a row naming a provider, listing
+or receiver that doesn't exist is a 422. POST /TABLE/batch reports these
+per row, inserts the rest, and is a 422 only when no row went in.
+
+    python api_server.py [--host 127.0.0.1] [--port 8000] [--db food_management.db]
+"""
+import argparse
+import asyncio
+import functools
+import gzip
+import json
+import logging
+import re
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import crud
+from changes import CHANGE_KEYS, MAX_CHANGES, changes_since, keys_query
+from claims import CLAIM_STATUSES, ClaimError
+from database import DB_PATH, ConnectionPool, DatabaseWriter, connect
+from expiry import near_expiry_query
+from ingest import RejectedRow, clean_row
+from instrumentation import statement_name, timed
+from listings import FACET_COLUMNS, listings_page_query
+from migrations import TABLE_COLUMNS, migrate
+from queries import queries, query_descriptions
+from query_cache import stored_data_version
+from search import SEARCH_TABLES, match_expression, search_query
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+GZIP_MIN_BYTES = 1024
+
+# table -> (batch insert, batch update and the column it sets, batch delete)
+RESOURCES = {
+    'providers': (crud.insert_providers_many, crud.update_provider_contacts_many, 'Contact', crud.delete_providers_many),
+    'receivers': (crud.insert_receivers_many, crud.update_receiver_contacts_many, 'Contact', crud.delete_receivers_many),
+    'food_listings': (crud.insert_food_listings_many, crud.update_food_quantities_many, 'Quantity', crud.delete_food_listings_many),
+    'claims': (None, crud.update_claim_status_many, 'Status', crud.delete_claims_many),
+}
+TABLES = '|'.join(RESOURCES)
+
+Request = namedtuple('Request', 'method path query headers body')
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def int_param(query, name, default=None, minimum=None, maximum=None):
+    value = query.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise HttpError(400, f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise HttpError(400, f"{name} must be at least {minimum}")
+    return min(value, maximum) if maximum is not None else value
+
+
+def json_body(request):
+    try:
+        return json.loads(request.body or b'null')
+    except ValueError:
+        raise HttpError(400, "request body is not valid JSON")
+
+
+def outcome_status(outcome, created=False):
+    """HTTP status for one crud *_many outcome"""
+    if outcome['ok']:
+        return 201 if created else 200
+    if outcome['message'].startswith('unknown '):
+        # The row refers to a provider, listing or receiver that doesn't exist
+        return 422
+    return 404 if 'not found' in outcome['message'] else 409
+
+
+class ApiServer:
+    def __init__(self, db_path=DB_PATH, workers=8):
+        conn = connect(db_path)
+        migrate(conn)
+        conn.close()
+        self.pool = ConnectionPool(db_path, max_size=workers)
+        self.writer = DatabaseWriter(db_path)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+        self.routes = [
+            ('GET', r'/health', self.health),
+            ('GET', r'/queries', self.list_queries),
+            ('GET', r'/queries/(\d+)', self.run_query),
+            ('GET', r'/near-expiry', self.near_expiry),
+            ('GET', r'/search', self.search),
+            ('GET', r'/changes', self.changes),
+            ('GET', rf'/({TABLES})', self.list_rows),
+            ('GET', rf'/({TABLES})/(\d+)', self.get_row),
+            ('POST', rf'/({TABLES})', self.insert_row),
+            ('POST', rf'/({TABLES})/batch', self.insert_rows),
+            ('PATCH', rf'/({TABLES})/(\d+)', self.update_row),
+            ('DELETE', rf'/({TABLES})/(\d+)', self.delete_row),
+        ]
+        self.routes = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in self.routes]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.writer.close()
+        self.pool.close()
+
+    # Database access (runs on the thread pool)
+    def fetch(self, sql, params=()):
+        with self.pool.connection() as conn, timed('sql', statement_name(sql), sql) as result:
+            cursor = conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            result['rows'] = len(rows)
+        return rows
+
+    def data_version(self):
+        with self.pool.connection() as conn:
+            return stored_data_version(conn)
+
+    # Handlers: return (status, payload); GET handlers are only called on an ETag miss
+    def health(self, request):
+        return 200, {'status': 'ok', 'data_version': self.data_version()}
+
+    def list_queries(self, request):
+        return 200, {'queries': [{'id': i + 1, 'description': d} for i, d in enumerate(query_descriptions)]}
+
+    def run_query(self, request, number):
+        number = int(number)
+        if not 1 <= number <= len(queries):
+            raise HttpError(404, f"no query {number}; there are {len(queries)}")
+        limit = int_param(request.query, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        offset = int_param(request.query, 'offset', 0, 0)
+        sql = queries[number - 1].strip().rstrip(';')
+        # One extra row tells whether there is a next page
+        rows = self.fetch(f"SELECT * FROM ({sql}) LIMIT ? OFFSET ?", (limit + 1, offset))
+        return 200, {
+            'query': number, 'description': query_descriptions[number - 1],
+            'rows': rows[:limit], 'limit': limit, 'offset': offset,
+            'next_offset': offset + limit if len(rows) > limit else None,
+        }
+
+    def near_expiry(self, request):
+        days = int_param(request.query, 'days', 7, 0, 365)
+        limit = int_param(request.query, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        sql, params = near_expiry_query(days=days, city=request.query.get('city'),
+                                        food_type=request.query.get('food_type'), limit=limit)
+        return 200, {'days': days, 'rows': self.fetch(sql, params)}
+
+    def search(self, request):
+        text = request.query.get('q', '')
+        limit = int_param(request.query, 'limit', 20, 1, MAX_LIMIT)
+        if match_expression(text) is None:
+            raise HttpError(400, "q must contain a word of at least two letters or digits")
+        results = {table: self.fetch(*search_query(table, text, limit)) for table in SEARCH_TABLES}
+        return 200, {'q': text, 'limit': limit, **results}
+
+    def changes(self, request):
+        since = int_param(request.query, 'since', minimum=0)
+        limit = int_param(request.query, 'limit', MAX_CHANGES, 1, MAX_CHANGES)
+        with self.pool.connection() as conn:
+            feed = changes_since(conn, since, limit)
+        changed = {}
+        for table, keys in feed.changed.items():
+            key = CHANGE_KEYS[table]
+            rows = self.fetch(keys_query(f"SELECT * FROM {table}", key), [json.dumps(sorted(keys))])
+            changed[table] = {'rows': rows, 'deleted': sorted(keys - {row[key] for row in rows})}
+        return 200, {'cursor': feed.cursor, 'reset': feed.reset, 'changes': changed}
+
+    def list_rows(self, request, table):
+        key = TABLE_COLUMNS[table][0]
+        limit = int_param(request.query, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        after_id = int_param(request.query, 'after_id')
+        if table == 'food_listings':
+            filters = {column: request.query.get(column) for column in FACET_COLUMNS}
+            sql, params = listings_page_query(filters, after_id, limit + 1)
+        else:
+            where = f"WHERE {key} > ?" if after_id is not None else ""
+            sql = f"SELECT * FROM {table} {where} ORDER BY {key} LIMIT ?"
+            params = ([after_id] if after_id is not None else []) + [limit + 1]
+        rows = self.fetch(sql, params)
+        return 200, {
+            'rows': rows[:limit], 'limit': limit,
+            'next_after_id': rows[limit - 1][key] if len(rows) > limit else None,
+        }
+
+    def get_row(self, request, table, row_id):
+        key = TABLE_COLUMNS[table][0]
+        rows = self.fetch(f"SELECT * FROM {table} WHERE {key} = ?", (int(row_id),))
+        if not rows:
+            raise HttpError(404, f"{key} {row_id} not found")
+        return 200, rows[0]
+
+    def _clean(self, table, item):
+        if not isinstance(item, dict):
+            raise HttpError(400, "each row must be a JSON object")
+        columns = TABLE_COLUMNS[table]
+        missing = [column for column in columns if item.get(column) is None]
+        if missing:
+            raise HttpError(400, f"missing fields: {', '.join(missing)}")
+        try:
+            return clean_row({column: str(item[column]) for column in columns}, columns)
+        except RejectedRow as e:
+            raise HttpError(400, str(e))
+
+    def insert_row(self, request, table):
+        body = json_body(request)
+        if table == 'claims':
+            return self.claim(body)
+        outcome = RESOURCES[table][0](self.writer, [self._clean(table, body)])[0]
+        return outcome_status(outcome, created=True), outcome
+
+    def claim(self, body):
+        if not isinstance(body, dict) or body.get('Food_ID') is None or body.get('Receiver_ID') is None:
+            raise HttpError(400, "a claim needs Food_ID and Receiver_ID")
+        try:
+            food_id, receiver_id = int(body['Food_ID']), int(body['Receiver_ID'])
+            quantity = int(body.get('Quantity', 1))
+            claim_id = int(body['Claim_ID']) if body.get('Claim_ID') is not None else None
+        except (TypeError, ValueError):
+            raise HttpError(400, "Food_ID, Receiver_ID, Quantity and Claim_ID must be integers")
+        if quantity < 1:
+            raise HttpError(400, "Quantity must be at least 1")
+        try:
+            message = crud.claim_food(self.writer, food_id, receiver_id, quantity, claim_id, body.get('Timestamp'))
+        except ClaimError as e:
+            if 'not found' in str(e):
+                # The listing or receiver the claim refers to, not the claim itself
+                raise HttpError(422, str(e))
+            raise
+        return 201, {'ok': True, 'message': message}
+
+    def insert_rows(self, request, table):
+        insert_many = RESOURCES[table][0]
+        if insert_many is None:
+            raise HttpError(405, "claims are made one at a time with POST /claims")
+        body = json_body(request)
+        if not isinstance(body, dict) or not isinstance(body.get('rows'), list):
+            raise HttpError(400, 'expected {"rows": [...]}')
+        # Rows that don't clean are reported in place; the rest go to the database
+        outcomes, rows = [], []
+        for item in body['rows']:
+            try:
+                rows.append((len(outcomes), self._clean(table, item)))
+                outcomes.append(None)
+            except HttpError as e:
+                row_id = item.get(TABLE_COLUMNS[table][0]) if isinstance(item, dict) else None
+                outcomes.append({'id': row_id, 'ok': False, 'message': str(e)})
+        for (index, _), outcome in zip(rows, insert_many(self.writer, [row for _, row in rows])):
+            outcomes[index] = outcome
+        inserted = sum(1 for o in outcomes if o['ok'])
+        # Partial batches succeed; one where no row could be inserted doesn't
+        status = 200 if inserted or not outcomes else 422
+        return status, {'outcomes': outcomes, 'inserted': inserted}
+
+    def update_row(self, request, table, row_id):
+        _, update_many, column, _ = RESOURCES[table]
+        body = json_body(request)
+        if not isinstance(body, dict) or column not in body:
+            raise HttpError(400, f"{table} rows can only be updated through {column}")
+        value = body[column]
+        if column == 'Quantity':
+            if not isinstance(value, int) or value < 0:
+                raise HttpError(400, "Quantity must be a non-negative integer")
+        elif column == 'Status':
+            if value not in CLAIM_STATUSES:
+                raise HttpError(400, f"Status must be one of {', '.join(CLAIM_STATUSES)}")
+        else:
+            value = str(value)
+        outcome = update_many(self.writer, [(int(row_id), value)])[0]
+        return outcome_status(outcome), outcome
+
+    def delete_row(self, request, table, row_id):
+        outcome = RESOURCES[table][3](self.writer, [int(row_id)])[0]
+        return outcome_status(outcome), outcome
+
+    # HTTP plumbing
+    def match(self, method, path):
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            found = pattern.match(path)
+            if found:
+                if route_method == method:
+                    return handler, found.groups(), pattern.pattern
+                allowed = True
+        raise HttpError(405 if allowed else 404, f"{'method not allowed' if allowed else 'no such endpoint'}: {method} {path}")
+
+    def respond(self, request):
+        """Run the request to completion and return the raw HTTP response (blocking)"""
+        etag = None
+        try:
+            handler, args, route = self.match(request.method, request.path)
+            with timed('http', f"{request.method} {route}"):
+                if request.method == 'GET':
+                    # Read the version first: if a write lands during the query, the
+                    # response carries the older tag and the next request refetches
+                    etag = f'W/"{self.data_version()}"'
+                    if etag in request.headers.get('if-none-match', ''):
+                        return self.encode(request, 304, None, etag)
+                status, payload = handler(request, *args)
+        except HttpError as e:
+            status, payload = e.status, {'error': str(e)}
+        except ClaimError as e:
+            status, payload = (404 if 'not found' in str(e) else 409), {'error': str(e)}
+        except sqlite3.IntegrityError as e:
+            status, payload = 409, {'error': str(e)}
+        except Exception:
+            logger.exception("Unhandled error in %s %s", request.method, request.path)
+            status, payload = 500, {'error': "internal server error"}
+        return self.encode(request, status, payload, etag if status == 200 else None)
+
+    def encode(self, request, status, payload, etag=None):
+        body = b'' if payload is None else json.dumps(payload, default=str, separators=(',', ':')).encode()
+        headers = {'Content-Type': 'application/json', 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        if etag:
+            headers['ETag'] = etag
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in request.headers.get('accept-encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(body))
+        if request.headers.get('connection', '').lower() == 'close':
+            headers['Connection'] = 'close'
+        head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        head += ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+        return head.encode('latin-1') + b'\r\n' + body
+
+    async def read_request(self, reader):
+        """Parse one request from the stream; None when the client has closed it"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(431, "request headers too large")
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HttpError(400, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            raise HttpError(411, "send a Content-Length instead of a chunked body")
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HttpError(400, "Content-Length must be a number")
+        if length < 0:
+            raise HttpError(400, "Content-Length can't be negative")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b''
+        url = urlsplit(target)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        return Request(method.upper(), url.path.rstrip('/') or '/', query, headers, body)
+
+    async def handle_connection(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HttpError as e:
+                    bad = Request('GET', '', {}, {'connection': 'close'}, b'')
+                    writer.write(self.encode(bad, e.status, {'error': str(e)}))
+                    break
+                if request is None:
+                    break
+                response = await loop.run_in_executor(self.executor, self.respond, request)
+                writer.write(response)
+                await writer.drain()
+                if request.headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def start_server(api, host='127.0.0.1', port=8000):
+    return await asyncio.start_server(api.handle_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+async def serve(api, host, port):
+    server = await start_server(api, host, port)
+    print(f"✅ Serving the JSON API on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the food management data as a JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--workers', type=int, default=8, help="threads (and reader connections) for database work")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    api = ApiServer(args.db, workers=args.workers)
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+
+
+if __name__ == '__main__':
+    main()
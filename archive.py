@@ -0,0 +1,156 @@
+"""Hot/cold retention: move old listings and their claims into the archive database.
+
+Expired listings and closed claims otherwise stay in food_listings and
+claims forever, and every dashboard query, Food Listings scan and join reads
+past them. archive_expired() moves a listing, together with its claims, into
+the archive database next to the main one (database.archive_path()) once
+
+- it expired more than `days` days ago,
+- all of its claims are Completed or Cancelled, and made before that cutoff,
+- it isn't the newest listing and has none of the newest claim, so IDs
+  assigned as MAX + 1 never collide with archived ones.
+
+Rows move in batches, each in its own short transaction, so the app's
+writers wait at most one batch. The claim rollups and leaderboards keep
+counting archived rows (migration 12), and the all_* views (database.py)
+read the hot and archived rows together for the history queries (see
+queries.py). The food on offer now - Queries 5, 6, 7 and 14, dashboard
+stats, search, the listing and claim pages - covers the hot rows only. Archived rows are history: they aren't updated,
+and their IDs aren't reused - the TEMP triggers database.history_views()
+puts on read-write connections refuse a new listing or claim with an
+archived Food_ID or Claim_ID, and a claim on an archived listing.
+
+    python archive.py [db_path] [--days 30] [--batch-size 500]
+"""
+import argparse
+import re
+import time
+
+from database import ARCHIVE_SCHEMA, ARCHIVED_TABLES, DB_PATH, attach_archive, connect, history_views
+from migrations import migrate
+
+
+ARCHIVE_DAYS = 30
+BATCH_SIZE = 500
+
+# Listings ready to move, oldest expiry first; ? is the cutoff date
+CANDIDATES_SQL = """
+    SELECT fl.Food_ID
+    FROM food_listings fl
+    WHERE fl.Expiry_Day < CAST(julianday(?1) - 2440587.5 AS INTEGER)
+      AND fl.Food_ID < (SELECT MAX(Food_ID) FROM food_listings)
+      AND NOT EXISTS (
+          SELECT 1 FROM claims c
+          WHERE c.Food_ID = fl.Food_ID
+            AND (c.Status NOT IN ('Completed', 'Cancelled') OR c.Timestamp >= ?1
+                 OR c.Claim_ID = (SELECT MAX(Claim_ID) FROM claims))
+      )
+    ORDER BY fl.Expiry_Day
+    LIMIT ?2
+"""
+
+
+def _ensure_archive_tables(conn):
+    """Create the archived tables (and their indexes) like the main ones, adding any newer columns"""
+    for table in ARCHIVED_TABLES:
+        exists = conn.execute(f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone()
+        if not exists:
+            schema = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                                  (table,)).fetchone()[0]
+            conn.execute(re.sub(r'^CREATE TABLE\s+("?\w+"?)', f'CREATE TABLE {ARCHIVE_SCHEMA}.\\1', schema))
+        else:
+            archived = {row[1] for row in conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.table_xinfo({table})")}
+            for _, column, column_type, _, _, _, hidden in conn.execute(f"PRAGMA main.table_xinfo({table})"):
+                if column not in archived and hidden == 0:
+                    conn.execute(f'ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN "{column}" {column_type}')
+        # The same indexes serve the same joins over the archived rows
+        for (index,) in conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                                     "AND sql IS NOT NULL", (table,)).fetchall():
+            conn.execute(re.sub(r'^CREATE (UNIQUE )?INDEX\s+', f'CREATE \\1INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.', index))
+
+
+def _size(conn, schema):
+    """Bytes in use by schema's database: its pages minus the free ones"""
+    page_size = conn.execute(f"PRAGMA {schema}.page_size").fetchone()[0]
+    page_count = conn.execute(f"PRAGMA {schema}.page_count").fetchone()[0]
+    free_pages = conn.execute(f"PRAGMA {schema}.freelist_count").fetchone()[0]
+    return (page_count - free_pages) * page_size
+
+
+def archive_expired(conn, days=ARCHIVE_DAYS, batch_size=BATCH_SIZE, cutoff=None):
+    """Move listings past the retention age, and their claims, into the archive database.
+
+    conn must be a read-write connection with isolation_level=None to a
+    migrated database; the archive is created on first use. cutoff ('YYYY-MM-DD') defaults to
+    `days` days before today. Returns a report: rows moved per table,
+    batches, bytes moved (what the rows and their indexes take up in the
+    archive), bytes freed (main database pages left empty, which new rows
+    reuse and VACUUM returns to the file system), seconds taken and the cutoff.
+    """
+    attach_archive(conn, create=True)
+    _ensure_archive_tables(conn)
+    history_views(conn)
+    if cutoff is None:
+        cutoff = conn.execute("SELECT date('now', ?)", (f'-{int(days)} days',)).fetchone()[0]
+    columns = {table: ', '.join(f'"{row[1]}"' for row in conn.execute(f"PRAGMA main.table_xinfo({table})")
+                                if row[6] == 0)
+               for table in ARCHIVED_TABLES}
+
+    report = dict.fromkeys(ARCHIVED_TABLES, 0)
+    report['batches'] = 0
+    main_before, archive_before = _size(conn, 'main'), _size(conn, ARCHIVE_SCHEMA)
+    start = time.perf_counter()
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            food_ids = [row[0] for row in conn.execute(CANDIDATES_SQL, (cutoff, int(batch_size)))]
+            if not food_ids:
+                conn.execute("COMMIT")
+                break
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (Food_ID INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.archive_batch")
+            conn.executemany("INSERT INTO temp.archive_batch (Food_ID) VALUES (?)", [(i,) for i in food_ids])
+            # The guard row keeps the claim history triggers from counting the deletes
+            conn.execute("INSERT INTO archiving (Id) VALUES (1)")
+            for table in ('claims', 'food_listings'):
+                conn.execute(f"""
+                    INSERT INTO {ARCHIVE_SCHEMA}.{table} ({columns[table]})
+                    SELECT {columns[table]} FROM main.{table} WHERE Food_ID IN (SELECT Food_ID FROM temp.archive_batch)
+                """)
+                report[table] += conn.execute(
+                    f"DELETE FROM main.{table} WHERE Food_ID IN (SELECT Food_ID FROM temp.archive_batch)").rowcount
+            conn.execute("DELETE FROM archiving")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        report['batches'] += 1
+
+    report['bytes_freed'] = main_before - _size(conn, 'main')
+    report['bytes_moved'] = _size(conn, ARCHIVE_SCHEMA) - archive_before
+    report['seconds'] = time.perf_counter() - start
+    report['cutoff'] = cutoff
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move old expired listings and their closed claims to the archive")
+    parser.add_argument('db_path', nargs='?', default=DB_PATH)
+    parser.add_argument('--days', type=int, default=ARCHIVE_DAYS, help="archive listings expired this many days ago")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="listings moved per transaction")
+    args = parser.parse_args()
+
+    connection = connect(args.db_path, isolation_level=None)
+    # Without migration 12 the deletes would come off the claim history too
+    migrate(connection)
+    report = archive_expired(connection, days=args.days, batch_size=args.batch_size)
+    connection.close()
+
+    print(f"📦 Archived listings that expired before {report['cutoff']} in {report['batches']} batches "
+          f"({report['seconds']:.1f}s)")
+    for table in ARCHIVED_TABLES:
+        print(f"   {table}: {report[table]:,} rows moved")
+    print(f"   {report['bytes_moved'] / 1024 / 1024:.1f} MB moved to the archive, "
+          f"{report['bytes_freed'] / 1024 / 1024:.1f} MB of pages freed in the main database")
+    print(f"✅ Hot tables hold listings expired since {report['cutoff']} and their claims")
@@ -0,0 +1,94 @@
+"""Requests per second through the JSON API.
+
+Starts api_server on a scratch copy of the database and drives it with
+keep-alive clients, each sending GET requests for one path. With --etag the
+clients revalidate with If-None-Match, so unchanged data answers 304.
+
+    python -m benchmarks.bench_api [--db food_management.db] [--clients 16] [--requests 200]
+        [--path /queries/1] [--etag]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from api_server import ApiServer, start_server
+from database import DB_PATH
+from instrumentation import percentile
+
+
+def run_server(api, ready, holder):
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server(api, '127.0.0.1', 0))
+    holder['port'] = server.sockets[0].getsockname()[1]
+    holder['loop'] = loop
+    ready.set()
+    loop.run_forever()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+async def client(port, path, requests, etag, latencies, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    tag = None
+    for _ in range(requests):
+        extra = f"If-None-Match: {tag}\r\n" if tag else ""
+        start = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: gzip\r\n{extra}\r\n".encode())
+        head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1')
+        headers = dict(line.split(': ', 1) for line in head.split('\r\n')[1:] if ': ' in line)
+        await reader.readexactly(int(headers.get('Content-Length', 0)))
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[head.split(' ', 2)[1]] += 1
+        if etag:
+            tag = headers.get('ETag')
+    writer.close()
+
+
+async def drive(port, args):
+    latencies, statuses = [], Counter()
+    began = time.perf_counter()
+    await asyncio.gather(*(client(port, args.path, args.requests, args.etag, latencies, statuses)
+                           for _ in range(args.clients)))
+    return time.perf_counter() - began, sorted(latencies), statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=200, help="requests per client")
+    parser.add_argument('--path', default='/queries/1')
+    parser.add_argument('--etag', action='store_true', help="revalidate with If-None-Match")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'api.db')
+        shutil.copyfile(args.db, path)
+        api = ApiServer(path, workers=args.workers)
+        ready, holder = threading.Event(), {}
+        thread = threading.Thread(target=run_server, args=(api, ready, holder), daemon=True)
+        thread.start()
+        ready.wait()
+        try:
+            elapsed, latencies, statuses = asyncio.run(drive(holder['port'], args))
+        finally:
+            holder['loop'].call_soon_threadsafe(holder['loop'].stop)
+            thread.join()
+            api.close()
+
+    total = len(latencies)
+    print(f"{args.path} with {args.clients} clients x {args.requests} requests{' (ETag)' if args.etag else ''}")
+    print(f"Throughput:  {total / elapsed:,.0f} requests/s ({total} in {elapsed:.2f} s)")
+    print(f"Latency:     p50 {percentile(latencies, 0.50):.2f} ms, p99 {percentile(latencies, 0.99):.2f} ms")
+    print(f"Statuses:    {', '.join(f'{status}: {count}' for status, count in sorted(statuses.items()))}")
+
+
+if __name__ == '__main__':
+    main()
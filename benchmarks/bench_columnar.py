@@ -0,0 +1,90 @@
+"""Benchmark the columnar snapshot against SQL for the group-by queries.
+
+Generates a database with generate_data.py, then times each query that
+columnar.py answers both ways (checking the results are equal), and the
+three kinds of refresh: a full build, appending new claims and re-reading
+the claim statuses.
+
+    python -m benchmarks.bench_columnar [--scale 100] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+from columnar import COLUMNAR_QUERIES, ColumnarSnapshot
+from database import connect
+from generate_data import generate_database
+from migrations import migrate
+from queries import queries
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def timed_refresh(snapshot, conn):
+    start = time.perf_counter()
+    kind = snapshot.refresh(conn)
+    return kind, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100, help="generate_data.py scale (1 = about 1,000 rows per table)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--new-claims', type=int, default=1000, help="claims inserted before the append refresh")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench_columnar.db')
+        start = time.perf_counter()
+        row_counts = generate_database(path, args.scale, log=lambda message: None)
+        print(f"Generated {row_counts} in {time.perf_counter() - start:.1f} s")
+        writer = connect(path)
+        migrate(writer)
+        reader = connect(path, read_only=True)
+        snapshot = ColumnarSnapshot(path + '.columnar')
+
+        kind, ms = timed_refresh(snapshot, reader)
+        print(f"\n{'refresh (' + kind + ', full build)':<40} {ms:>10.1f} ms")
+
+        print(f"\n{'Query':<40} {'SQL (ms)':>10} {'columnar (ms)':>14} {'speedup':>8}")
+        for query, name in COLUMNAR_QUERIES.items():
+            expected = pd.read_sql_query(query, reader)
+            pd.testing.assert_frame_equal(snapshot.read_sql(query, reader), expected, check_dtype=False)
+            sql_ms = median_ms(lambda: pd.read_sql_query(query, reader), args.repeat)
+            columnar_ms = median_ms(lambda: snapshot.read_sql(query, reader), args.repeat)
+            label = f"Q{queries.index(query) + 1} {name}"
+            print(f"{label:<40} {sql_ms:>10.1f} {columnar_ms:>14.2f} {sql_ms / columnar_ms:>7.0f}x")
+
+        # Incremental refreshes
+        next_id, food_id = writer.execute("SELECT MAX(Claim_ID) + 1, MIN(Food_ID) FROM claims").fetchone()
+        writer.executemany(
+            "INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp) VALUES (?, ?, 1, 'Completed', '2025-01-01 12:00:00')",
+            [(next_id + i, food_id) for i in range(args.new_claims)])
+        writer.commit()
+        kind, ms = timed_refresh(snapshot, reader)
+        print(f"\n{f'refresh ({kind}, {args.new_claims} claims appended)':<40} {ms:>10.1f} ms")
+        writer.execute("UPDATE claims SET Status = 'Completed' WHERE Claim_ID = ?", (next_id - 1,))
+        writer.commit()
+        kind, ms = timed_refresh(snapshot, reader)
+        print(f"{f'refresh ({kind}, status re-read)':<40} {ms:>10.1f} ms")
+        for query in COLUMNAR_QUERIES:
+            pd.testing.assert_frame_equal(snapshot.read_sql(query, reader), pd.read_sql_query(query, reader),
+                                          check_dtype=False)
+        print("\n✅ Columnar results match SQL")
+        reader.close()
+        writer.close()
+
+
+if __name__ == '__main__':
+    main()
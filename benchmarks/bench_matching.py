@@ -0,0 +1,86 @@
+"""Benchmark the in-memory match index at production scale.
+
+Builds a MatchIndex for 100k listings and 50k receivers spread over a
+skewed set of cities, then times lookups in both directions and
+incremental updates.
+
+    python -m benchmarks.bench_matching [--listings 100000] [--receivers 50000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from matching import MatchIndex
+
+
+FOOD_TYPES = ['Vegetarian', 'Non-Vegetarian', 'Vegan']
+MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner', 'Snacks']
+RECEIVER_TYPES = ['NGO', 'Shelter', 'Charity', 'Individual']
+
+
+def percentiles(samples_us):
+    samples_us = sorted(samples_us)
+    pick = lambda q: samples_us[min(len(samples_us) - 1, int(q * len(samples_us)))]
+    return f"p50 {pick(0.50):7.1f} µs   p95 {pick(0.95):7.1f} µs   p99 {pick(0.99):7.1f} µs   mean {statistics.fmean(samples_us):7.1f} µs"
+
+
+def timed(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, default=100_000)
+    parser.add_argument('--receivers', type=int, default=50_000)
+    parser.add_argument('--cities', type=int, default=2_000)
+    parser.add_argument('--lookups', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Zipf-like city sizes: a few large cities, a long tail of small ones
+    cities = [f"City {i}" for i in range(args.cities)]
+    weights = [1 / (i + 1) for i in range(args.cities)]
+    today = 20_000
+
+    start = time.perf_counter()
+    index = MatchIndex()
+    listing_cities = rng.choices(cities, weights, k=args.listings)
+    for food_id, city in enumerate(listing_cities, start=1):
+        index._add_listing(food_id, city, rng.choice(FOOD_TYPES), rng.choice(MEAL_TYPES),
+                           rng.randint(1, 50), today + rng.randint(-5, 20))
+    receiver_cities = rng.choices(cities, weights, k=args.receivers)
+    for receiver_id, city in enumerate(receiver_cities, start=1):
+        index._add_receiver(receiver_id, city, rng.choice(RECEIVER_TYPES))
+    for claim_id in range(1, args.receivers * 2 + 1):
+        index.add_claim(claim_id, rng.randint(1, args.listings), rng.randint(1, args.receivers))
+    build_s = time.perf_counter() - start
+    print(f"Built index: {index.stats()} in {build_s:.2f} s")
+
+    listing_ids = [(rng.randint(1, args.listings),) for _ in range(args.lookups)]
+    receiver_ids = [(rng.randint(1, args.receivers),) for _ in range(args.lookups)]
+
+    # The first lookup for a (city, food type, meal type) ranks that city's receivers once
+    print(f"receivers_for_listing  {percentiles(timed(index.receivers_for_listing, listing_ids))}  (cold)")
+    print(f"receivers_for_listing  {percentiles(timed(index.receivers_for_listing, listing_ids))}  (warm)")
+    print(f"listings_for_receiver  {percentiles(timed(lambda r: index.listings_for_receiver(r, today=today), receiver_ids))}")
+
+    new_listings = [(args.listings + i, rng.choice(cities), 'Vegan', 'Lunch', 10, '2025-01-01')
+                    for i in range(1, args.lookups + 1)]
+    print(f"add_listing            {percentiles(timed(index.add_listing, new_listings))}")
+    claims = [(args.receivers * 2 + i, rng.randint(1, args.listings), rng.randint(1, args.receivers))
+              for i in range(1, args.lookups + 1)]
+    print(f"add_claim              {percentiles(timed(index.add_claim, claims))}")
+    print(f"set_claim_status       {percentiles(timed(index.set_claim_status, [(row[0], 'Cancelled') for row in claims]))}")
+    print(f"remove_claim           {percentiles(timed(index.remove_claim, [(row[0],) for row in claims]))}")
+    print(f"remove_listing         {percentiles(timed(index.remove_listing, [(row[0],) for row in new_listings]))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""Headless benchmark of the analytics queries, dashboard reads and CRUD paths.
+
+For each dataset scale, the source database is copied into a scratch file
+and every table is replicated scale times (IDs offset so keys stay unique
+and foreign keys point inside the same copy). With --generated, each scale
+is built by generate_data.py instead, with its skewed distributions. On that database the harness
+times each of the 15 analytics queries, the chart and dashboard queries,
+the Food Listings and near-expiry lookups, and the CRUD helpers. Each query
+result is stored with its EXPLAIN QUERY PLAN.
+
+Results can be written as JSON and compared against an earlier run; the
+comparison flags queries that got slower or whose plan changed, and exits
+non-zero on a regression.
+
+    python -m benchmarks.bench_queries --scales 1 10 100 --output after.json
+    python -m benchmarks.bench_queries --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import crud
+from dashboard_stats import RECOMPUTE_SQL, STATS_COLUMNS
+from database import DatabaseWriter, connect
+from expiry import near_expiry_query
+from generate_data import generate_database
+from listings import count_listings_query, facet_counts_query, listings_page_query
+from migrations import TABLE_COLUMNS, migrate
+from queries import queries, query_descriptions, PROVIDER_CHART_QUERY, CLAIMS_CHART_QUERY, FOOD_TYPE_CHART_QUERY
+
+
+# Column -> table whose ID it refers to, for offsetting replicated rows
+ID_COLUMNS = {'Provider_ID': 'providers', 'Receiver_ID': 'receivers', 'Food_ID': 'food_listings', 'Claim_ID': 'claims'}
+ID_OF_TABLE = {table: column for column, table in ID_COLUMNS.items()}
+
+CRUD_OPERATIONS = 50
+BATCH_SIZE = 1000
+
+
+def build_scaled_database(source, path, scale):
+    """Copy source to path and replicate every table scale times"""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(path)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+    conn = connect(path, isolation_level=None)
+    migrate(conn)
+    max_ids = {table: conn.execute(f"SELECT COALESCE(MAX({key}), 0) FROM {table}").fetchone()[0]
+               for table, key in ID_OF_TABLE.items()}
+    conn.execute("BEGIN")
+    for copy in range(1, scale):
+        for table, columns in TABLE_COLUMNS.items():
+            selected = ', '.join(
+                f"{col} + {copy * max_ids[ID_COLUMNS[col]]}" if col in ID_COLUMNS else col for col in columns
+            )
+            conn.execute(f'''
+                INSERT INTO {table} ({', '.join(columns)})
+                SELECT {selected} FROM {table} WHERE {ID_OF_TABLE[table]} <= {max_ids[table]}
+            ''')
+    conn.execute("COMMIT")
+    row_counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in TABLE_COLUMNS}
+    conn.close()
+    return row_counts
+
+
+def query_plan(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN as indented lines, like the sqlite3 shell prints it"""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+
+def summarize(samples_ms):
+    samples_ms = sorted(samples_ms)
+    return {
+        'median_ms': round(statistics.median(samples_ms), 4),
+        'min_ms': round(samples_ms[0], 4),
+        'p95_ms': round(samples_ms[min(len(samples_ms) - 1, int(0.95 * len(samples_ms)))], 4),
+        'runs': len(samples_ms),
+    }
+
+
+def time_query(conn, sql, params, repeat):
+    rows = conn.execute(sql, params).fetchall()  # warm the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    result = summarize(samples)
+    result['rows'] = len(rows)
+    result['plan'] = query_plan(conn, sql, params)
+    return result
+
+
+def query_benchmarks(conn):
+    """(name, description, sql, params) for every read the app issues"""
+    city = conn.execute(
+        "SELECT Location FROM food_listings GROUP BY Location ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    filters = {'Location': city, 'Food_Type': 'Vegetarian', 'Meal_Type': None}
+
+    benchmarks = [(f"query_{i + 1:02d}", query_descriptions[i], sql, ()) for i, sql in enumerate(queries)]
+    benchmarks += [
+        ('chart_providers', "Analytics: provider type chart", PROVIDER_CHART_QUERY, ()),
+        ('chart_claims', "Analytics: claim status chart", CLAIMS_CHART_QUERY, ()),
+        ('chart_food_types', "Analytics: food type chart", FOOD_TYPE_CHART_QUERY, ()),
+        ('dashboard_stats', "Dashboard metrics (stats row)",
+         f"SELECT {', '.join(STATS_COLUMNS)} FROM stats WHERE Id = 1", ()),
+        ('dashboard_recount', "Dashboard metrics (full recount)", RECOMPUTE_SQL, ()),
+        ('listings_facet_location', "Food Listings: Location facet", *facet_counts_query('Location', filters)),
+        ('listings_count', "Food Listings: filtered count", *count_listings_query(filters)),
+        ('listings_first_page', "Food Listings: first page", *listings_page_query(filters)),
+        ('near_expiry_city', "Near-expiry listings in one city", *near_expiry_query(days=7, city=city)),
+    ]
+    return benchmarks
+
+
+def time_operation(operation, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        operation(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def crud_benchmarks(path, operations):
+    """Time the crud helpers through a DatabaseWriter, on IDs past the existing ones"""
+    conn = connect(path, read_only=True)
+    max_id = {table: conn.execute(f"SELECT MAX({key}) FROM {table}").fetchone()[0] for table, key in ID_OF_TABLE.items()}
+    conn.close()
+    writer = DatabaseWriter(path)
+    results = {}
+    try:
+        providers = [max_id['providers'] + i for i in range(1, operations + 1)]
+        receivers = [max_id['receivers'] + i for i in range(1, operations + 1)]
+        foods = [max_id['food_listings'] + i for i in range(1, operations + 1)]
+
+        results['insert_provider'] = time_operation(crud.insert_provider, [
+            (writer, i, f"Bench Provider {i}", 'Restaurant', '1 Bench St', 'Benchville', '555-0100') for i in providers])
+        results['insert_receiver'] = time_operation(crud.insert_receiver, [
+            (writer, i, f"Bench Receiver {i}", 'NGO', 'Benchville', '555-0101') for i in receivers])
+        results['insert_food_listing'] = time_operation(crud.insert_food_listing, [
+            (writer, i, 'Bench Bread', 100, '2030-01-01', providers[0], 'Restaurant', 'Benchville', 'Vegetarian', 'Lunch')
+            for i in foods])
+        results['update_provider_contact'] = time_operation(crud.update_provider_contact, [
+            (writer, i, '555-0199') for i in providers])
+        results['update_food_quantity'] = time_operation(crud.update_food_quantity, [
+            (writer, i, 50) for i in foods])
+        results['claim_food'] = time_operation(crud.claim_food, [
+            (writer, i, receivers[0], 1) for i in foods])
+
+        conn = connect(path, read_only=True)
+        claim_ids = [r[0] for r in conn.execute(
+            "SELECT Claim_ID FROM claims WHERE Food_ID >= ? ORDER BY Claim_ID", (foods[0],))]
+        conn.close()
+        results['update_claim_status'] = time_operation(crud.update_claim_status, [
+            (writer, i, 'Cancelled') for i in claim_ids])
+        results['delete_claim'] = time_operation(crud.delete_claim, [(writer, i) for i in claim_ids])
+        results['delete_food_listing'] = time_operation(crud.delete_food_listing, [(writer, i) for i in foods])
+        results['delete_receiver'] = time_operation(crud.delete_receiver, [(writer, i) for i in receivers])
+        results['delete_provider'] = time_operation(crud.delete_provider, [(writer, i) for i in providers])
+
+        batch = [(max_id['providers'] + operations + i, f"Batch Provider {i}", 'Restaurant', '1 Bench St', 'Benchville', '555-0100')
+                 for i in range(1, BATCH_SIZE + 1)]
+        results[f'insert_providers_many_{BATCH_SIZE}'] = time_operation(crud.insert_providers_many, [(writer, batch)])
+        results[f'delete_providers_many_{BATCH_SIZE}'] = time_operation(
+            crud.delete_providers_many, [(writer, [row[0] for row in batch])])
+    finally:
+        writer.close()
+    return results
+
+
+def run(source, scales, repeat, operations, generated=False):
+    report = {
+        'meta': {
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'source': 'generate_data.py' if generated else source,
+            'repeat': repeat,
+        },
+        'scales': {},
+    }
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f'bench_x{scale}.db')
+            start = time.perf_counter()
+            if generated:
+                row_counts = generate_database(path, scale, log=lambda message: None)
+            else:
+                row_counts = build_scaled_database(source, path, scale)
+            print(f"\n=== Scale x{scale}: {row_counts} (built in {time.perf_counter() - start:.1f} s)")
+
+            conn = connect(path, read_only=True)
+            results = {}
+            for name, description, sql, params in query_benchmarks(conn):
+                results[name] = dict(time_query(conn, sql, params, repeat), description=description)
+                print(f"  {name:<34} {results[name]['median_ms']:>10.3f} ms  ({results[name]['rows']} rows)")
+            conn.close()
+
+            for name, result in crud_benchmarks(path, operations).items():
+                results[f"crud_{name}"] = result
+                print(f"  {'crud_' + name:<34} {result['median_ms']:>10.3f} ms")
+
+            report['scales'][str(scale)] = {'rows': row_counts, 'results': results}
+    return report
+
+
+def compare(report, baseline, threshold, min_delta_ms, stat='min_ms'):
+    """Print a comparison with a baseline report; return the regressions found.
+
+    The fastest run (min_ms) is compared by default: it is the least
+    affected by other load on the machine.
+    """
+    regressions = []
+    print(f"\n=== Compared with run of {baseline['meta']['created_at']} on {stat} (slower than x{threshold} flagged)")
+    for scale, current in report['scales'].items():
+        previous = baseline['scales'].get(scale)
+        if previous is None:
+            print(f"  scale x{scale}: not in baseline")
+            continue
+        for name, result in current['results'].items():
+            old = previous['results'].get(name)
+            if old is None:
+                continue
+            before, after = old[stat], result[stat]
+            ratio = after / before if before else float('inf')
+            notes = []
+            if ratio > threshold and after - before > min_delta_ms:
+                notes.append("REGRESSION")
+                regressions.append((scale, name, before, after))
+            elif before and ratio < 1 / threshold and before - after > min_delta_ms:
+                notes.append("faster")
+            if old.get('plan') != result.get('plan'):
+                notes.append("plan changed")
+            if notes:
+                print(f"  x{scale} {name:<34} {before:>10.3f} -> {after:>10.3f} ms  ({ratio:.2f}x)  {', '.join(notes)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default='food_management.db', help="source database to scale up")
+    parser.add_argument('--generated', action='store_true',
+                        help="build each scale with generate_data.py (seeded) instead of replicating --db")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per query")
+    parser.add_argument('--operations', type=int, default=CRUD_OPERATIONS, help="timed calls per CRUD helper")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file from an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio counted as a regression")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="ignore slowdowns smaller than this")
+    parser.add_argument('--stat', choices=['min_ms', 'median_ms', 'p95_ms'], default='min_ms',
+                        help="timing compared against the baseline")
+    args = parser.parse_args()
+
+    report = run(args.db, args.scales, args.repeat, args.operations, generated=args.generated)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms, args.stat)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s)")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Cold start report: how long the app takes to import and to render its first page.
+
+Every measurement runs in a fresh Python process, in a scratch directory
+holding a copy of the database:
+
+    interpreter     starting python -c pass, for reference
+    import app      importing app.py (navigation shell, no page yet)
+    first render    AppTest running app.py once (the Dashboard), timed after
+                    Streamlit itself is imported
+    page <module>   importing one views/ page module after app.py
+
+It also lists the slowest modules app.py imports (python -X importtime) and
+which plotting libraries importing app.py loaded; none should be.
+
+Results can be written as JSON and compared against an earlier run; the
+comparison exits non-zero on a regression.
+
+    python -m benchmarks.bench_startup [--repeat 5] [--output after.json] [--compare before.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_queries import summarize
+from database import DB_PATH
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Streamlit itself imports the lightweight plotly.graph_objects stubs
+PLOTTING_MODULES = ['plotly.express']
+
+IMPORT_PROBE = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+import app
+app_ms = (time.perf_counter() - start) * 1000
+loaded = [name for name in {plotting!r} if name in sys.modules]
+page_ms = None
+if len(sys.argv) > 1:
+    start = time.perf_counter()
+    importlib.import_module(sys.argv[1])
+    page_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'app_ms': app_ms, 'page_ms': page_ms, 'loaded': loaded}}))
+'''.format(plotting=PLOTTING_MODULES)
+
+RENDER_PROBE = '''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+print(json.dumps({'ms': (time.perf_counter() - start) * 1000, 'failed': bool(at.exception)}))
+'''
+
+
+def run_python(args, cwd):
+    """Run a fresh interpreter with the repository importable; returns (stdout, stderr)"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([sys.executable] + args, cwd=cwd, env=env, capture_output=True, text=True, timeout=300)
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(args[:2])} failed:\n{result.stderr[-2000:]}")
+    return result.stdout, result.stderr
+
+
+def probe(args, cwd):
+    stdout, _ = run_python(args, cwd)
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def top_imports(cwd, limit):
+    """Slowest modules imported directly by app.py as (module, cumulative ms), from -X importtime"""
+    _, stderr = run_python(['-X', 'importtime', '-c', 'import app'], cwd)
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # A module is listed after its own imports, each nesting level indented two spaces
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), int(cumulative) / 1000))
+        elif depth == 0:
+            if name.strip() == 'app':
+                break
+            children = []
+    children.sort(key=lambda row: row[1], reverse=True)
+    return children[:limit]
+
+
+def run(source, repeat, top):
+    from views import PAGES
+    page_modules = sorted({f"views.{module}" for module, _ in PAGES.values()})
+    samples = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copyfile(source, os.path.join(tmp, os.path.basename(DB_PATH)))
+        app_path = os.path.join(ROOT, 'app.py')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_python(['-c', 'pass'], tmp)
+            samples.setdefault('interpreter', []).append((time.perf_counter() - start) * 1000)
+            result = probe(['-c', IMPORT_PROBE], tmp)
+            samples.setdefault('import app', []).append(result['app_ms'])
+            loaded = result['loaded']
+            rendered = probe(['-c', RENDER_PROBE, app_path], tmp)
+            if rendered['failed']:
+                raise RuntimeError("the app raised an exception on its first render")
+            samples.setdefault('first render', []).append(rendered['ms'])
+            for module in page_modules:
+                samples.setdefault(f"page {module}", []).append(probe(['-c', IMPORT_PROBE, module], tmp)['page_ms'])
+        imports = top_imports(tmp, top)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': {name: summarize(values) for name, values in samples.items()},
+        'plotting_loaded_by_app': loaded,
+        'top_imports': imports,
+    }
+
+
+def print_report(report):
+    print(f"{'Measurement':<32} {'min (ms)':>10} {'median (ms)':>12}")
+    for name, result in report['results'].items():
+        print(f"{name:<32} {result['min_ms']:>10.1f} {result['median_ms']:>12.1f}")
+    loaded = report['plotting_loaded_by_app']
+    print(f"\nPlotting libraries loaded by importing app.py: {', '.join(loaded) if loaded else 'none'}")
+    print("\nSlowest imports made by app.py (cumulative, one run):")
+    for name, ms in report['top_imports']:
+        print(f"  {name:<40} {ms:>8.1f} ms")
+
+
+def compare(report, baseline, threshold, min_delta_ms):
+    """Print a comparison with a baseline report on min_ms; return the regressions found"""
+    regressions = []
+    print(f"\n=== Compared with run of {baseline['meta']['created_at']} (slower than x{threshold} flagged)")
+    for name, result in report['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        before, after = old['min_ms'], result['min_ms']
+        ratio = after / before if before else float('inf')
+        note = ''
+        if ratio > threshold and after - before > min_delta_ms:
+            note = "REGRESSION"
+            regressions.append((name, before, after))
+        elif before and ratio < 1 / threshold and before - after > min_delta_ms:
+            note = "faster"
+        print(f"  {name:<32} {before:>10.1f} -> {after:>10.1f} ms  ({ratio:.2f}x)  {note}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH, help="database copied into the scratch directory")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument('--top', type=int, default=15, help="number of imports listed")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--compare', help="baseline JSON file from an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio counted as a regression")
+    parser.add_argument('--min-delta-ms', type=float, default=20.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    report = run(args.db, args.repeat, args.top)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s)")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Stress the claim engine: many concurrent claimers racing for one listing.
+
+Creates a scratch database with a single listing, starts every claimer at
+once and lets each claim until the listing runs out. Reports throughput and
+over-allocation (units claimed beyond what the listing had).
+
+Modes:
+    engine  each claimer has its own connection (like separate processes)
+            and uses claims.process_claim: BEGIN IMMEDIATE + conditional UPDATE
+    writer  all claimers share the app's DatabaseWriter via crud.claim_food
+    naive   the old flow: read Quantity, insert_claim, then update_food_quantity
+
+    python -m benchmarks.stress_claims [--claimers 200] [--quantity 1000] [--mode engine]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from claims import InsufficientQuantity, process_claim
+from crud import claim_food
+from database import DatabaseWriter, connect
+from migrations import migrate
+
+
+FOOD_ID = 1
+
+
+def create_database(path, quantity, claimers):
+    conn = connect(path, isolation_level=None)
+    migrate(conn)
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO providers VALUES (1, 'Stress Provider', 'Restaurant', '1 Main St', 'Testville', '555-0100')")
+    conn.executemany("INSERT INTO receivers VALUES (?, ?, 'NGO', 'Testville', '555-0199')",
+                     [(i, f"Receiver {i}") for i in range(1, claimers + 1)])
+    conn.execute('''
+        INSERT INTO food_listings (Food_ID, Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type)
+        VALUES (?, 'Bread', ?, '2030-01-01', 1, 'Restaurant', 'Testville', 'Vegetarian', 'Breakfast')
+    ''', (FOOD_ID, quantity))
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def engine_claimer(path, receiver_id, per_claim, start, results):
+    conn = connect(path, isolation_level=None)
+    start.wait()
+    try:
+        while True:
+            try:
+                process_claim(conn, FOOD_ID, receiver_id, per_claim)
+                results['claims'] += 1
+            except InsufficientQuantity:
+                break
+            except Exception as e:
+                results[f"error: {type(e).__name__}"] += 1
+                break
+    finally:
+        conn.close()
+
+
+def writer_claimer(writer, receiver_id, per_claim, start, results):
+    start.wait()
+    while True:
+        try:
+            claim_food(writer, FOOD_ID, receiver_id, per_claim)
+            results['claims'] += 1
+        except InsufficientQuantity:
+            break
+        except Exception as e:
+            results[f"error: {type(e).__name__}"] += 1
+            break
+
+
+def naive_claimer(path, receiver_id, per_claim, start, results):
+    conn = connect(path, isolation_level=None)
+    start.wait()
+    try:
+        while True:
+            try:
+                quantity = conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = ?", (FOOD_ID,)).fetchone()[0]
+                if quantity < per_claim:
+                    break
+                conn.execute("INSERT INTO claims (Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity) "
+                             "VALUES (?, ?, 'Pending', datetime('now'), ?)", (FOOD_ID, receiver_id, per_claim))
+                conn.execute("UPDATE food_listings SET Quantity = ? WHERE Food_ID = ?", (quantity - per_claim, FOOD_ID))
+                results['claims'] += 1
+            except Exception as e:
+                results[f"error: {type(e).__name__}"] += 1
+                break
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--claimers', type=int, default=200)
+    parser.add_argument('--quantity', type=int, default=1000)
+    parser.add_argument('--per-claim', type=int, default=1)
+    parser.add_argument('--mode', choices=['engine', 'writer', 'naive'], default='engine')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'stress.db')
+        create_database(path, args.quantity, args.claimers)
+
+        results = Counter()
+        start = threading.Barrier(args.claimers + 1)
+        writer = DatabaseWriter(path) if args.mode == 'writer' else None
+        threads = []
+        for receiver_id in range(1, args.claimers + 1):
+            if args.mode == 'writer':
+                target, first = writer_claimer, writer
+            else:
+                target, first = (engine_claimer if args.mode == 'engine' else naive_claimer), path
+            threads.append(threading.Thread(target=target, args=(first, receiver_id, args.per_claim, start, results)))
+        for thread in threads:
+            thread.start()
+
+        start.wait()
+        began = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+        if writer:
+            writer.close()
+
+        conn = connect(path)
+        remaining = conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = ?", (FOOD_ID,)).fetchone()[0]
+        claimed, claim_rows = conn.execute(
+            "SELECT COALESCE(SUM(Claimed_Quantity), 0), COUNT(*) FROM claims WHERE Food_ID = ?", (FOOD_ID,)
+        ).fetchone()
+        conn.close()
+
+    over_allocated = max(0, claimed - args.quantity)
+    print(f"Mode: {args.mode}, {args.claimers} claimers, {args.quantity} units, {args.per_claim} per claim")
+    print(f"Claims:          {claim_rows} in {elapsed:.2f} s ({claim_rows / elapsed:,.0f} claims/s)")
+    print(f"Units claimed:   {claimed} (listing now shows {remaining})")
+    print(f"Over-allocated:  {over_allocated} units")
+    for outcome, count in sorted(results.items()):
+        if outcome.startswith('error'):
+            print(f"{outcome}: {count}")
+    if args.mode != 'naive' and (over_allocated or claimed + remaining != args.quantity):
+        raise SystemExit("❌ Reservation invariant violated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Change feed: which rows changed after a cursor, for delta refreshes.
+
+Triggers on the four base tables (migration 13) append (Seq, Table_Name,
+Row_ID) to change_log on every insert, update and delete, in the writing
+transaction. Seq only ever grows, so a reader that has seen Seq N has seen
+every change up to N, whichever process made it. The log keeps the last
+CHANGE_LOG_ROWS changes; a trigger drops older ones.
+
+changes_since() returns the keys changed after a cursor, and refresh_rows()
+re-reads just those rows with a page's own query and merges them into the
+rows already on screen. A cursor older than the log (or more than
+MAX_CHANGES changes behind) is told to reload instead.
+"""
+import json
+from collections import namedtuple
+
+import pandas as pd
+
+from instrumentation import fetch_all, fetch_one, read_sql
+
+
+CHANGE_LOG_ROWS = 100_000
+MAX_CHANGES = 5_000
+
+# table: key column, whose value is logged as Row_ID
+CHANGE_KEYS = {'providers': 'Provider_ID', 'receivers': 'Receiver_ID',
+               'food_listings': 'Food_ID', 'claims': 'Claim_ID'}
+
+# cursor: the Seq read up to; reset: the changes can't be replayed, reload;
+# changed: {table: set of keys inserted, updated or deleted after the old cursor}
+Changes = namedtuple('Changes', ['cursor', 'reset', 'changed'])
+
+
+def current_cursor(conn):
+    """The Seq of the latest change, 0 before the first"""
+    return fetch_one(conn, """
+        SELECT COALESCE((SELECT MAX(Seq) FROM change_log),
+                        (SELECT seq FROM sqlite_sequence WHERE name = 'change_log'), 0)
+    """)[0]
+
+
+def changes_since(conn, cursor, limit=MAX_CHANGES):
+    """Keys changed after cursor, as Changes(cursor, reset, changed).
+
+    reset is True, with nothing in changed, when cursor is None, older than
+    the log, ahead of it (another database) or more than limit changes
+    behind; the caller reloads and carries on from the returned cursor.
+    """
+    latest = current_cursor(conn)
+    if cursor is None or cursor > latest:
+        return Changes(latest, True, {})
+    if cursor == latest:
+        return Changes(latest, False, {})
+    oldest = fetch_one(conn, "SELECT MIN(Seq) FROM change_log")[0]
+    if oldest is None or cursor < oldest - 1:
+        return Changes(latest, True, {})
+
+    rows = fetch_all(conn, "SELECT Table_Name, Row_ID FROM change_log WHERE Seq > ? AND Seq <= ? LIMIT ?",
+                     (cursor, latest, limit + 1))
+    if len(rows) > limit:
+        return Changes(latest, True, {})
+    changed = {}
+    for table, row_id in rows:
+        if row_id is not None:
+            changed.setdefault(table, set()).add(row_id)
+    return Changes(latest, False, changed)
+
+
+def keys_query(query, column):
+    """query narrowed to the rows whose column is in a JSON array, passed as one extra parameter"""
+    # SQLite flattens the subquery, so the IN uses the table's index on column
+    return f"SELECT * FROM ({query}) WHERE {column} IN (SELECT value FROM json_each(?))"
+
+
+def refresh_rows(conn, rows, query, params, key, table, changed, dependencies=None):
+    """Merge the changes into rows, a DataFrame read with (query, params), and return it sorted by key.
+
+    Only affected rows are re-read: those of `table` whose key changed, and,
+    for each {other table: column} in dependencies, those whose column
+    points at a changed row there (a claim row showing a listing's name).
+    Re-read rows replace the old ones; rows query no longer returns drop out.
+    """
+    selectors = [(key, changed.get(table))]
+    selectors += [(column, changed.get(other)) for other, column in (dependencies or {}).items()]
+    for column, values in selectors:
+        if not values:
+            continue
+        values = sorted(values)
+        fresh = read_sql(keys_query(query, column), conn, params=list(params) + [json.dumps(values)])
+        rows = rows[~rows[column].isin(values) & ~rows[key].isin(fresh[key])]
+        rows = pd.concat([rows, fresh]) if not rows.empty else fresh
+    return rows.sort_values(key, kind='stable').reset_index(drop=True)
@@ -0,0 +1,179 @@
+"""Atomic claim processing with quantity reservation.
+
+Making a claim reserves its units: the listing's Quantity is decremented by
+a conditional UPDATE that only matches while enough is left, in the same
+transaction as the claim insert. However many claimers race for one
+listing, they can never take more units than it has. A claim holds its
+units while Pending or Completed, and status transitions settle the
+reservation:
+
+    Pending   -> Completed   consumes it (the units stay taken)
+    Completed -> Pending     keeps it
+    Pending   -> Cancelled   releases it (the units go back to the listing)
+    Completed -> Cancelled   releases it
+    Cancelled -> Pending     takes the units again, if the listing still has them
+    Cancelled -> Completed   likewise
+
+Claims recorded before reservations (Claimed_Quantity 0) hold nothing, so
+their transitions leave the listing alone.
+
+reserve_claim() and transition_claim() only issue the statements and must
+run inside a write transaction - the DatabaseWriter's, or the BEGIN
+IMMEDIATE that run_immediate() opens for callers with their own connection.
+"""
+import random
+import sqlite3
+import time
+from datetime import datetime
+
+
+CLAIM_STATUSES = ['Pending', 'Completed', 'Cancelled']
+
+# (old status, new status) -> units returned to the listing, per claimed unit;
+# -1 takes them off it again
+TRANSITIONS = {
+    ('Pending', 'Completed'): 0,
+    ('Completed', 'Pending'): 0,
+    ('Pending', 'Cancelled'): 1,
+    ('Completed', 'Cancelled'): 1,
+    ('Cancelled', 'Pending'): -1,
+    ('Cancelled', 'Completed'): -1,
+}
+
+RETRIES = 8
+BASE_DELAY = 0.002
+MAX_DELAY = 0.25
+
+
+class ClaimError(ValueError):
+    """A claim that can't be made or moved; the message is shown to the user"""
+
+
+class InsufficientQuantity(ClaimError):
+    pass
+
+
+class InvalidTransition(ClaimError):
+    pass
+
+
+def reserve_claim(conn, food_id, receiver_id, quantity=1, claim_id=None, timestamp=None):
+    """Take quantity units off the listing and record a Pending claim.
+
+    Returns (claim_id, quantity left on the listing). Raises ClaimError
+    before writing anything if the listing or receiver is missing or the
+    listing has fewer than quantity units left.
+    """
+    if quantity < 1:
+        raise ClaimError(f"Claimed quantity must be at least 1, got {quantity}")
+    if conn.execute("SELECT 1 FROM receivers WHERE Receiver_ID = ?", (receiver_id,)).fetchone() is None:
+        raise ClaimError(f"Receiver {receiver_id} not found")
+
+    # The WHERE clause is the reservation: it only matches while enough is left
+    row = conn.execute('''
+        UPDATE food_listings SET Quantity = Quantity - ?
+        WHERE Food_ID = ? AND Quantity >= ?
+        RETURNING Quantity
+    ''', (quantity, food_id, quantity)).fetchone()
+    if row is None:
+        listing = conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = ?", (food_id,)).fetchone()
+        if listing is None:
+            raise ClaimError(f"Food listing {food_id} not found")
+        raise InsufficientQuantity(f"Food listing {food_id} has {listing[0]} left, {quantity} requested")
+
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor = conn.execute('''
+        INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity)
+        VALUES (?, ?, ?, 'Pending', ?, ?)
+    ''', (claim_id, food_id, receiver_id, timestamp, quantity))
+    return cursor.lastrowid, row[0]
+
+
+def transition_claim(conn, claim_id, new_status):
+    """Move a claim to new_status and settle its reservation.
+
+    Returns (food_id, quantity now on the listing), the quantity being None
+    when the listing did not change. Setting the current status again is a
+    no-op; a status outside CLAIM_STATUSES raises InvalidTransition, and
+    reopening a cancelled claim raises InsufficientQuantity, before writing
+    anything, if its units are gone.
+    """
+    claim = conn.execute(
+        "SELECT Status, Food_ID, Claimed_Quantity FROM claims WHERE Claim_ID = ?", (claim_id,)
+    ).fetchone()
+    if claim is None:
+        raise ClaimError(f"Claim {claim_id} not found")
+    status, food_id, claimed = claim
+    if status == new_status:
+        return food_id, None
+    if (status, new_status) not in TRANSITIONS:
+        raise InvalidTransition(f"Claim {claim_id} can't go from {status} to {new_status}")
+
+    returned = TRANSITIONS[(status, new_status)] * claimed
+    quantity = None
+    if returned > 0:
+        row = conn.execute(
+            "UPDATE food_listings SET Quantity = Quantity + ? WHERE Food_ID = ? RETURNING Quantity",
+            (returned, food_id),
+        ).fetchone()
+        quantity = row[0] if row else None
+    elif returned < 0:
+        # Reserved again the way reserve_claim() does it
+        row = conn.execute(
+            "UPDATE food_listings SET Quantity = Quantity - ? WHERE Food_ID = ? AND Quantity >= ? RETURNING Quantity",
+            (claimed, food_id, claimed),
+        ).fetchone()
+        if row is None:
+            listing = conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = ?", (food_id,)).fetchone()
+            if listing is None:
+                raise ClaimError(f"Food listing {food_id} not found")
+            raise InsufficientQuantity(f"Food listing {food_id} has {listing[0]} left, claim {claim_id} needs {claimed}")
+        quantity = row[0]
+    conn.execute("UPDATE claims SET Status = ? WHERE Claim_ID = ?", (new_status, claim_id))
+    return food_id, quantity
+
+
+def _is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def backoff_delay(attempt):
+    """Exponential backoff with jitter, so retrying claimers don't collide again"""
+    return min(MAX_DELAY, BASE_DELAY * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def run_immediate(conn, operation, retries=RETRIES):
+    """Run operation(conn) in a BEGIN IMMEDIATE transaction and commit it.
+
+    conn must be in autocommit mode (isolation_level=None). If the database
+    is still locked after the connection's busy timeout, the whole
+    transaction is retried with backoff up to retries times.
+    """
+    for attempt in range(retries + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(conn)
+                conn.execute("COMMIT")
+                return result
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except sqlite3.OperationalError as e:
+            if not _is_busy(e) or attempt == retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+
+
+def process_claim(conn, food_id, receiver_id, quantity=1, claim_id=None, timestamp=None, retries=RETRIES):
+    """reserve_claim() in its own transaction, for callers outside the app's writer"""
+    return run_immediate(
+        conn, lambda c: reserve_claim(c, food_id, receiver_id, quantity, claim_id, timestamp), retries
+    )
+
+
+def settle_claim(conn, claim_id, new_status, retries=RETRIES):
+    """transition_claim() in its own transaction"""
+    return run_immediate(conn, lambda c: transition_claim(c, claim_id, new_status), retries)
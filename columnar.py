@@ -0,0 +1,483 @@
+"""Memory-mapped columnar snapshot for the group-by analytics queries.
+
+Queries 2, 6, 7, 11 and 12 group food listings, and the completed claims on
+them, by a few low-cardinality text columns. The snapshot keeps those
+columns dictionary-encoded as integer codes, next to the integer
+quantities, IDs and days, in flat binary files under <database>.columnar/.
+The files are memory-mapped read-only, so every process that opens the
+same snapshot shares one copy through the OS page cache, and each query
+becomes a few np.bincount calls over the codes.
+
+Like the queries, the snapshot covers the archived rows too: it reads
+all_food_listings and all_claims (database.py) and flags each listing that
+is archived, which Queries 6 and 7 (the food on offer now) leave out.
+
+refresh() compares the table_changes counters (migration 8) with the ones
+the snapshot was built at:
+
+- no write since: nothing to do,
+- inserts above the highest snapshotted ID: the new rows are appended,
+- Quantity (listings) or Status (claims) updates: that column is re-read,
+- anything else (deletes - archiving too -, other updates, provider or
+  receiver changes other than Contact): the snapshot is rebuilt.
+
+Meta data is replaced atomically and appends only write past the rows it
+lists, so readers never see a half-written snapshot. Processes sharing a
+directory take turns refreshing it through a lock file; a process that
+finds the directory already current just maps the new files.
+"""
+import json
+import os
+import threading
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from query_cache import stored_data_version
+from queries import queries
+
+try:
+    import fcntl
+except ImportError:  # Windows: only one process should refresh a directory
+    fcntl = None
+
+
+FORMAT = 3
+FETCH_SIZE = 100_000
+MISSING = -1                               # code or position of a row that isn't there
+MISSING_ID = np.iinfo(np.int64).min        # NULL Food_ID / Receiver_ID
+NO_DAY = int(np.iinfo(np.int32).min)       # NULL or unparseable date
+
+# Snapshot tables, their source table and columns. Code columns hold indexes
+# into the dictionary of the same name; days count from 1970-01-01
+SOURCES = {'listings': 'food_listings', 'claims': 'claims'}
+COLUMNS = {
+    'listings': [('food_id', np.int64), ('quantity', np.int64), ('location', np.int32), ('food_type', np.int32),
+                 ('meal_type', np.int32), ('provider_type', np.int32), ('expiry_day', np.int32), ('archived', np.int8)],
+    'claims': [('claim_id', np.int64), ('food_id', np.int64), ('receiver_id', np.int64), ('receiver_type', np.int32),
+               ('status', np.int32), ('day', np.int32), ('claimed_quantity', np.int64), ('listing', np.int64)],
+}
+CODE_COLUMNS = ['location', 'food_type', 'meal_type', 'provider_type', 'receiver_type', 'status']
+
+# Hot and archived rows above a high-water ID, in ID order; the last column
+# tells whether the joined provider / receiver exists (foreign keys aren't enforced)
+LISTINGS_SQL = f'''
+    SELECT fl.Food_ID, fl.Quantity, fl.Location, fl.Food_Type, fl.Meal_Type, p.Type,
+           COALESCE(fl.Expiry_Day, {NO_DAY}),
+           NOT EXISTS (SELECT 1 FROM main.food_listings h WHERE h.Food_ID = fl.Food_ID),
+           p.Provider_ID IS NOT NULL
+    FROM all_food_listings fl
+    LEFT JOIN providers p ON p.Provider_ID = fl.Provider_ID
+    WHERE fl.Food_ID > ?
+    ORDER BY fl.Food_ID
+'''
+CLAIMS_SQL = f'''
+    SELECT c.Claim_ID, COALESCE(c.Food_ID, {MISSING_ID}), COALESCE(c.Receiver_ID, {MISSING_ID}), r.Type, c.Status,
+           COALESCE(CAST(julianday(c.Timestamp) - 2440587.5 AS INTEGER), {NO_DAY}), c.Claimed_Quantity,
+           r.Receiver_ID IS NOT NULL
+    FROM all_claims c
+    LEFT JOIN receivers r ON r.Receiver_ID = c.Receiver_ID
+    WHERE c.Claim_ID > ?
+    ORDER BY c.Claim_ID
+'''
+# Hot columns re-read on their own: (source column, snapshot table, column)
+HOT_RELOADS = {
+    'food_listings': ('SELECT Quantity FROM all_food_listings ORDER BY Food_ID', 'listings', 'quantity'),
+    'claims': ('SELECT Status FROM all_claims ORDER BY Claim_ID', 'claims', 'status'),
+}
+
+_State = namedtuple('_State', ['meta', 'listings', 'claims'])
+
+
+class _Rebuild(Exception):
+    """The changes can't be applied incrementally"""
+
+
+def _encode(values, dictionary):
+    """Codes of values in dictionary, a list that new values are appended to"""
+    # factorize codes NULL as -1, which picks the last entry of labels
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    labels = list(uniques) + ([None] if (codes < 0).any() else [])
+    index = {value: code for code, value in enumerate(dictionary)}
+    mapping = np.array([index.setdefault(value, len(index)) for value in labels], dtype=np.int32)
+    dictionary.extend(list(index)[len(dictionary):])
+    return mapping[codes] if len(codes) else np.empty(0, np.int32)
+
+
+def _read_rows(conn, sql, params, names, dictionaries):
+    """{name: array} of the columns sql returns, code columns encoded"""
+    dtypes = dict(COLUMNS['listings'] + COLUMNS['claims'], found=np.int8)
+    parts = {name: [] for name in names}
+    cursor = conn.execute(sql, params)
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        for name, values in zip(names, zip(*rows)):
+            if name in CODE_COLUMNS:
+                parts[name].append(_encode(values, dictionaries[name]))
+            else:
+                parts[name].append(np.array(values, dtype=dtypes[name]))
+    return {name: np.concatenate(chunks) if chunks else np.empty(0, dtypes[name]) for name, chunks in parts.items()}
+
+
+def _positions(food_ids, keys):
+    """Position of each key in the sorted food_ids, or MISSING"""
+    if not len(food_ids):
+        return np.full(len(keys), MISSING, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(food_ids, keys), len(food_ids) - 1)
+    return np.where(food_ids[positions] == keys, positions, MISSING).astype(np.int64)
+
+
+def _groups(codes, quantity, dictionary):
+    """(present codes, their labels, row counts, quantity sums) for the non-negative codes"""
+    valid = codes >= 0
+    codes, quantity = codes[valid], quantity[valid]
+    counts = np.bincount(codes, minlength=len(dictionary))
+    sums = np.bincount(codes, weights=quantity, minlength=len(dictionary))
+    present = np.flatnonzero(counts)
+    return present, [dictionary[code] for code in present], counts[present], np.rint(sums[present]).astype(np.int64)
+
+
+def _sort_key(value):
+    # SQLite's order: NULL, then numbers, then text (BINARY collation is code point order)
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    return (2, str(value))
+
+
+def _ordered(df, by):
+    """df by column `by` descending, then by label, as the queries' ORDER BY spells out"""
+    labels = df.iloc[:, 0].tolist()
+    values = df[by].tolist()
+    order = sorted(range(len(df)), key=lambda i: (-values[i], _sort_key(labels[i])))
+    return df.iloc[order].reset_index(drop=True)
+
+
+def _round2(values):
+    """SQLite's ROUND(x, 2): to nearest, halves away from zero"""
+    return [float(Decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)) for value in values]
+
+
+def _code(dictionary, value):
+    return dictionary.index(value) if value in dictionary else -2
+
+
+class ColumnarSnapshot:
+    """Columnar copy of food_listings and claims, kept current by refresh()"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._state = None
+        self.refreshes = Counter()
+
+    # Files
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _directory_lock(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file('lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _read_meta(self):
+        try:
+            with open(self._file('meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('format') == FORMAT else None
+
+    def _write_meta(self, meta):
+        tmp = self._file('meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file('meta.json'))
+        # Drop the column files the new meta no longer lists
+        current = set(meta['files'].values())
+        for name in os.listdir(self.path):
+            if name.endswith('.bin') and name not in current:
+                try:
+                    os.remove(self._file(name))
+                except OSError:  # still mapped (Windows); removed on a later refresh
+                    pass
+
+    def _write_column(self, meta, table, name, array):
+        """Write a whole column to a new file"""
+        filename = f"{table}.{name}.{meta['generation']}.bin"
+        array.tofile(self._file(filename))
+        meta['files'][f"{table}.{name}"] = filename
+
+    def _append_column(self, meta, table, name, array):
+        """Write rows after the ones meta lists, over anything an interrupted refresh left there"""
+        dtype = dict(COLUMNS[table])[name]
+        with open(self._file(meta['files'][f"{table}.{name}"]), 'r+b') as f:
+            f.seek(meta['rows'][table] * np.dtype(dtype).itemsize)
+            f.write(array.astype(dtype).tobytes())
+            f.truncate()
+
+    def _map(self, meta):
+        """State with every column of meta memory-mapped read-only"""
+        tables = {}
+        for table, columns in COLUMNS.items():
+            rows = meta['rows'][table]
+            tables[table] = {
+                name: np.memmap(self._file(meta['files'][f"{table}.{name}"]), dtype=dtype, mode='r', shape=(rows,))
+                if rows else np.empty(0, dtype)
+                for name, dtype in columns
+            }
+        return _State(meta, tables['listings'], tables['claims'])
+
+    # Reading from the database
+    def _read_listings(self, conn, dictionaries, after):
+        names = [name for name, _ in COLUMNS['listings']] + ['found']
+        listings = _read_rows(conn, LISTINGS_SQL, (after,), names, dictionaries)
+        listings['provider_type'][listings.pop('found') == 0] = MISSING
+        return listings
+
+    def _read_claims(self, conn, dictionaries, after, food_ids):
+        names = [name for name, _ in COLUMNS['claims'] if name != 'listing'] + ['found']
+        claims = _read_rows(conn, CLAIMS_SQL, (after,), names, dictionaries)
+        claims['receiver_type'][claims.pop('found') == 0] = MISSING
+        claims['listing'] = _positions(food_ids, claims['food_id'])
+        return claims
+
+    def _read_changes(self, conn):
+        rows = conn.execute("SELECT Table_Name, Inserts, Deletes, Updates, Hot_Updates FROM table_changes")
+        return {row[0]: list(row[1:]) for row in rows}
+
+    # Refreshing
+    def _rebuild(self, conn, meta, version, changes):
+        dictionaries = {name: [] for name in CODE_COLUMNS}
+        listings = self._read_listings(conn, dictionaries, MISSING_ID)
+        claims = self._read_claims(conn, dictionaries, MISSING_ID, listings['food_id'])
+        meta = {
+            'format': FORMAT,
+            'generation': (meta['generation'] + 1) if meta else 1,
+            'data_version': version,
+            'changes': changes,
+            'dictionaries': dictionaries,
+            'rows': {'listings': len(listings['food_id']), 'claims': len(claims['claim_id'])},
+            'high_water': {},
+            'files': {},
+        }
+        for table, columns in (('listings', listings), ('claims', claims)):
+            id_column = columns[COLUMNS[table][0][0]]
+            meta['high_water'][table] = int(id_column[-1]) if len(id_column) else int(MISSING_ID)
+            for name, array in columns.items():
+                self._write_column(meta, table, name, array)
+        self._write_meta(meta)
+        return self._map(meta)
+
+    def _apply(self, conn, state, version, changes):
+        """Apply the changes since state in place of a rebuild; raises _Rebuild when they can't be"""
+        old = state.meta['changes']
+        delta = {table: [new - before for new, before in zip(counters, old.get(table, [0, 0, 0, 0]))]
+                 for table, counters in changes.items()}
+        inserts, deletes, updates, hot = zip(*delta.values())
+        if min(inserts + deletes + updates + hot) < 0:
+            raise _Rebuild("counters went back")
+        if any(delta[table][2] or delta[table][1] for table in delta):
+            raise _Rebuild("rows deleted or rewritten")
+        # A new provider or receiver only matters to rows that were missing theirs
+        if (delta['providers'][0] and (state.listings['provider_type'] == MISSING).any()) or \
+                (delta['receivers'][0] and (state.claims['receiver_type'] == MISSING).any()):
+            raise _Rebuild("provider or receiver of existing rows added")
+
+        meta = json.loads(json.dumps(state.meta))
+        meta.update(generation=meta['generation'] + 1, data_version=version, changes=changes)
+        food_ids = state.listings['food_id']
+        appended = 0
+        for table in ('listings', 'claims'):
+            inserted = delta[SOURCES[table]][0]
+            if not inserted:
+                continue
+            after = meta['high_water'][table]
+            if table == 'listings':
+                new = self._read_listings(conn, meta['dictionaries'], after)
+            else:
+                new = self._read_claims(conn, meta['dictionaries'], after, food_ids)
+            id_column = new[COLUMNS[table][0][0]]
+            # Fewer rows than inserts: some went below the high-water ID
+            if len(id_column) != inserted:
+                raise _Rebuild(f"{SOURCES[table]} inserted out of ID order")
+            for name, array in new.items():
+                self._append_column(meta, table, name, array)
+            meta['rows'][table] += inserted
+            meta['high_water'][table] = int(id_column[-1])
+            appended += inserted
+            if table == 'listings':
+                food_ids = np.concatenate([food_ids, new['food_id']])
+                # Claims made on a listing before it existed can find it now
+                listing = np.array(state.claims['listing'])
+                dangling = np.flatnonzero(listing == MISSING)
+                found = _positions(food_ids, state.claims['food_id'][dangling])
+                if (found != MISSING).any():
+                    listing[dangling] = found
+                    self._write_column(meta, 'claims', 'listing', listing)
+
+        for source, (sql, table, name) in HOT_RELOADS.items():
+            if delta[source][3]:
+                values = [row[0] for row in conn.execute(sql)]
+                if len(values) != meta['rows'][table]:
+                    raise _Rebuild(f"{source} row count changed")
+                if name in CODE_COLUMNS:
+                    column = _encode(values, meta['dictionaries'][name])
+                else:
+                    column = np.array(values, dtype=dict(COLUMNS[table])[name])
+                self._write_column(meta, table, name, column)
+        self._write_meta(meta)
+        return appended, self._map(meta)
+
+    def refresh(self, conn):
+        """Bring the snapshot up to the data conn sees; returns what was done, or None if it was current"""
+        began = not conn.in_transaction
+        if began:
+            # Version, counters and rows from one read snapshot
+            conn.execute("BEGIN")
+        try:
+            version = stored_data_version(conn)
+            state = self._state
+            if state is not None and state.meta['data_version'] == version:
+                return None
+            with self._lock, self._directory_lock():
+                state = self._state
+                if state is not None and state.meta['data_version'] == version:
+                    return None
+                # Another process may have refreshed the directory already
+                meta = self._read_meta()
+                if meta is not None and (state is None or meta['generation'] != state.meta['generation']):
+                    try:
+                        state = self._map(meta)
+                    except (OSError, ValueError, KeyError):
+                        state = None
+                if state is not None and state.meta['data_version'] == version:
+                    kind = 'load'
+                else:
+                    changes = self._read_changes(conn)
+                    with timed('columnar', 'refresh') as result:
+                        try:
+                            if state is None:
+                                raise _Rebuild("no snapshot")
+                            result['rows'], state = self._apply(conn, state, version, changes)
+                            kind = 'update'
+                        except _Rebuild:
+                            state = self._rebuild(conn, state.meta if state else meta, version, changes)
+                            result['rows'] = state.meta['rows']['listings'] + state.meta['rows']['claims']
+                            kind = 'rebuild'
+                self._state = state
+                self.refreshes[kind] += 1
+                return kind
+        finally:
+            if began:
+                conn.rollback()
+
+    # Aggregations, matching the SQL of the queries they replace
+    def provider_type_totals(self):
+        """Query 2"""
+        state = self._state
+        dictionary = state.meta['dictionaries']['provider_type']
+        _, labels, counts, sums = _groups(state.listings['provider_type'], state.listings['quantity'], dictionary)
+        df = pd.DataFrame({'Provider_Type': labels, 'Total_Food_Listings': counts, 'Total_Quantity': sums})
+        return _ordered(df, 'Total_Quantity')
+
+    def _current(self, state, name):
+        """Code column name of the listings, with the archived ones coded MISSING"""
+        return np.where(state.listings['archived'] == 0, state.listings[name], MISSING)
+
+    def city_totals(self):
+        """Query 6"""
+        state = self._state
+        dictionary = state.meta['dictionaries']['location']
+        _, labels, counts, sums = _groups(self._current(state, 'location'), state.listings['quantity'], dictionary)
+        df = pd.DataFrame({'City': labels, 'Total_Listings': counts, 'Total_Quantity': sums,
+                           'Average_Quantity_Per_Listing': sums / np.maximum(counts, 1)})
+        return _ordered(df, 'Total_Listings')
+
+    def food_type_totals(self):
+        """Query 7"""
+        state = self._state
+        dictionary = state.meta['dictionaries']['food_type']
+        _, labels, counts, sums = _groups(self._current(state, 'food_type'), state.listings['quantity'], dictionary)
+        df = pd.DataFrame({'Food_Type': labels, 'Total_Listings': counts, 'Total_Quantity': sums,
+                           'Average_Quantity': _round2(sums / np.maximum(counts, 1))})
+        return _ordered(df, 'Total_Quantity')
+
+    def _completed_claims(self, state, require_receiver):
+        """Listing positions, quantities claimed, receiver IDs and receiver type codes of the completed claims"""
+        claims = state.claims
+        mask = (claims['status'] == _code(state.meta['dictionaries']['status'], 'Completed')) & (claims['listing'] >= 0)
+        if require_receiver:
+            mask &= claims['receiver_type'] >= 0
+        listing, claimed = claims['listing'][mask], claims['claimed_quantity'][mask]
+        # Claims recorded before reservations count for the listing's quantity
+        quantity = np.where(claimed > 0, claimed, state.listings['quantity'][listing])
+        return listing, quantity, claims['receiver_id'][mask], claims['receiver_type'][mask]
+
+    def receiver_type_totals(self):
+        """Query 11"""
+        state = self._state
+        dictionary = state.meta['dictionaries']['receiver_type']
+        _, quantity, receiver_ids, receiver_types = self._completed_claims(state, require_receiver=True)
+        present, labels, counts, sums = _groups(receiver_types, quantity, dictionary)
+        # Distinct (type, receiver) pairs, counted per type
+        order = np.lexsort((receiver_ids, receiver_types))
+        types, ids = receiver_types[order], receiver_ids[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (types[1:] != types[:-1]) | (ids[1:] != ids[:-1])
+        receivers = np.bincount(types[first], minlength=len(dictionary))[present]
+        df = pd.DataFrame({'Receiver_Type': labels, 'Total_Receivers': receivers, 'Total_Quantity_Claimed': sums,
+                           'Average_Quantity_Per_Claim': _round2(sums / np.maximum(counts, 1))})
+        return _ordered(df, 'Average_Quantity_Per_Claim')
+
+    def meal_type_totals(self):
+        """Query 12"""
+        state = self._state
+        dictionary = state.meta['dictionaries']['meal_type']
+        listing, quantity, _, _ = self._completed_claims(state, require_receiver=False)
+        _, labels, counts, sums = _groups(state.listings['meal_type'][listing], quantity, dictionary)
+        df = pd.DataFrame({'Meal_Type': labels, 'Total_Claims': counts, 'Total_Quantity_Claimed': sums,
+                           'Average_Quantity_Per_Claim': _round2(sums / np.maximum(counts, 1))})
+        return _ordered(df, 'Total_Quantity_Claimed')
+
+    def read_sql(self, query, conn, params=None):
+        """Result of query, one of COLUMNAR_QUERIES (which take no params), as of the data conn sees"""
+        self.refresh(conn)
+        name = COLUMNAR_QUERIES[query]
+        with timed('columnar', name) as result:
+            df = getattr(self, name)()
+            result['rows'] = len(df)
+        return df
+
+    def stats(self):
+        state = self._state
+        if state is None:
+            return {'data_version': None, 'listings': 0, 'claims': 0, 'bytes': 0, 'refreshes': dict(self.refreshes)}
+        size = sum(array.nbytes for table in (state.listings, state.claims) for array in table.values())
+        return {
+            'data_version': state.meta['data_version'],
+            'listings': state.meta['rows']['listings'],
+            'claims': state.meta['rows']['claims'],
+            'bytes': size,
+            'refreshes': dict(self.refreshes),
+        }
+
+
+# Queries the snapshot answers, by SQL text, and the method answering each
+COLUMNAR_QUERIES = {
+    queries[1]: 'provider_type_totals',
+    queries[5]: 'city_totals',
+    queries[6]: 'food_type_totals',
+    queries[10]: 'receiver_type_totals',
+    queries[11]: 'meal_type_totals',
+}
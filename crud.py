@@ -0,0 +1,330 @@
+"""Create/update/delete helpers for the four tables.
+
+Every function takes the DatabaseWriter that owns the read-write connection.
+The single-row helpers return a status message for the UI. Each *_many
+helper writes a whole batch with executemany in one transaction (one
+commit) and returns one outcome per input row.
+
+New claims should go through claim_food(), which reserves the listing's
+quantity atomically (see claims.py); insert_claim() records a claim as-is,
+e.g. when importing historical data. Claim status updates always settle the
+reservation.
+
+Every helper is timed by instrumentation.py.
+
+In-process indexes can follow the writes by registering a listener with
+add_write_listener(); it is called as listener(table, action, row) after
+each committed insert, update or delete.
+"""
+import logging
+import sqlite3
+from datetime import datetime
+
+from claims import ClaimError, reserve_claim, transition_claim
+from ingest import missing_foreign_keys
+from instrumentation import instrumented
+from migrations import TABLE_COLUMNS
+from query_cache import bump_data_version
+
+
+logger = logging.getLogger(__name__)
+
+_write_listeners = []
+
+
+def add_write_listener(listener):
+    _write_listeners.append(listener)
+
+
+def _written(table, action, rows):
+    """Bump the data version and tell the listeners about committed rows.
+
+    rows are the full row for inserts, (id, new value) for updates and
+    (id,) for deletes.
+    """
+    bump_data_version()
+    for listener in _write_listeners:
+        for row in rows:
+            try:
+                listener(table, action, row)
+            except Exception:
+                # The write is already committed; a broken listener must not undo the response
+                logger.exception("Write listener %r failed on %s %s", listener, action, table)
+
+
+INSERT_PROVIDER_SQL = '''INSERT INTO providers (Provider_ID, Name, Type, Address, City, Contact) VALUES (?, ?, ?, ?, ?, ?)'''
+INSERT_RECEIVER_SQL = '''INSERT INTO receivers (Receiver_ID, Name, Type, City, Contact) VALUES (?, ?, ?, ?, ?)'''
+INSERT_FOOD_LISTING_SQL = '''INSERT INTO food_listings (Food_ID, Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type, Location, Food_Type, Meal_Type) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+INSERT_CLAIM_SQL = '''INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp) VALUES (?, ?, ?, ?, ?)'''
+UPDATE_PROVIDER_CONTACT_SQL = '''UPDATE providers SET Contact = ? WHERE Provider_ID = ?'''
+UPDATE_RECEIVER_CONTACT_SQL = '''UPDATE receivers SET Contact = ? WHERE Receiver_ID = ?'''
+UPDATE_FOOD_QUANTITY_SQL = '''UPDATE food_listings SET Quantity = ? WHERE Food_ID = ?'''
+DELETE_PROVIDER_SQL = '''DELETE FROM providers WHERE Provider_ID = ?'''
+DELETE_RECEIVER_SQL = '''DELETE FROM receivers WHERE Receiver_ID = ?'''
+DELETE_FOOD_LISTING_SQL = '''DELETE FROM food_listings WHERE Food_ID = ?'''
+DELETE_CLAIM_SQL = '''DELETE FROM claims WHERE Claim_ID = ?'''
+
+
+# Single-row helpers
+@instrumented('crud')
+def insert_provider(writer, provider_id, name, type_, address, city, contact):
+    writer.execute(INSERT_PROVIDER_SQL, (provider_id, name, type_, address, city, contact))
+    _written('providers', 'insert', [(provider_id, name, type_, address, city, contact)])
+    return f"Provider {name} inserted successfully."
+
+@instrumented('crud')
+def insert_receiver(writer, receiver_id, name, type_, city, contact):
+    writer.execute(INSERT_RECEIVER_SQL, (receiver_id, name, type_, city, contact))
+    _written('receivers', 'insert', [(receiver_id, name, type_, city, contact)])
+    return f"Receiver {name} inserted successfully."
+
+@instrumented('crud')
+def insert_food_listing(writer, food_id, food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type):
+    writer.execute(INSERT_FOOD_LISTING_SQL, (food_id, food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type))
+    _written('food_listings', 'insert', [(food_id, food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type)])
+    return f"Food listing {food_name} inserted successfully."
+
+@instrumented('crud')
+def insert_claim(writer, claim_id, food_id, receiver_id, status, timestamp):
+    writer.execute(INSERT_CLAIM_SQL, (claim_id, food_id, receiver_id, status, timestamp))
+    _written('claims', 'insert', [(claim_id, food_id, receiver_id, status, timestamp)])
+    return f"Claim {claim_id} inserted successfully."
+
+@instrumented('crud')
+def claim_food(writer, food_id, receiver_id, quantity=1, claim_id=None, timestamp=None):
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    new_claim_id, remaining = writer.run(
+        lambda conn: reserve_claim(conn, food_id, receiver_id, quantity, claim_id, timestamp)
+    )
+    _written('claims', 'insert', [(new_claim_id, food_id, receiver_id, 'Pending', timestamp)])
+    _written('food_listings', 'update', [(food_id, remaining)])
+    return f"Claim {new_claim_id} reserved {quantity} of food listing {food_id} ({remaining} left)."
+
+@instrumented('crud')
+def update_provider_contact(writer, provider_id, new_contact):
+    writer.execute(UPDATE_PROVIDER_CONTACT_SQL, (new_contact, provider_id))
+    _written('providers', 'update', [(provider_id, new_contact)])
+    return f"Provider {provider_id} contact updated to {new_contact}."
+
+@instrumented('crud')
+def update_receiver_contact(writer, receiver_id, new_contact):
+    writer.execute(UPDATE_RECEIVER_CONTACT_SQL, (new_contact, receiver_id))
+    _written('receivers', 'update', [(receiver_id, new_contact)])
+    return f"Receiver {receiver_id} contact updated to {new_contact}."
+
+@instrumented('crud')
+def update_food_quantity(writer, food_id, new_quantity):
+    writer.execute(UPDATE_FOOD_QUANTITY_SQL, (new_quantity, food_id))
+    _written('food_listings', 'update', [(food_id, new_quantity)])
+    return f"Food listing {food_id} quantity updated to {new_quantity}."
+
+@instrumented('crud')
+def update_claim_status(writer, claim_id, new_status):
+    food_id, quantity = writer.run(lambda conn: transition_claim(conn, claim_id, new_status))
+    _written('claims', 'update', [(claim_id, new_status)])
+    if quantity is not None:
+        _written('food_listings', 'update', [(food_id, quantity)])
+        return f"Claim {claim_id} status updated to {new_status}; food listing {food_id} now has {quantity}."
+    return f"Claim {claim_id} status updated to {new_status}."
+
+@instrumented('crud')
+def delete_provider(writer, provider_id):
+    writer.execute(DELETE_PROVIDER_SQL, (provider_id,))
+    _written('providers', 'delete', [(provider_id,)])
+    return f"Provider {provider_id} deleted successfully."
+
+@instrumented('crud')
+def delete_receiver(writer, receiver_id):
+    writer.execute(DELETE_RECEIVER_SQL, (receiver_id,))
+    _written('receivers', 'delete', [(receiver_id,)])
+    return f"Receiver {receiver_id} deleted successfully."
+
+@instrumented('crud')
+def delete_food_listing(writer, food_id):
+    writer.execute(DELETE_FOOD_LISTING_SQL, (food_id,))
+    _written('food_listings', 'delete', [(food_id,)])
+    return f"Food listing {food_id} deleted successfully."
+
+@instrumented('crud')
+def delete_claim(writer, claim_id):
+    writer.execute(DELETE_CLAIM_SQL, (claim_id,))
+    _written('claims', 'delete', [(claim_id,)])
+    return f"Claim {claim_id} deleted successfully."
+
+
+# Batch helpers
+def _existing_ids(conn, table, key, ids):
+    found = set()
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        found.update(r[0] for r in conn.execute(f"SELECT {key} FROM {table} WHERE {key} IN ({placeholders})", chunk))
+    return found
+
+
+PAST_TENSE = {'insert': "inserted", 'update': "updated", 'delete': "deleted"}
+
+
+def _write_many(writer, table, key, sql, rows, to_params, action):
+    """Write rows (tuples whose first item is the row id) in one transaction.
+
+    Rows that would fail - an id that already exists for inserts, or is
+    missing for updates and deletes (or repeated in a delete batch), or an
+    inserted row referring to a provider, listing or receiver that doesn't
+    exist - are reported without being sent. The rest go through a single
+    executemany; if SQLite still rejects it, the batch is replayed row by
+    row so each failure is reported on its own row.
+    Returns [{'id', 'ok', 'message'}] in input order.
+    """
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+    must_exist = action != 'insert'
+
+    def operation(conn):
+        existing = _existing_ids(conn, table, key, {row[0] for row in rows})
+        columns = TABLE_COLUMNS[table]
+        missing = {} if must_exist else missing_foreign_keys(conn, table, rows, columns)
+        outcomes, valid, seen = [], [], set()
+        for row in rows:
+            row_id = row[0]
+            unknown = [(column, row[columns.index(column)]) for column, ids in missing.items()
+                       if row[columns.index(column)] in ids]
+            # A row deleted earlier in the batch is gone by the time its repeat runs
+            if must_exist and (row_id not in existing or (action == 'delete' and row_id in seen)):
+                outcomes.append({'id': row_id, 'ok': False, 'message': f"{key} {row_id} not found"})
+            elif not must_exist and (row_id in existing or row_id in seen):
+                outcomes.append({'id': row_id, 'ok': False, 'message': f"{key} {row_id} already exists"})
+            elif unknown:
+                column, value = unknown[0]
+                outcomes.append({'id': row_id, 'ok': False, 'message': f"unknown {column} {value}"})
+            else:
+                outcomes.append({'id': row_id, 'ok': True, 'message': f"{key} {row_id} {PAST_TENSE[action]}"})
+                valid.append((len(outcomes) - 1, row))
+            seen.add(row_id)
+
+        conn.execute("SAVEPOINT write_many")
+        try:
+            conn.executemany(sql, [to_params(row) for _, row in valid])
+            conn.execute("RELEASE write_many")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK TO write_many")
+            conn.execute("RELEASE write_many")
+            for index, row in valid:
+                conn.execute("SAVEPOINT write_row")
+                try:
+                    conn.execute(sql, to_params(row))
+                    conn.execute("RELEASE write_row")
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO write_row")
+                    conn.execute("RELEASE write_row")
+                    outcomes[index] = {'id': row[0], 'ok': False, 'message': str(e)}
+        return outcomes
+
+    outcomes = writer.run(operation)
+    written = [row for row, outcome in zip(rows, outcomes) if outcome['ok']]
+    if written:
+        _written(table, action, written)
+    return outcomes
+
+
+def _same_order(row):
+    return row
+
+
+def _value_then_id(row):
+    return (row[1], row[0])
+
+
+def _id_only(row):
+    return (row[0],)
+
+
+@instrumented('crud')
+def insert_providers_many(writer, rows):
+    """rows: (provider_id, name, type_, address, city, contact) tuples"""
+    return _write_many(writer, 'providers', 'Provider_ID', INSERT_PROVIDER_SQL, rows, _same_order, 'insert')
+
+@instrumented('crud')
+def insert_receivers_many(writer, rows):
+    """rows: (receiver_id, name, type_, city, contact) tuples"""
+    return _write_many(writer, 'receivers', 'Receiver_ID', INSERT_RECEIVER_SQL, rows, _same_order, 'insert')
+
+@instrumented('crud')
+def insert_food_listings_many(writer, rows):
+    """rows: (food_id, food_name, quantity, expiry_date, provider_id, provider_type, location, food_type, meal_type) tuples"""
+    return _write_many(writer, 'food_listings', 'Food_ID', INSERT_FOOD_LISTING_SQL, rows, _same_order, 'insert')
+
+@instrumented('crud')
+def insert_claims_many(writer, rows):
+    """rows: (claim_id, food_id, receiver_id, status, timestamp) tuples"""
+    return _write_many(writer, 'claims', 'Claim_ID', INSERT_CLAIM_SQL, rows, _same_order, 'insert')
+
+@instrumented('crud')
+def update_provider_contacts_many(writer, rows):
+    """rows: (provider_id, new_contact) pairs"""
+    return _write_many(writer, 'providers', 'Provider_ID', UPDATE_PROVIDER_CONTACT_SQL, rows, _value_then_id, 'update')
+
+@instrumented('crud')
+def update_receiver_contacts_many(writer, rows):
+    """rows: (receiver_id, new_contact) pairs"""
+    return _write_many(writer, 'receivers', 'Receiver_ID', UPDATE_RECEIVER_CONTACT_SQL, rows, _value_then_id, 'update')
+
+@instrumented('crud')
+def update_food_quantities_many(writer, rows):
+    """rows: (food_id, new_quantity) pairs"""
+    return _write_many(writer, 'food_listings', 'Food_ID', UPDATE_FOOD_QUANTITY_SQL, rows, _value_then_id, 'update')
+
+@instrumented('crud')
+def update_claim_status_many(writer, rows):
+    """rows: (claim_id, new_status) pairs.
+
+    Each transition settles its own reservation, so the rows are applied one
+    by one (each in a savepoint) rather than with executemany - still in a
+    single transaction.
+    """
+    rows = [tuple(row) for row in rows]
+    if not rows:
+        return []
+
+    def operation(conn):
+        outcomes, listings = [], []
+        for claim_id, new_status in rows:
+            conn.execute("SAVEPOINT write_row")
+            try:
+                food_id, quantity = transition_claim(conn, claim_id, new_status)
+                conn.execute("RELEASE write_row")
+            except (ClaimError, sqlite3.Error) as e:
+                conn.execute("ROLLBACK TO write_row")
+                conn.execute("RELEASE write_row")
+                outcomes.append({'id': claim_id, 'ok': False, 'message': str(e)})
+                continue
+            outcomes.append({'id': claim_id, 'ok': True, 'message': f"Claim_ID {claim_id} updated"})
+            if quantity is not None:
+                listings.append((food_id, quantity))
+        return outcomes, listings
+
+    outcomes, listings = writer.run(operation)
+    written = [row for row, outcome in zip(rows, outcomes) if outcome['ok']]
+    if written:
+        _written('claims', 'update', written)
+    if listings:
+        _written('food_listings', 'update', listings)
+    return outcomes
+
+@instrumented('crud')
+def delete_providers_many(writer, provider_ids):
+    return _write_many(writer, 'providers', 'Provider_ID', DELETE_PROVIDER_SQL, [(i,) for i in provider_ids], _id_only, 'delete')
+
+@instrumented('crud')
+def delete_receivers_many(writer, receiver_ids):
+    return _write_many(writer, 'receivers', 'Receiver_ID', DELETE_RECEIVER_SQL, [(i,) for i in receiver_ids], _id_only, 'delete')
+
+@instrumented('crud')
+def delete_food_listings_many(writer, food_ids):
+    return _write_many(writer, 'food_listings', 'Food_ID', DELETE_FOOD_LISTING_SQL, [(i,) for i in food_ids], _id_only, 'delete')
+
+@instrumented('crud')
+def delete_claims_many(writer, claim_ids):
+    return _write_many(writer, 'claims', 'Claim_ID', DELETE_CLAIM_SQL, [(i,) for i in claim_ids], _id_only, 'delete')
@@ -0,0 +1,79 @@
+"""Dashboard metrics served from the trigger-maintained ``stats`` table.
+
+The counters are kept up to date by triggers on the four base tables (see
+migration 3 in migrations.py). reconcile_stats() recomputes them from scratch
+to detect, and optionally repair, any drift.
+
+    python dashboard_stats.py [db_path] [--repair]
+"""
+import argparse
+import sqlite3
+
+from instrumentation import fetch_one
+
+
+STATS_COLUMNS = ['Total_Providers', 'Total_Receivers', 'Total_Food_Listings',
+                 'Total_Claims', 'Total_Quantity', 'Pending_Claims']
+
+# Full-scan recomputation, used only for reconciliation
+RECOMPUTE_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM providers) as Total_Providers,
+        (SELECT COUNT(*) FROM receivers) as Total_Receivers,
+        (SELECT COUNT(*) FROM food_listings) as Total_Food_Listings,
+        (SELECT COUNT(*) FROM claims) as Total_Claims,
+        (SELECT COALESCE(SUM(Quantity), 0) FROM food_listings) as Total_Quantity,
+        (SELECT COUNT(*) FROM claims WHERE Status = 'Pending') as Pending_Claims
+"""
+
+
+def read_stats(conn):
+    """Return all dashboard counters from the single stats row"""
+    row = fetch_one(conn, f"SELECT {', '.join(STATS_COLUMNS)} FROM stats WHERE Id = 1")
+    if row is None:
+        return dict.fromkeys(STATS_COLUMNS, 0)
+    return dict(zip(STATS_COLUMNS, row))
+
+
+def compute_stats(conn):
+    row = conn.execute(RECOMPUTE_SQL).fetchone()
+    return dict(zip(STATS_COLUMNS, row))
+
+
+def reconcile_stats(conn, repair=False):
+    """Compare the stats row with a full recount.
+
+    Returns {column: (stored, actual)} for every counter that drifted. With
+    repair=True the stats row is overwritten with the recounted values; the
+    caller is responsible for committing.
+    """
+    stored = read_stats(conn)
+    actual = compute_stats(conn)
+    drift = {col: (stored[col], actual[col]) for col in STATS_COLUMNS if stored[col] != actual[col]}
+
+    if repair:
+        assignments = ', '.join(f"{col} = ?" for col in STATS_COLUMNS)
+        conn.execute("INSERT OR IGNORE INTO stats (Id) VALUES (1)")
+        conn.execute(f"UPDATE stats SET {assignments} WHERE Id = 1", [actual[col] for col in STATS_COLUMNS])
+
+    return drift
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the dashboard stats table against a full recount")
+    parser.add_argument('db_path', nargs='?', default='food_management.db')
+    parser.add_argument('--repair', action='store_true', help="overwrite drifted counters with the recount")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.db_path)
+    drift = reconcile_stats(connection, repair=args.repair)
+    connection.commit()
+    connection.close()
+
+    if not drift:
+        print("✅ Stats table matches a full recount")
+    else:
+        for col, (stored, actual) in drift.items():
+            print(f"❌ {col}: stored {stored}, actual {actual}")
+        print("🔧 Stats repaired" if args.repair else "Run with --repair to fix")
+    raise SystemExit(1 if drift and not args.repair else 0)
@@ -0,0 +1,289 @@
+"""Connection management for food_management.db.
+
+All connections are opened through connect(), which applies the shared
+settings (WAL journal, busy timeout). Reads borrow a connection from a
+ConnectionPool; writes are queued to a single DatabaseWriter thread, which
+groups whatever is waiting into one short transaction.
+
+Listings and claims that archive.py has retired live in an archive database
+next to the main one. connect() attaches it as 'archive' when it exists and
+creates TEMP views all_food_listings and all_claims over the hot and
+archived rows, so history can be queried as one table, and
+all_claim_listings: every claim with its listing's columns. Read-write
+connections also get TEMP triggers that refuse to reuse an archived
+Food_ID or Claim_ID, or to claim an archived listing.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+
+from claims import run_immediate
+
+
+DB_PATH = 'food_management.db'
+BUSY_TIMEOUT_MS = 5000
+ARCHIVE_SCHEMA = 'archive'
+ARCHIVED_TABLES = ('food_listings', 'claims')
+
+# TEMP triggers can read the attached archive, which triggers in main can't
+ARCHIVED_ID_TRIGGERS = {
+    'archived_food_id': ('food_listings', 'food_listings', 'Food_ID', "Food_ID belongs to an archived listing"),
+    'archived_claim_id': ('claims', 'claims', 'Claim_ID', "Claim_ID belongs to an archived claim"),
+    'archived_claim_food_id': ('claims', 'food_listings', 'Food_ID', "Food_ID belongs to an archived listing"),
+}
+
+
+def archive_path(db_path):
+    """The archive database kept next to db_path: food_management.db -> food_management_archive.db"""
+    root, extension = os.path.splitext(db_path)
+    return f"{root}_archive{extension}"
+
+
+def drop_history_views(conn):
+    """Drop the all_* views and the archived ID triggers; SQLite won't rename or rebuild a table a view reads"""
+    for table in ARCHIVED_TABLES:
+        conn.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+    conn.execute("DROP VIEW IF EXISTS temp.all_claim_listings")
+    for trigger in ARCHIVED_ID_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS temp.{trigger}")
+
+
+def history_views(conn):
+    """(Re)create the TEMP views all_<table> over the hot rows and, if attached, the archived ones.
+
+    all_claim_listings left-joins each claim to its listing (NULL Listing_ID
+    when there is none) within each database. A listing and its claims are
+    archived together, and the archived ID triggers keep new claims off
+    archived listings, so that is the same as joining all_claims to
+    all_food_listings - without joining two UNION ALL views, which SQLite
+    can only do by scanning one of them for every row of the other.
+
+    On a read-write connection with the archive attached, also (re)create
+    the ARCHIVED_ID_TRIGGERS.
+    """
+    schemas = {row[1] for row in conn.execute("PRAGMA database_list")}
+    archived = set()
+    if ARCHIVE_SCHEMA in schemas:
+        archived = {row[0] for row in conn.execute(f"SELECT name FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table'")}
+    # query_only also blocks TEMP objects; the main file is read-only anyway
+    query_only = conn.execute("PRAGMA query_only").fetchone()[0]
+    conn.execute("PRAGMA query_only = OFF")
+    try:
+        drop_history_views(conn)
+        columns = {}
+        for table in ARCHIVED_TABLES:
+            # Generated columns (hidden 2 and 3) are selectable; hidden 1 columns aren't
+            columns[table] = [row[1] for row in conn.execute(f"PRAGMA main.table_xinfo({table})") if row[6] != 1]
+            if not columns[table]:
+                continue
+            selected = ', '.join(f'"{column}"' for column in columns[table])
+            query = f"SELECT {selected} FROM main.{table}"
+            if table in archived:
+                query += f" UNION ALL SELECT {selected} FROM {ARCHIVE_SCHEMA}.{table}"
+            conn.execute(f"CREATE TEMP VIEW all_{table} AS {query}")
+
+        if columns['claims'] and columns['food_listings']:
+            selected = ', '.join([f'c."{column}"' for column in columns['claims']] + ['fl.Food_ID AS Listing_ID'] +
+                                 [f'fl."{column}"' for column in columns['food_listings'] if column != 'Food_ID'])
+            joined = "SELECT {selected} FROM {schema}.claims c LEFT JOIN {schema}.food_listings fl ON fl.Food_ID = c.Food_ID"
+            query = joined.format(selected=selected, schema='main')
+            if set(ARCHIVED_TABLES) <= archived:
+                query += " UNION ALL " + joined.format(selected=selected, schema=ARCHIVE_SCHEMA)
+            conn.execute(f"CREATE TEMP VIEW all_claim_listings AS {query}")
+
+        if archived and not query_only:
+            for trigger, (table, archived_table, column, message) in ARCHIVED_ID_TRIGGERS.items():
+                if not columns[table] or archived_table not in archived:
+                    continue
+                conn.execute(f'''
+                    CREATE TEMP TRIGGER {trigger} BEFORE INSERT ON main.{table}
+                    WHEN EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.{archived_table} WHERE {column} = NEW.{column})
+                    BEGIN
+                        SELECT RAISE(ABORT, '{message}');
+                    END
+                ''')
+    finally:
+        conn.execute(f"PRAGMA query_only = {query_only}")
+
+
+def attach_archive(conn, create=False):
+    """Attach the archive database if it exists (or create=True); True if this call attached it.
+
+    Cheap once attached, so pooled connections check on every borrow and a
+    connection opened before the first archival picks the archive up then.
+    The caller recreates the views with history_views() after attaching.
+    """
+    schemas = {row[1]: row[2] for row in conn.execute("PRAGMA database_list")}
+    if ARCHIVE_SCHEMA in schemas or not schemas.get('main'):
+        return False
+    path = archive_path(schemas['main'])
+    if not create and not os.path.exists(path):
+        return False
+    if conn.execute("PRAGMA query_only").fetchone()[0]:
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (f"{Path(path).as_uri()}?mode=ro",))
+    else:
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+        conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.journal_mode = WAL")
+    return True
+
+
+def configure_connection(conn, read_only=False):
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        # journal_mode is persistent, but only a read-write connection can set it
+        conn.execute("PRAGMA journal_mode = WAL")
+    return conn
+
+
+def connect(db_path=DB_PATH, read_only=False, isolation_level=''):
+    if read_only:
+        uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=isolation_level)
+    else:
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=isolation_level)
+    configure_connection(conn, read_only=read_only)
+    attach_archive(conn)
+    history_views(conn)
+    return conn
+
+
+class ConnectionPool:
+    """Hands out read-only connections, at most max_size at a time"""
+
+    def __init__(self, db_path=DB_PATH, max_size=8, timeout=30):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No reader connection available after {self.timeout}s")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = connect(self.db_path, read_only=True)
+            else:
+                if attach_archive(conn):
+                    history_views(conn)
+            try:
+                yield conn
+            finally:
+                # Don't hand the next borrower a stale read snapshot
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class DatabaseWriter:
+    """Single thread that owns the only read-write connection.
+
+    Callers submit write operations - functions taking the connection - and
+    get a Future back. The writer drains up to max_batch queued operations
+    into one transaction. Each operation runs inside its own savepoint, so a
+    failing operation is rolled back and reported to its caller without
+    affecting the rest of the batch.
+    """
+
+    def __init__(self, db_path=DB_PATH, max_batch=64):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self.conn = connect(db_path, isolation_level=None)
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, operation):
+        """Queue operation(conn); returns a Future with its result or exception"""
+        future = Future()
+        self._queue.put((operation, future))
+        return future
+
+    def run(self, operation, timeout=None):
+        """Queue operation(conn) and wait for its committed result"""
+        return self.submit(operation).result(timeout=timeout)
+
+    def execute(self, sql, params=(), timeout=None):
+        """Run one write statement and return the number of rows it changed"""
+        return self.run(lambda conn: conn.execute(sql, params).rowcount, timeout=timeout)
+
+    def executemany(self, sql, seq_of_params, timeout=None):
+        return self.run(lambda conn: conn.executemany(sql, seq_of_params).rowcount, timeout=timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            # None is the shutdown sentinel; finish whatever was queued with it
+            operations = [item for item in batch if item is not None]
+            if operations:
+                self._write_batch(operations)
+            if len(operations) < len(batch):
+                break
+
+    def _write_batch(self, batch):
+        batch = [(operation, future) for operation, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            # The archive may have been created since the writer connected
+            if attach_archive(self.conn):
+                history_views(self.conn)
+            # Retried as a whole while the database is locked; a retry rolls
+            # back and re-runs every operation, so only the last pass counts
+            outcomes = run_immediate(self.conn, lambda conn: self._apply(conn, batch))
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in the batch was written
+            for operation, future in batch:
+                future.set_exception(e)
+            return
+
+        # Results are only released once the transaction is durable
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _apply(self, conn, batch):
+        outcomes = []
+        for operation, future in batch:
+            conn.execute("SAVEPOINT write_op")
+            try:
+                outcomes.append((future, operation(conn), None))
+                conn.execute("RELEASE write_op")
+            except Exception as e:
+                conn.execute("ROLLBACK TO write_op")
+                conn.execute("RELEASE write_op")
+                outcomes.append((future, None, e))
+        return outcomes
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self.conn.close()
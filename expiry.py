@@ -0,0 +1,74 @@
+"""Near-expiry lookups on the indexed Expiry_Day column.
+
+Expiry_Day (migration 5) is the expiry date as days since 1970-01-01. The
+query narrows candidates with a range on that index, then applies the exact
+"expires within N days from now" test only to those rows.
+"""
+from instrumentation import fetch_one, read_sql
+
+
+# julianday() of 1970-01-01, to turn julian days into epoch days
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+def near_expiry_query(days=7, city=None, food_type=None, limit=None):
+    """Return (sql, params) for listings expiring in the next `days` days.
+
+    days is inlined as an integer so the default query is a constant string;
+    the optional filters are bound parameters.
+    """
+    days = int(days)
+    conditions = [
+        f"fl.Expiry_Day BETWEEN CAST(julianday('now') - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)"
+        f" AND CAST(julianday('now') - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER) + {days}",
+        f"julianday(fl.Expiry_Date) - julianday('now') BETWEEN 0 AND {days}",
+    ]
+    params = []
+    if city is not None:
+        conditions.append("fl.Location = ?")
+        params.append(city)
+    if food_type is not None:
+        conditions.append("fl.Food_Type = ?")
+        params.append(food_type)
+
+    query = f"""
+    SELECT 
+        fl.Food_Name,
+        fl.Food_Type,
+        fl.Meal_Type,
+        fl.Quantity,
+        fl.Expiry_Date,
+        fl.Location,
+        p.Name as Provider_Name,
+        p.Contact as Provider_Contact,
+        julianday(fl.Expiry_Date) - julianday('now') as Days_Until_Expiry
+    FROM food_listings fl
+    JOIN providers p ON fl.Provider_ID = p.Provider_ID
+    WHERE {' AND '.join(conditions)}
+    ORDER BY fl.Expiry_Day ASC, Days_Until_Expiry ASC"""
+    if limit is not None:
+        query += "\n    LIMIT ?"
+        params.append(int(limit))
+    return query + ";\n    ", params
+
+
+def near_expiry(conn, days=7, city=None, food_type=None, limit=None):
+    """Listings expiring within `days` days, soonest first, as a DataFrame"""
+    query, params = near_expiry_query(days, city, food_type, limit)
+    return read_sql(query, conn, params=params)
+
+
+def count_near_expiry(conn, days=7, city=None):
+    """Number of listings expiring within `days` days (an index range count)"""
+    days = int(days)
+    query = f"""
+        SELECT COUNT(*) FROM food_listings
+        WHERE Expiry_Day BETWEEN CAST(julianday('now') - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)
+                             AND CAST(julianday('now') - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER) + {days}
+          AND julianday(Expiry_Date) - julianday('now') BETWEEN 0 AND {days}
+    """
+    params = []
+    if city is not None:
+        query += " AND Location = ?"
+        params.append(city)
+    return fetch_one(conn, query, params)[0]
@@ -0,0 +1,91 @@
+"""Cache of serialized Plotly figures, invalidated by a data version.
+
+Building a figure with plotly express costs about as much as running its
+query. Figures are stored as JSON under (chart id, data version, theme),
+where the theme is the Plotly template the figure was built with, so a
+write or a template change makes older entries unreachable and they age
+out through LRU eviction.
+
+Take the key before reading the chart's data: if a write lands in between,
+the figure is stored under the older version and is simply never hit.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+from query_cache import data_version
+
+
+class FigureCache:
+    """LRU cache of figure JSON, bounded by entry count and total JSON size"""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, version_source=data_version):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.version_source = version_source
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, chart_id, theme=None):
+        if theme is None:
+            import plotly.io as pio
+            theme = pio.templates.default
+        return (chart_id, self.version_source(), theme)
+
+    def get(self, key):
+        """The cached figures for key, rebuilt from JSON, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            payloads = entry[0]
+        import plotly.graph_objects as go
+        # The JSON came from valid figures; skipping validation is what makes a hit cheap
+        return [go.Figure(json.loads(payload), _validate=False) for payload in payloads]
+
+    def put(self, key, figures):
+        payloads = [figure.to_json() for figure in figures]
+        size = sum(len(payload) for payload in payloads)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (payloads, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def figures(self, key, build):
+        """Cached figures for key, or build() (a list of figures), cached"""
+        figures = self.get(key)
+        if figures is None:
+            figures = build()
+            self.put(key, figures)
+        return figures
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
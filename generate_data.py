@@ -0,0 +1,256 @@
+"""Seeded synthetic data at any scale, in the schema of the bundled CSVs.
+
+Scale 1 is the size of the bundled data (1,000 rows per table); scale 100
+gives 100,000 rows per table and scale 10000 ten million. The distributions
+follow the real data where it has them and production where it doesn't:
+
+- city sizes are Zipfian, shared by providers and receivers, so a few large
+  cities hold much of the data,
+- provider activity is Zipfian: most providers post one listing or none, a
+  few post dozens to thousands; a listing's Location and Provider_Type are its
+  provider's,
+- expiry dates are spread around "now", most in the coming days and some
+  already past,
+- claims mostly go to receivers in the listing's city, in the real Status
+  mix, and reserve their Claimed_Quantity from the listing the way
+  claims.py does, so listings are never over-allocated.
+
+Rows are generated with numpy in batches and written with executemany into a
+database created by migrate(); every foreign key points at an existing row.
+
+    python generate_data.py --scale 100 --db food_management_x100.db
+    python generate_data.py --scale 10000 --db big.db --seed 7
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from database import connect
+from migrations import migrate
+
+
+ROWS_PER_SCALE = 1000
+BATCH_SIZE = 50000
+
+PROVIDER_TYPES = ['Restaurant', 'Grocery Store', 'Supermarket', 'Catering Service']
+RECEIVER_TYPES = ['NGO', 'Shelter', 'Charity', 'Individual']
+FOOD_NAMES = ['Bread', 'Chicken', 'Dairy', 'Fish', 'Fruits', 'Pasta', 'Rice', 'Salad', 'Soup', 'Vegetables']
+FOOD_TYPES = ['Vegetarian', 'Non-Vegetarian', 'Vegan']
+MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner', 'Snacks']
+# Status mix of the bundled claims_data.csv
+CLAIM_STATUSES = {'Completed': 0.339, 'Cancelled': 0.336, 'Pending': 0.325}
+
+CITY_PREFIXES = ['', 'North ', 'South ', 'East ', 'West ', 'New ', 'Port ', 'Lake ', 'Mount ', 'Fort ']
+CITY_ROOTS = ['Ash', 'Bel', 'Cedar', 'Clay', 'Elm', 'Fair', 'Glen', 'Green', 'Hill', 'Iron', 'King', 'Lin',
+              'Maple', 'Mill', 'Oak', 'Pine', 'Red', 'River', 'Rock', 'Rose', 'Salt', 'Silver', 'Spring',
+              'Stone', 'Sun', 'Water', 'White', 'Wil', 'Wind', 'Wood']
+CITY_SUFFIXES = ['ville', 'ton', 'burg', 'field', 'port', 'wood', 'haven', 'dale', 'chester', 'ford']
+SURNAMES = ['Smith', 'Johnson', 'Garcia', 'Miller', 'Davis', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Moore',
+            'Martin', 'Lee', 'Walker', 'Hall', 'Young', 'King', 'Wright', 'Scott', 'Green', 'Baker', 'Nguyen',
+            'Hill', 'Flores', 'Adams', 'Nelson', 'Carter', 'Mitchell', 'Roberts', 'Turner', 'Phillips']
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'William', 'Susan', 'Richard', 'Jessica', 'Joseph', 'Sarah', 'Carlos', 'Maria', 'Wei', 'Aisha']
+STREETS = ['Main St', 'Oak Ave', 'Park Rd', 'Market St', 'Church Ln', 'Station Rd', 'High St', 'Mill Rd']
+
+
+def city_names(count):
+    names = [f"{prefix}{root}{suffix}" for prefix in CITY_PREFIXES for root in CITY_ROOTS for suffix in CITY_SUFFIXES]
+    # Past the combinations, number the repeats
+    return [names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else '') for i in range(count)]
+
+
+def zipf_weights(count, exponent):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def phone(rng, size):
+    digits = rng.integers(0, 10 ** 7, size=size)
+    areas = rng.integers(200, 1000, size=size)
+    return [f"+1-{a}-{d // 10000:03d}-{d % 10000:04d}" for a, d in zip(areas, digits)]
+
+
+def insert_batches(conn, sql, batches):
+    """executemany each batch of rows in its own transaction; returns the row count"""
+    total = 0
+    for rows in batches:
+        conn.execute("BEGIN")
+        conn.executemany(sql, rows)
+        conn.execute("COMMIT")
+        total += len(rows)
+    return total
+
+
+def generate_database(path, scale=1, seed=42, cities=None, now=None, batch_size=BATCH_SIZE, log=print):
+    """Create path (which must not exist) and fill it; returns {table: rows}"""
+    rng = np.random.default_rng(seed)
+    now = now or datetime.now().replace(microsecond=0)
+    n = max(1, int(round(ROWS_PER_SCALE * scale)))
+    n_cities = cities or max(20, int(200 * scale ** 0.6))
+    city = city_names(n_cities)
+    # Larger cities are shuffled through the list so ranks don't follow the names
+    city_p = zipf_weights(n_cities, 1.0)[rng.permutation(n_cities)]
+
+    conn = connect(path, isolation_level=None)
+    migrate(conn)
+    # A fresh, regenerable file: durability during the load isn't needed
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -262144")
+    counts = {}
+
+    # Providers
+    provider_city = rng.choice(n_cities, size=n, p=city_p).astype(np.int32)
+    provider_type = rng.integers(0, len(PROVIDER_TYPES), size=n).astype(np.int8)
+
+    def provider_batches():
+        for start in range(0, n, batch_size):
+            stop = min(n, start + batch_size)
+            names = rng.integers(0, len(SURNAMES), size=(stop - start, 2))
+            numbers = rng.integers(1, 99999, size=stop - start)
+            contacts = phone(rng, stop - start)
+            yield [
+                (i + 1, f"{SURNAMES[a]}-{SURNAMES[b]} {PROVIDER_TYPES[provider_type[i]]}",
+                 PROVIDER_TYPES[provider_type[i]], f"{numbers[k]} {STREETS[numbers[k] % len(STREETS)]}, {city[provider_city[i]]}",
+                 city[provider_city[i]], contacts[k])
+                for k, (i, (a, b)) in enumerate(zip(range(start, stop), names))
+            ]
+
+    counts['providers'] = insert_batches(
+        conn, "INSERT INTO providers (Provider_ID, Name, Type, Address, City, Contact) VALUES (?, ?, ?, ?, ?, ?)",
+        provider_batches())
+    log(f"✅ providers: {counts['providers']:,}")
+
+    # Receivers, grouped by city so a claim can pick one from the listing's city
+    receiver_city = rng.choice(n_cities, size=n, p=city_p).astype(np.int32)
+    receivers_by_city = np.argsort(receiver_city, kind='stable').astype(np.int64) + 1
+    receivers_in_city = np.bincount(receiver_city, minlength=n_cities)
+    first_receiver = np.concatenate(([0], np.cumsum(receivers_in_city)[:-1]))
+
+    def receiver_batches():
+        for start in range(0, n, batch_size):
+            stop = min(n, start + batch_size)
+            names = rng.integers(0, [len(FIRST_NAMES), len(SURNAMES)], size=(stop - start, 2))
+            types = rng.integers(0, len(RECEIVER_TYPES), size=stop - start)
+            contacts = phone(rng, stop - start)
+            yield [
+                (i + 1, f"{FIRST_NAMES[f]} {SURNAMES[s]}", RECEIVER_TYPES[types[k]], city[receiver_city[i]], contacts[k])
+                for k, (i, (f, s)) in enumerate(zip(range(start, stop), names))
+            ]
+
+    counts['receivers'] = insert_batches(
+        conn, "INSERT INTO receivers (Receiver_ID, Name, Type, City, Contact) VALUES (?, ?, ?, ?, ?)",
+        receiver_batches())
+    log(f"✅ receivers: {counts['receivers']:,}")
+
+    # Food listings: Zipfian provider activity
+    provider_p = zipf_weights(n, 0.7)[rng.permutation(n)]
+    listing_provider = rng.choice(n, size=n, p=provider_p).astype(np.int32)
+    listing_quantity = rng.integers(1, 51, size=n).astype(np.int16)
+    remaining = listing_quantity.copy()
+
+    # Claims are drawn before the listings are written, so each listing is
+    # stored with its quantity net of what its claims reserved
+    claim_food = rng.integers(0, n, size=n)
+    claim_city = provider_city[listing_provider[claim_food]]
+    local = (rng.random(n) < 0.8) & (receivers_in_city[claim_city] > 0)
+    offsets = (rng.random(n) * receivers_in_city[claim_city]).astype(np.int64)
+    claim_receiver = np.where(local, receivers_by_city[np.minimum(first_receiver[claim_city] + offsets, n - 1)],
+                              rng.integers(1, n + 1, size=n))
+    statuses = list(CLAIM_STATUSES)
+    claim_status = rng.choice(len(statuses), size=n, p=list(CLAIM_STATUSES.values())).astype(np.int8)
+    # 1-5 units, never more than the listing had to begin with
+    claim_quantity = (1 + rng.random(n) * np.minimum(5, listing_quantity[claim_food])).astype(np.int16)
+
+    # Reserve in claim order: a claim that no longer fits is cancelled
+    cancelled = statuses.index('Cancelled')
+    for start in range(0, n, batch_size):
+        chunk = slice(start, min(n, start + batch_size))
+        foods = claim_food[chunk]
+        reserving = np.where(claim_status[chunk] != cancelled, claim_quantity[chunk], 0)
+        order = np.argsort(foods, kind='stable')
+        sorted_foods, sorted_q = foods[order], reserving[order]
+        running = np.cumsum(sorted_q)
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_foods)) + 1]
+        before_group = np.repeat(running[group_start] - sorted_q[group_start], np.diff(np.r_[group_start, len(order)]))
+        fits = (running - before_group) <= remaining[sorted_foods]
+        rejected = order[~fits & (sorted_q > 0)]
+        claim_status[chunk][rejected] = cancelled
+        np.subtract.at(remaining, sorted_foods[fits], sorted_q[fits].astype(np.int16))
+
+    expiry_offsets = np.clip(rng.normal(3, 5, size=n), -14, 30).astype(np.int32)
+    today = now.replace(hour=0, minute=0, second=0)
+
+    def listing_batches():
+        for start in range(0, n, batch_size):
+            stop = min(n, start + batch_size)
+            names = rng.integers(0, len(FOOD_NAMES), size=stop - start)
+            types = rng.integers(0, len(FOOD_TYPES), size=stop - start)
+            meals = rng.integers(0, len(MEAL_TYPES), size=stop - start)
+            rows = []
+            for k, i in enumerate(range(start, stop)):
+                provider = listing_provider[i]
+                rows.append((
+                    i + 1, FOOD_NAMES[names[k]], int(remaining[i]),
+                    (today + timedelta(days=int(expiry_offsets[i]))).strftime('%Y-%m-%d %H:%M:%S'),
+                    int(provider) + 1, PROVIDER_TYPES[provider_type[provider]], city[provider_city[provider]],
+                    FOOD_TYPES[types[k]], MEAL_TYPES[meals[k]],
+                ))
+            yield rows
+
+    counts['food_listings'] = insert_batches(
+        conn, '''INSERT INTO food_listings (Food_ID, Food_Name, Quantity, Expiry_Date, Provider_ID, Provider_Type,
+                 Location, Food_Type, Meal_Type) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        listing_batches())
+    log(f"✅ food_listings: {counts['food_listings']:,}")
+
+    # Claim times: the last 30 days, in claim order
+    claim_seconds = np.sort(rng.integers(0, 30 * 24 * 3600, size=n))[::-1]
+
+    def claim_batches():
+        for start in range(0, n, batch_size):
+            stop = min(n, start + batch_size)
+            yield [
+                (i + 1, int(claim_food[i]) + 1, int(claim_receiver[i]), statuses[claim_status[i]],
+                 (now - timedelta(seconds=int(claim_seconds[i]))).strftime('%Y-%m-%d %H:%M:%S'), int(claim_quantity[i]))
+                for i in range(start, stop)
+            ]
+
+    counts['claims'] = insert_batches(
+        conn, '''INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity)
+                 VALUES (?, ?, ?, ?, ?, ?)''',
+        claim_batches())
+    log(f"✅ claims: {counts['claims']:,}")
+
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic food management database")
+    parser.add_argument('--db', default='generated_food_management.db', help="database file to create")
+    parser.add_argument('--scale', type=float, default=1, help="1 = the bundled data's size (1,000 rows per table)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cities', type=int, help="number of cities (default grows with the scale)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--force', action='store_true', help="replace the database file if it exists")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.db):
+        if not args.force:
+            parser.error(f"{args.db} already exists (use --force to replace it)")
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+
+    start = time.perf_counter()
+    counts = generate_database(args.db, args.scale, args.seed, args.cities, batch_size=args.batch_size)
+    print(f"✅ {sum(counts.values()):,} rows written to {args.db} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""Streaming CSV ingest into food_management.db.
+
+Replaces the notebook's ``clean_data`` + ``to_sql(if_exists='replace')``
+loader. Each CSV is read in fixed-size chunks, so memory use does not grow
+with the file. For each chunk the loader:
+
+- normalizes M/D/YYYY dates to ISO,
+- fills missing values the way clean_data() did, and rejects negative
+  quantities and IDs,
+- rejects rows whose foreign keys don't exist, and listings and claims
+  whose ID an archived row already has (checked for the whole chunk at once),
+- upserts the rest with executemany,
+
+and commits the chunk together with its progress record. An interrupted
+run resumes after the last committed chunk. The schema comes from
+migrations.py and is never dropped.
+
+    python ingest.py                              # the four bundled CSVs
+    python ingest.py --db partner.db claims=claims_dump.csv --chunk-size 50000
+"""
+import argparse
+import csv
+import os
+from collections import Counter
+from datetime import datetime
+
+from database import ARCHIVE_SCHEMA, ARCHIVED_TABLES, DB_PATH, connect
+from migrations import TABLE_COLUMNS, migrate
+
+
+CHUNK_SIZE = 10000
+
+# Load order matters: a table's foreign keys must already be loaded
+DEFAULT_SOURCES = [
+    ('providers', 'providers_data.csv'),
+    ('receivers', 'receivers_data.csv'),
+    ('food_listings', 'food_listings_data.csv'),
+    ('claims', 'claims_data.csv'),
+]
+
+INTEGER_COLUMNS = {'Provider_ID', 'Receiver_ID', 'Food_ID', 'Claim_ID', 'Quantity'}
+DATE_COLUMNS = {'Expiry_Date', 'Timestamp'}
+
+FOREIGN_KEYS = {
+    'food_listings': {'Provider_ID': ('providers', 'Provider_ID')},
+    'claims': {'Food_ID': ('food_listings', 'Food_ID'), 'Receiver_ID': ('receivers', 'Receiver_ID')},
+}
+
+DATE_FORMATS = ['%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y',
+                '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d']
+
+
+class RejectedRow(ValueError):
+    """A row that can't be loaded; the message is the reason it is counted under"""
+
+
+def normalize_date(value):
+    """Parse any of DATE_FORMATS into 'YYYY-MM-DD HH:MM:SS'"""
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    raise ValueError(f"unparseable date {value!r}")
+
+
+def clean_row(row, columns):
+    """Return the row as a tuple in column order, or raise RejectedRow"""
+    values = []
+    for column in columns:
+        value = row.get(column)
+        value = value.strip() if value is not None else ''
+        if column in DATE_COLUMNS:
+            try:
+                values.append(normalize_date(value) if value else None)
+            except ValueError:
+                raise RejectedRow(f"unparseable {column}")
+        elif column in INTEGER_COLUMNS:
+            if not value:
+                # clean_data() filled missing numbers with 0, but an ID can't be defaulted
+                if column == columns[0] or column.endswith('_ID'):
+                    raise RejectedRow(f"missing {column}")
+                values.append(0)
+                continue
+            try:
+                number = int(float(value))
+            except ValueError:
+                raise RejectedRow(f"non-numeric {column}")
+            if number < 0:
+                raise RejectedRow(f"negative {column}")
+            values.append(number)
+        else:
+            values.append(value or 'Unknown')
+    return tuple(values)
+
+
+def read_chunks(path, chunk_size, skip=0):
+    """Yield lists of CSV rows (dicts), chunk_size at a time, after skipping skip rows"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        chunk = []
+        for i, row in enumerate(reader):
+            if i < skip:
+                continue
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def ensure_progress_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ingest_progress (
+            Source TEXT PRIMARY KEY,
+            Table_Name TEXT NOT NULL,
+            File_Size INTEGER NOT NULL,
+            File_Mtime REAL NOT NULL,
+            Rows_Done INTEGER NOT NULL,
+            Completed INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+
+def missing_foreign_keys(conn, table, rows, columns):
+    """Set-wise FK check: return {column: set of ids absent from the parent table}"""
+    missing = {}
+    for column, (parent, parent_key) in FOREIGN_KEYS.get(table, {}).items():
+        index = columns.index(column)
+        ids = {row[index] for row in rows}
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS ingest_ids (Id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM ingest_ids")
+        conn.executemany("INSERT INTO ingest_ids (Id) VALUES (?)", ((i,) for i in ids))
+        absent = conn.execute(f'''
+            SELECT i.Id FROM ingest_ids i
+            WHERE NOT EXISTS (SELECT 1 FROM {parent} p WHERE p.{parent_key} = i.Id)
+        ''').fetchall()
+        missing[column] = {r[0] for r in absent}
+    return missing
+
+
+def archived_keys(conn, table, rows, columns):
+    """Set-wise check: the row ids already used by archived rows, which aren't reused"""
+    schemas = {row[1] for row in conn.execute("PRAGMA database_list")}
+    if table not in ARCHIVED_TABLES or ARCHIVE_SCHEMA not in schemas or not conn.execute(
+            f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+        return set()
+    key = columns[0]
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS ingest_ids (Id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM ingest_ids")
+    conn.executemany("INSERT INTO ingest_ids (Id) VALUES (?)", ((row[0],) for row in rows))
+    taken = conn.execute(f'''
+        SELECT i.Id FROM ingest_ids i
+        WHERE EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.{table} a WHERE a.{key} = i.Id)
+    ''').fetchall()
+    return {r[0] for r in taken}
+
+
+def upsert_sql(table, columns):
+    key = columns[0]
+    placeholders = ', '.join('?' for _ in columns)
+    updates = ', '.join(f"{col} = excluded.{col}" for col in columns[1:])
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT({key}) DO UPDATE SET {updates}")
+
+
+def ingest_csv(conn, table, path, chunk_size=CHUNK_SIZE, resume=True):
+    """Load one CSV into table; returns a summary dict.
+
+    conn must be in autocommit mode (isolation_level=None); every chunk is
+    committed in its own transaction together with its progress record.
+    """
+    columns = TABLE_COLUMNS[table]
+    source = os.path.abspath(path)
+    stat = os.stat(path)
+    ensure_progress_table(conn)
+
+    skip = 0
+    progress = conn.execute(
+        "SELECT File_Size, File_Mtime, Rows_Done, Completed FROM ingest_progress WHERE Source = ?", (source,)
+    ).fetchone()
+    # Only resume if it is the same file as last time
+    if resume and progress and progress[:2] == (stat.st_size, stat.st_mtime):
+        if progress[3]:
+            return {'table': table, 'source': path, 'inserted': 0, 'rejected': 0,
+                    'reasons': Counter(), 'skipped': progress[2], 'already_done': True}
+        skip = progress[2]
+
+    sql = upsert_sql(table, columns)
+    loaded = rejected = 0
+    reasons = Counter()
+    rows_done = skip
+
+    for chunk in read_chunks(path, chunk_size, skip=skip):
+        rows = []
+        for raw in chunk:
+            try:
+                rows.append(clean_row(raw, columns))
+            except RejectedRow as e:
+                reasons[str(e)] += 1
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            missing = missing_foreign_keys(conn, table, rows, columns)
+            if any(missing.values()):
+                valid = []
+                for row in rows:
+                    bad = [col for col, ids in missing.items() if row[columns.index(col)] in ids]
+                    if bad:
+                        reasons[f"unknown {bad[0]}"] += 1
+                    else:
+                        valid.append(row)
+                rows = valid
+            archived = archived_keys(conn, table, rows, columns)
+            if archived:
+                reasons[f"archived {columns[0]}"] += sum(1 for row in rows if row[0] in archived)
+                rows = [row for row in rows if row[0] not in archived]
+
+            conn.executemany(sql, rows)
+            rows_done += len(chunk)
+            conn.execute('''
+                INSERT INTO ingest_progress (Source, Table_Name, File_Size, File_Mtime, Rows_Done, Completed)
+                VALUES (?, ?, ?, ?, ?, 0)
+                ON CONFLICT(Source) DO UPDATE SET
+                    Table_Name = excluded.Table_Name, File_Size = excluded.File_Size,
+                    File_Mtime = excluded.File_Mtime, Rows_Done = excluded.Rows_Done, Completed = 0
+            ''', (source, table, stat.st_size, stat.st_mtime, rows_done))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        loaded += len(rows)
+        rejected += len(chunk) - len(rows)
+
+    conn.execute('''
+        INSERT INTO ingest_progress (Source, Table_Name, File_Size, File_Mtime, Rows_Done, Completed)
+        VALUES (?, ?, ?, ?, ?, 1)
+        ON CONFLICT(Source) DO UPDATE SET Rows_Done = excluded.Rows_Done, Completed = 1,
+            File_Size = excluded.File_Size, File_Mtime = excluded.File_Mtime
+    ''', (source, table, stat.st_size, stat.st_mtime, rows_done))
+
+    return {'table': table, 'source': path, 'inserted': loaded, 'rejected': rejected,
+            'reasons': reasons, 'skipped': skip, 'already_done': False}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream CSV files into the food management database")
+    parser.add_argument('sources', nargs='*', metavar='TABLE=CSV',
+                        help="table/file pairs in load order (default: the four bundled CSVs)")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--restart', action='store_true', help="ignore saved progress and load files from the start")
+    args = parser.parse_args(argv)
+
+    sources = [tuple(s.split('=', 1)) for s in args.sources] or DEFAULT_SOURCES
+    for table, _ in sources:
+        if table not in TABLE_COLUMNS:
+            parser.error(f"unknown table {table!r}")
+
+    conn = connect(args.db, isolation_level=None)
+    migrate(conn)
+    try:
+        for table, path in sources:
+            result = ingest_csv(conn, table, path, chunk_size=args.chunk_size, resume=not args.restart)
+            if result['already_done']:
+                print(f"⏭️ {table}: {path} already loaded ({result['skipped']} rows)")
+                continue
+            resumed = f", resumed after {result['skipped']} rows" if result['skipped'] else ""
+            print(f"✅ {table}: {result['inserted']} rows upserted, {result['rejected']} rejected{resumed}")
+            for reason, count in result['reasons'].most_common():
+                print(f"   ❌ {reason}: {count}")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
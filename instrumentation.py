@@ -0,0 +1,169 @@
+"""Timing records for every SQL statement, CRUD call and page render.
+
+Reads go through read_sql() / fetch_all() / fetch_one() and CRUD helpers are
+wrapped with @instrumented('crud'); each call appends one record (duration,
+row count, error) to a process-wide ring buffer. From the buffer:
+
+- summary() aggregates count, failures and p50/p95/p99 per statement,
+- calls slower than the slow threshold are also kept in a slow log and
+  logged as warnings.
+
+The Performance page (views/performance.py) shows both.
+"""
+import functools
+import logging
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+RING_SIZE = 5000
+SLOW_LOG_SIZE = 200
+SLOW_THRESHOLD_MS = 200.0
+
+Record = namedtuple('Record', 'started_at kind name duration_ms rows error sql')
+
+
+def statement_name(sql):
+    """Short label for a statement: its first 80 characters, whitespace collapsed"""
+    text = re.sub(r'\s+', ' ', sql).strip()
+    return text if len(text) <= 80 else text[:77] + '...'
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(-(-q * len(sorted_values) // 1)) - 1))
+    return sorted_values[rank]
+
+
+class PerformanceLog:
+    """Thread-safe ring buffer of call records plus a log of the slow ones"""
+
+    def __init__(self, capacity=RING_SIZE, slow_threshold_ms=SLOW_THRESHOLD_MS, slow_log_size=SLOW_LOG_SIZE):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._records = deque(maxlen=capacity)
+        self._slow = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, kind, name, duration_ms, rows=None, error=None, sql=None):
+        record = Record(time.time(), kind, name, duration_ms, rows, error, sql)
+        with self._lock:
+            self._records.append(record)
+            self.total += 1
+            slow = duration_ms >= self.slow_threshold_ms
+            if slow:
+                self._slow.append(record)
+        if slow:
+            logger.warning("Slow %s (%.1f ms): %s", kind, duration_ms, name)
+        return record
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def slow_log(self):
+        """Slow calls, most recent first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def summary(self):
+        """One row per (kind, name): count, failures and latency percentiles in ms"""
+        groups = {}
+        for record in self.records():
+            groups.setdefault((record.kind, record.name), []).append(record)
+        rows = []
+        for (kind, name), records in groups.items():
+            durations = sorted(r.duration_ms for r in records)
+            rows.append({
+                'Kind': kind,
+                'Name': name,
+                'Calls': len(records),
+                'Errors': sum(1 for r in records if r.error),
+                'p50 (ms)': percentile(durations, 0.50),
+                'p95 (ms)': percentile(durations, 0.95),
+                'p99 (ms)': percentile(durations, 0.99),
+                'Max (ms)': durations[-1],
+                'Rows (last)': records[-1].rows,
+            })
+        rows.sort(key=lambda row: row['p95 (ms)'], reverse=True)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._slow.clear()
+            self.total = 0
+
+
+# Shared by every session and thread in the process
+performance_log = PerformanceLog()
+
+
+@contextmanager
+def timed(kind, name, sql=None):
+    """Record the duration of the block; set result['rows'] inside it to record a row count.
+
+    An exception is recorded as the call's error and re-raised.
+    """
+    result = {'rows': None}
+    start = time.perf_counter()
+    try:
+        yield result
+    except Exception as e:
+        performance_log.record(kind, name, (time.perf_counter() - start) * 1000, result['rows'],
+                               f"{type(e).__name__}: {e}", sql)
+        raise
+    performance_log.record(kind, name, (time.perf_counter() - start) * 1000, result['rows'], None, sql)
+
+
+def read_sql(query, conn, params=None, name=None):
+    """pd.read_sql_query, recorded"""
+    with timed('sql', name or statement_name(query), query) as result:
+        df = pd.read_sql_query(query, conn, params=params)
+        result['rows'] = len(df)
+    return df
+
+
+def fetch_all(conn, query, params=(), name=None):
+    """conn.execute(query, params).fetchall(), recorded"""
+    with timed('sql', name or statement_name(query), query) as result:
+        rows = conn.execute(query, params).fetchall()
+        result['rows'] = len(rows)
+    return rows
+
+
+def fetch_one(conn, query, params=(), name=None):
+    """conn.execute(query, params).fetchone(), recorded"""
+    with timed('sql', name or statement_name(query), query) as result:
+        row = conn.execute(query, params).fetchone()
+        result['rows'] = 0 if row is None else 1
+    return row
+
+
+def instrumented(kind):
+    """Decorator recording each call of the function under its name.
+
+    A list result (the *_many helpers' outcomes) is recorded as its number
+    of successful rows; anything else as one row.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(kind, function.__name__) as result:
+                value = function(*args, **kwargs)
+                if isinstance(value, list):
+                    result['rows'] = sum(1 for outcome in value if not isinstance(outcome, dict) or outcome.get('ok'))
+                else:
+                    result['rows'] = 1
+            return value
+        return wrapper
+    return decorate
@@ -0,0 +1,266 @@
+"""Top receiver and provider leaderboards served from trigger-maintained totals.
+
+receiver_leaderboard and provider_leaderboard hold one row per receiver and
+provider with their running totals: completed claims and the quantity of
+the claimed listings, plus listings and quantity donated for providers.
+receiver_leaderboard_daily and provider_leaderboard_daily split the claim
+totals by the day of the claim, for time windows. Triggers on all four base
+tables (migration 10) keep them current, so a top-N read walks an index on
+the ranked total instead of joining and sorting the claims history.
+
+As in Queries 4, 9 and 13, a claim counts only if it is Completed and its
+listing exists. Its quantity is the Claimed_Quantity it reserved, or, for
+claims recorded before reservations (Claimed_Quantity 0), the listing's
+current Quantity. Listings have no date, so donations can't be windowed.
+
+Listings and claims moved to the archive (archive.py) keep counting.
+reconcile_leaderboards() recounts all four tables from the hot and archived
+rows (all_claim_listings) to detect, and optionally repair, any drift.
+
+    python leaderboards.py [db_path] [--repair]
+"""
+import argparse
+
+from database import attach_archive, connect, history_views
+
+
+def claimed_quantity(claim='c', listing='fl'):
+    """Quantity one claim counts for, given the aliases of the claim and its listing"""
+    return f"COALESCE(NULLIF({claim}.Claimed_Quantity, 0), {listing}.Quantity)"
+
+
+CLAIMED_QUANTITY = claimed_quantity()
+
+# Totals of one receiver / provider, from the hot base tables; the triggers add
+# a row with these when a receiver or provider is inserted. CROSS JOIN keeps
+# SQLite from driving the claim subqueries from every completed claim
+RECEIVER_TOTALS_SQL = f"""
+    SELECT r.Receiver_ID,
+           (SELECT COUNT(*) FROM claims c CROSS JOIN food_listings fl ON fl.Food_ID = c.Food_ID
+            WHERE c.Receiver_ID = r.Receiver_ID AND c.Status = 'Completed') as Completed_Claims,
+           (SELECT COALESCE(SUM({CLAIMED_QUANTITY}), 0) FROM claims c CROSS JOIN food_listings fl ON fl.Food_ID = c.Food_ID
+            WHERE c.Receiver_ID = r.Receiver_ID AND c.Status = 'Completed') as Quantity_Claimed
+    FROM receivers r
+"""
+PROVIDER_TOTALS_SQL = f"""
+    SELECT p.Provider_ID,
+           (SELECT COUNT(*) FROM food_listings fl WHERE fl.Provider_ID = p.Provider_ID) as Food_Items,
+           (SELECT SUM(fl.Quantity) FROM food_listings fl WHERE fl.Provider_ID = p.Provider_ID) as Quantity_Donated,
+           (SELECT COUNT(*) FROM food_listings fl CROSS JOIN claims c ON c.Food_ID = fl.Food_ID
+            WHERE fl.Provider_ID = p.Provider_ID AND c.Status = 'Completed') as Completed_Claims,
+           (SELECT COALESCE(SUM({CLAIMED_QUANTITY}), 0) FROM food_listings fl CROSS JOIN claims c ON c.Food_ID = fl.Food_ID
+            WHERE fl.Provider_ID = p.Provider_ID AND c.Status = 'Completed') as Quantity_Claimed
+    FROM providers p
+"""
+
+# Full recounts over the hot and archived rows, used only for reconciliation.
+# all_claim_listings has each claim's listing columns (Listing_ID NULL when missing)
+HISTORY_CLAIMED_QUANTITY = claimed_quantity('c', 'c')
+RECOMPUTE_SQL = {
+    'receiver_leaderboard': f"""
+        SELECT r.Receiver_ID, COALESCE(t.Completed_Claims, 0) as Completed_Claims,
+               COALESCE(t.Quantity_Claimed, 0) as Quantity_Claimed
+        FROM receivers r
+        LEFT JOIN (
+            SELECT c.Receiver_ID, COUNT(*) as Completed_Claims, SUM({HISTORY_CLAIMED_QUANTITY}) as Quantity_Claimed
+            FROM all_claim_listings c
+            WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL
+            GROUP BY c.Receiver_ID
+        ) t ON t.Receiver_ID = r.Receiver_ID
+    """,
+    'provider_leaderboard': f"""
+        SELECT p.Provider_ID, COALESCE(l.Food_Items, 0) as Food_Items, l.Quantity_Donated,
+               COALESCE(t.Completed_Claims, 0) as Completed_Claims, COALESCE(t.Quantity_Claimed, 0) as Quantity_Claimed
+        FROM providers p
+        LEFT JOIN (
+            SELECT Provider_ID, COUNT(*) as Food_Items, SUM(Quantity) as Quantity_Donated
+            FROM all_food_listings
+            GROUP BY Provider_ID
+        ) l ON l.Provider_ID = p.Provider_ID
+        LEFT JOIN (
+            SELECT c.Provider_ID, COUNT(*) as Completed_Claims, SUM({HISTORY_CLAIMED_QUANTITY}) as Quantity_Claimed
+            FROM all_claim_listings c
+            WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL
+            GROUP BY c.Provider_ID
+        ) t ON t.Provider_ID = p.Provider_ID
+    """,
+    'receiver_leaderboard_daily': f"""
+        SELECT COALESCE(date(c.Timestamp), '') as Day, c.Receiver_ID, COUNT(*) as Completed_Claims,
+               SUM({HISTORY_CLAIMED_QUANTITY}) as Quantity_Claimed
+        FROM all_claim_listings c
+        WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL AND c.Receiver_ID IS NOT NULL
+        GROUP BY 1, 2
+    """,
+    'provider_leaderboard_daily': f"""
+        SELECT COALESCE(date(c.Timestamp), '') as Day, c.Provider_ID, COUNT(*) as Completed_Claims,
+               SUM({HISTORY_CLAIMED_QUANTITY}) as Quantity_Claimed
+        FROM all_claim_listings c
+        WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL AND c.Provider_ID IS NOT NULL
+        GROUP BY 1, 2
+    """,
+}
+
+
+def _window(conditions, params, start, end):
+    for value, condition in [(start, "d.Day >= ?"), (end, "d.Day <= ?")]:
+        if value is not None:
+            conditions.append(condition)
+            params.append(str(value))
+
+
+def _filters(conditions, params, alias, city):
+    if city is not None:
+        conditions.append(f"{alias}.City = ?")
+        params.append(city)
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+
+def top_receivers_query(n=10, city=None, start=None, end=None):
+    """Return (sql, params) for the n receivers with the most quantity claimed (Query 4).
+
+    start and end are inclusive 'YYYY-MM-DD' claim days; n is inlined so
+    the default query is a constant string.
+    """
+    conditions, params = [], []
+    if start is None and end is None:
+        conditions.append("lb.Completed_Claims > 0")
+        where = _filters(conditions, params, 'r', city)
+        query = f"""
+    SELECT
+        r.Name as Receiver_Name,
+        r.Type as Receiver_Type,
+        r.City,
+        lb.Completed_Claims as Total_Claims,
+        lb.Quantity_Claimed as Total_Quantity_Claimed
+    FROM receiver_leaderboard lb
+    JOIN receivers r ON r.Receiver_ID = lb.Receiver_ID
+    {where}
+    ORDER BY lb.Quantity_Claimed DESC
+    LIMIT {int(n)};
+    """
+    else:
+        _window(conditions, params, start, end)
+        where = _filters(conditions, params, 'r', city)
+        query = f"""
+    SELECT
+        r.Name as Receiver_Name,
+        r.Type as Receiver_Type,
+        r.City,
+        SUM(d.Completed_Claims) as Total_Claims,
+        SUM(d.Quantity_Claimed) as Total_Quantity_Claimed
+    FROM receiver_leaderboard_daily d
+    JOIN receivers r ON r.Receiver_ID = d.Receiver_ID
+    {where}
+    GROUP BY d.Receiver_ID
+    ORDER BY Total_Quantity_Claimed DESC
+    LIMIT {int(n)};
+    """
+    return query, params
+
+
+def top_providers_query(n=10, city=None, start=None, end=None):
+    """Return (sql, params) for the n providers with the most completed claims (Query 9)"""
+    conditions, params = [], []
+    if start is None and end is None:
+        conditions.append("lb.Completed_Claims > 0")
+        where = _filters(conditions, params, 'p', city)
+        query = f"""
+    SELECT
+        p.Name as Provider_Name,
+        p.Type as Provider_Type,
+        p.City,
+        lb.Completed_Claims as Successful_Claims,
+        lb.Quantity_Claimed as Total_Quantity_Claimed
+    FROM provider_leaderboard lb
+    JOIN providers p ON p.Provider_ID = lb.Provider_ID
+    {where}
+    ORDER BY lb.Completed_Claims DESC
+    LIMIT {int(n)};
+    """
+    else:
+        _window(conditions, params, start, end)
+        where = _filters(conditions, params, 'p', city)
+        query = f"""
+    SELECT
+        p.Name as Provider_Name,
+        p.Type as Provider_Type,
+        p.City,
+        SUM(d.Completed_Claims) as Successful_Claims,
+        SUM(d.Quantity_Claimed) as Total_Quantity_Claimed
+    FROM provider_leaderboard_daily d
+    JOIN providers p ON p.Provider_ID = d.Provider_ID
+    {where}
+    GROUP BY d.Provider_ID
+    ORDER BY Successful_Claims DESC
+    LIMIT {int(n)};
+    """
+    return query, params
+
+
+def top_donors_query(n=15, city=None):
+    """Return (sql, params) for the n providers with the most quantity donated (Query 13).
+
+    Providers without listings rank last, with a NULL quantity.
+    """
+    params = []
+    where = _filters([], params, 'p', city)
+    query = f"""
+    SELECT
+        p.Name as Provider_Name,
+        p.Type as Provider_Type,
+        p.City,
+        lb.Food_Items as Total_Food_Items,
+        lb.Quantity_Donated as Total_Quantity_Donated
+    FROM provider_leaderboard lb
+    JOIN providers p ON p.Provider_ID = lb.Provider_ID
+    {where}
+    ORDER BY lb.Quantity_Donated DESC
+    LIMIT {int(n)};
+    """
+    return query, params
+
+
+def reconcile_leaderboards(conn, repair=False):
+    """Compare the leaderboard tables with a full recount.
+
+    Returns {table: number of rows that differ} for every table that
+    drifted. With repair=True the tables are overwritten with the recount;
+    the caller is responsible for committing.
+    """
+    attach_archive(conn)
+    history_views(conn)
+    drift = {}
+    for table, recompute in RECOMPUTE_SQL.items():
+        differing = conn.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT * FROM (SELECT * FROM {table} EXCEPT {recompute})
+                UNION ALL
+                SELECT * FROM ({recompute} EXCEPT SELECT * FROM {table})
+            )
+        """).fetchone()[0]
+        if differing:
+            drift[table] = differing
+        if repair and differing:
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"INSERT INTO {table} {recompute}")
+    return drift
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the leaderboard totals against a full recount")
+    parser.add_argument('db_path', nargs='?', default='food_management.db')
+    parser.add_argument('--repair', action='store_true', help="overwrite drifted totals with the recount")
+    args = parser.parse_args()
+
+    connection = connect(args.db_path)
+    drift = reconcile_leaderboards(connection, repair=args.repair)
+    connection.commit()
+    connection.close()
+
+    if not drift:
+        print("✅ Leaderboards match a full recount")
+    else:
+        for table, rows in drift.items():
+            print(f"❌ {table}: {rows} rows differ")
+        print("🔧 Leaderboards repaired" if args.repair else "Run with --repair to fix")
+    raise SystemExit(1 if drift and not args.repair else 0)
@@ -0,0 +1,75 @@
+"""Filtered, paginated reads of food_listings for the Food Listings page.
+
+Filters are applied in SQL as parameterized equality conditions, dropdown
+options come from GROUP BY facet counts, and pages are fetched with keyset
+pagination on Food_ID, so no read touches more rows than it returns. The
+covering indexes added by migration 4 serve every combination of filters.
+"""
+from instrumentation import fetch_all, read_sql
+
+
+FACET_COLUMNS = ['Location', 'Food_Type', 'Meal_Type']
+PAGE_SIZE = 50
+
+
+def build_where(filters, exclude=None):
+    """Turn {column: value} into a WHERE clause and its parameters.
+
+    None values mean "no filter". The exclude column is left out, which is
+    what a facet needs: its counts respect every filter except its own.
+    """
+    conditions, params = [], []
+    for column in FACET_COLUMNS:
+        value = filters.get(column)
+        if value is None or column == exclude:
+            continue
+        conditions.append(f"{column} = ?")
+        params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def facet_counts_query(column, filters):
+    if column not in FACET_COLUMNS:
+        raise ValueError(f"Unknown facet column: {column}")
+    where, params = build_where(filters, exclude=column)
+    query = f"""
+        SELECT {column} as Value, COUNT(*) as Count
+        FROM food_listings
+        {where}
+        GROUP BY {column}
+        ORDER BY {column}
+    """
+    return query, params
+
+
+def facet_counts(conn, column, filters):
+    """Return {value: listing count} for one filter dropdown"""
+    query, params = facet_counts_query(column, filters)
+    return dict(fetch_all(conn, query, params))
+
+
+def count_listings_query(filters):
+    where, params = build_where(filters)
+    return f"SELECT COUNT(*) as Count FROM food_listings {where}", params
+
+
+def listings_page_query(filters, after_id=None, page_size=PAGE_SIZE):
+    where, params = build_where(filters)
+    if after_id is not None:
+        where = f"{where} AND Food_ID > ?" if where else "WHERE Food_ID > ?"
+        params = params + [after_id]
+    query = f"""
+        SELECT *
+        FROM food_listings
+        {where}
+        ORDER BY Food_ID
+        LIMIT ?
+    """
+    return query, params + [page_size]
+
+
+def fetch_listings_page(conn, filters, after_id=None, page_size=PAGE_SIZE):
+    """Return the page_size listings after after_id (keyset pagination)"""
+    query, params = listings_page_query(filters, after_id, page_size)
+    return read_sql(query, conn, params=params)
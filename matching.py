@@ -0,0 +1,313 @@
+"""In-memory matching between food listings and receivers.
+
+Listings are indexed by (city, food type, meal type), each key holding its
+listings sorted by expiry. Receivers are indexed by city, and each has an
+affinity profile: how often it has claimed each (food type, meal type),
+counting the claims that aren't Cancelled and whose listing is indexed,
+and the archived ones as of load(). A listing archived by another process
+stays indexed, with its claims, until the next load().
+For every key that has been looked up, the city's receivers are kept ranked
+by score, so a lookup reads only the top of a few sorted lists. The index
+is loaded once and then updated incrementally from the CRUD write events (see crud.add_write_listener).
+"""
+import bisect
+import heapq
+import itertools
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from database import ARCHIVE_SCHEMA
+from expiry import UNIX_EPOCH_JULIAN_DAY
+
+
+# Organisations feeding many people are offered food ahead of individuals
+RECEIVER_TYPE_WEIGHTS = {'NGO': 3.0, 'Shelter': 3.0, 'Charity': 2.0, 'Community Center': 2.0, 'Individual': 1.0}
+UNIX_EPOCH = datetime(1970, 1, 1)
+# Listings without an expiry date sort after every dated one
+NO_EXPIRY = float('inf')
+
+
+def expiry_day(expiry_date):
+    """Epoch day of an expiry date string, matching the Expiry_Day column"""
+    if not expiry_date:
+        return None
+    try:
+        return (datetime.fromisoformat(str(expiry_date)) - UNIX_EPOCH).days
+    except ValueError:
+        return None
+
+
+def _expiry_sort_key(expiry):
+    return NO_EXPIRY if expiry is None else expiry
+
+
+class MatchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        # food_id -> (city, food_type, meal_type, quantity, expiry_day)
+        self._listings = {}
+        # (city, food_type, meal_type) -> sorted [(expiry_day, food_id)], soonest first
+        self._listings_by_key = {}
+        self._keys_by_city = defaultdict(set)
+        # receiver_id -> (city, type)
+        self._receivers = {}
+        self._receivers_by_city = defaultdict(set)
+        # receiver_id -> Counter of claimed (food_type, meal_type) and of food_type
+        self._affinity = defaultdict(Counter)
+        self._food_type_affinity = defaultdict(Counter)
+        # claim_id -> (receiver_id, food_id, status), so status changes and
+        # deletes can take a claim back out of its receiver's affinity
+        self._claims = {}
+        self._claims_by_listing = defaultdict(set)
+        # (city, food_type, meal_type) -> sorted [(-score, receiver_id)], built on first lookup
+        self._ranked_receivers = {}
+        self._ranked_keys_by_city = defaultdict(set)
+
+    @classmethod
+    def load(cls, conn):
+        """Build the index from the database in three sequential scans, plus the archived claims"""
+        index = cls()
+        for row in conn.execute(f'''
+            SELECT Food_ID, Location, Food_Type, Meal_Type, Quantity,
+                   CAST(julianday(Expiry_Date) - {UNIX_EPOCH_JULIAN_DAY} AS INTEGER)
+            FROM food_listings
+        '''):
+            index._add_listing(*row)
+        for receiver_id, city, type_ in conn.execute("SELECT Receiver_ID, City, Type FROM receivers"):
+            index._add_receiver(receiver_id, city, type_)
+        for claim_id, food_id, receiver_id, status in conn.execute(
+            "SELECT Claim_ID, Food_ID, Receiver_ID, Status FROM claims"
+        ):
+            index._add_claim(claim_id, food_id, receiver_id, status)
+        # Archived claims (archive.py) still tell what a receiver takes; their
+        # listings are gone from the offer, so they only seed the affinity
+        if ARCHIVE_SCHEMA in {row[1] for row in conn.execute("PRAGMA database_list")}:
+            for receiver_id, food_type, meal_type, count in conn.execute(f'''
+                SELECT c.Receiver_ID, fl.Food_Type, fl.Meal_Type, COUNT(*)
+                FROM {ARCHIVE_SCHEMA}.claims c
+                JOIN {ARCHIVE_SCHEMA}.food_listings fl ON fl.Food_ID = c.Food_ID
+                WHERE c.Status IS NOT 'Cancelled'
+                GROUP BY c.Receiver_ID, fl.Food_Type, fl.Meal_Type
+            '''):
+                index._affinity[receiver_id][(food_type, meal_type)] += count
+                index._food_type_affinity[receiver_id][food_type] += count
+        return index
+
+    # Sorted-list helpers
+    @staticmethod
+    def _insort(entries, entry):
+        bisect.insort(entries, entry)
+
+    @staticmethod
+    def _discard(entries, entry):
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    # Index maintenance
+    def _add_listing(self, food_id, city, food_type, meal_type, quantity, expiry):
+        self._remove_listing(food_id)
+        key = (city, food_type, meal_type)
+        self._listings[food_id] = (city, food_type, meal_type, quantity or 0, expiry)
+        self._insort(self._listings_by_key.setdefault(key, []), (_expiry_sort_key(expiry), food_id))
+        self._keys_by_city[city].add(key)
+        self._count_listing_claims(food_id, 1)
+
+    def _remove_listing(self, food_id):
+        if food_id not in self._listings:
+            return
+        self._count_listing_claims(food_id, -1)
+        listing = self._listings.pop(food_id)
+        key = listing[:3]
+        entries = self._listings_by_key[key]
+        self._discard(entries, (_expiry_sort_key(listing[4]), food_id))
+        if not entries:
+            del self._listings_by_key[key]
+            self._keys_by_city[key[0]].discard(key)
+
+    def _receiver_score(self, receiver_id, food_type, meal_type):
+        return (2.0 * self._affinity[receiver_id][(food_type, meal_type)]
+                + self._food_type_affinity[receiver_id][food_type]
+                + RECEIVER_TYPE_WEIGHTS.get(self._receivers[receiver_id][1], 1.0))
+
+    def _ranked_entry(self, receiver_id, key):
+        return (-self._receiver_score(receiver_id, key[1], key[2]), receiver_id)
+
+    def _add_receiver(self, receiver_id, city, type_):
+        self._remove_receiver(receiver_id)
+        self._receivers[receiver_id] = (city, type_)
+        self._receivers_by_city[city].add(receiver_id)
+        for key in self._ranked_keys_by_city.get(city, ()):
+            self._insort(self._ranked_receivers[key], self._ranked_entry(receiver_id, key))
+
+    def _remove_receiver(self, receiver_id):
+        if receiver_id not in self._receivers:
+            return
+        city = self._receivers[receiver_id][0]
+        for key in self._ranked_keys_by_city.get(city, ()):
+            self._discard(self._ranked_receivers[key], self._ranked_entry(receiver_id, key))
+        del self._receivers[receiver_id]
+        self._receivers_by_city[city].discard(receiver_id)
+
+    def _count_claim(self, receiver_id, food_id, delta):
+        """Add delta claims of the listing's kind to the receiver's affinity"""
+        listing = self._listings.get(food_id)
+        if listing is None:
+            return
+        food_type, meal_type = listing[1:3]
+        receiver = self._receivers.get(receiver_id)
+        # The food type affinity moves the receiver in every ranked list for that food type
+        affected = []
+        if receiver is not None:
+            affected = [key for key in self._ranked_keys_by_city.get(receiver[0], ()) if key[1] == food_type]
+            for key in affected:
+                self._discard(self._ranked_receivers[key], self._ranked_entry(receiver_id, key))
+        self._affinity[receiver_id][(food_type, meal_type)] += delta
+        self._food_type_affinity[receiver_id][food_type] += delta
+        for key in affected:
+            self._insort(self._ranked_receivers[key], self._ranked_entry(receiver_id, key))
+
+    def _count_listing_claims(self, food_id, delta):
+        for claim_id in self._claims_by_listing.get(food_id, ()):
+            receiver_id, _, status = self._claims[claim_id]
+            if status != 'Cancelled':
+                self._count_claim(receiver_id, food_id, delta)
+
+    def _add_claim(self, claim_id, food_id, receiver_id, status):
+        self._remove_claim(claim_id)
+        self._claims[claim_id] = (receiver_id, food_id, status)
+        self._claims_by_listing[food_id].add(claim_id)
+        if status != 'Cancelled':
+            self._count_claim(receiver_id, food_id, 1)
+
+    def _remove_claim(self, claim_id):
+        claim = self._claims.pop(claim_id, None)
+        if claim is None:
+            return
+        receiver_id, food_id, status = claim
+        claim_ids = self._claims_by_listing[food_id]
+        claim_ids.discard(claim_id)
+        if not claim_ids:
+            del self._claims_by_listing[food_id]
+        if status != 'Cancelled':
+            self._count_claim(receiver_id, food_id, -1)
+
+    def _ranked_receivers_for(self, key):
+        ranked = self._ranked_receivers.get(key)
+        if ranked is None:
+            # First lookup for this key: rank the city's receivers once, then maintain incrementally
+            ranked = sorted(self._ranked_entry(r, key) for r in self._receivers_by_city.get(key[0], ()))
+            self._ranked_receivers[key] = ranked
+            self._ranked_keys_by_city[key[0]].add(key)
+        return ranked
+
+    def add_listing(self, food_id, city, food_type, meal_type, quantity, expiry_date):
+        with self._lock:
+            self._add_listing(food_id, city, food_type, meal_type, quantity, expiry_day(expiry_date))
+
+    def remove_listing(self, food_id):
+        with self._lock:
+            self._remove_listing(food_id)
+
+    def set_quantity(self, food_id, quantity):
+        with self._lock:
+            listing = self._listings.get(food_id)
+            if listing is not None:
+                self._listings[food_id] = listing[:3] + (quantity,) + listing[4:]
+
+    def add_receiver(self, receiver_id, city, type_):
+        with self._lock:
+            self._add_receiver(receiver_id, city, type_)
+
+    def remove_receiver(self, receiver_id):
+        # The receiver's claims stay in the database, and so does its affinity
+        with self._lock:
+            self._remove_receiver(receiver_id)
+
+    def add_claim(self, claim_id, food_id, receiver_id, status='Pending'):
+        with self._lock:
+            self._add_claim(claim_id, food_id, receiver_id, status)
+
+    def set_claim_status(self, claim_id, status):
+        with self._lock:
+            claim = self._claims.get(claim_id)
+            if claim is not None:
+                receiver_id, food_id, _ = claim
+                self._add_claim(claim_id, food_id, receiver_id, status)
+
+    def remove_claim(self, claim_id):
+        with self._lock:
+            self._remove_claim(claim_id)
+
+    def apply_write(self, table, action, row):
+        """crud write listener: keep the index in step with the database"""
+        if table == 'food_listings':
+            if action == 'insert':
+                food_id, _, quantity, expiry_date, _, _, location, food_type, meal_type = row
+                self.add_listing(food_id, location, food_type, meal_type, quantity, expiry_date)
+            elif action == 'update':
+                self.set_quantity(*row)
+            elif action == 'delete':
+                self.remove_listing(row[0])
+        elif table == 'receivers':
+            if action == 'insert':
+                receiver_id, _, type_, city, _ = row
+                self.add_receiver(receiver_id, city, type_)
+            elif action == 'delete':
+                self.remove_receiver(row[0])
+        elif table == 'claims':
+            if action == 'insert':
+                claim_id, food_id, receiver_id, status, _ = row
+                self.add_claim(claim_id, food_id, receiver_id, status)
+            elif action == 'update':
+                self.set_claim_status(*row)
+            elif action == 'delete':
+                self.remove_claim(row[0])
+
+    # Lookups
+    def receivers_for_listing(self, food_id, limit=10):
+        """Ranked [(receiver_id, score)] in the listing's city"""
+        with self._lock:
+            listing = self._listings.get(food_id)
+            if listing is None or listing[3] <= 0:
+                return []
+            ranked = self._ranked_receivers_for(listing[:3])
+            return [(receiver_id, -score) for score, receiver_id in ranked[:limit]]
+
+    def listings_for_receiver(self, receiver_id, limit=10, today=None):
+        """Ranked [(food_id, score)] of unexpired, non-empty listings in the receiver's city.
+
+        Listings of the kinds the receiver usually claims rank first, and
+        within those the ones expiring soonest.
+        """
+        with self._lock:
+            receiver = self._receivers.get(receiver_id)
+            if receiver is None:
+                return []
+            today = today if today is not None else (datetime.now() - UNIX_EPOCH).days
+            affinity = self._affinity[receiver_id]
+            food_type_affinity = self._food_type_affinity[receiver_id]
+
+            def scored(key):
+                # Each key's listings are sorted by expiry, so its scores only decrease
+                preference = 2.0 * affinity[key[1:]] + food_type_affinity[key[1]]
+                entries = self._listings_by_key[key]
+                for expiry, food_id in itertools.islice(entries, bisect.bisect_left(entries, (today, -1)), None):
+                    if self._listings[food_id][3] <= 0:
+                        continue
+                    urgency = 1.0 / (1 + expiry - today) if expiry != NO_EXPIRY else 0.0
+                    yield (-(preference + urgency), food_id)
+
+            merged = heapq.merge(*(scored(key) for key in self._keys_by_city.get(receiver[0], ())))
+            return [(food_id, -score) for score, food_id in itertools.islice(merged, limit)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'listings': len(self._listings),
+                'receivers': len(self._receivers),
+                'claims': len(self._claims),
+                'listing_keys': len(self._listings_by_key),
+                'cities': sum(1 for ids in self._receivers_by_city.values() if ids),
+            }
@@ -0,0 +1,931 @@
+"""Versioned schema migrations for food_management.db.
+
+The database was originally written by the notebook with
+``to_sql(if_exists='replace')``, which leaves the tables without primary keys
+or indexes. Each migration below runs once, inside its own transaction, and is
+recorded in the ``schema_migrations`` table.
+"""
+import sqlite3
+import sys
+from datetime import datetime
+
+from changes import CHANGE_KEYS, CHANGE_LOG_ROWS
+from dashboard_stats import reconcile_stats
+from database import attach_archive, drop_history_views, history_views
+from leaderboards import PROVIDER_TOTALS_SQL, RECEIVER_TOTALS_SQL, reconcile_leaderboards
+from rollups import reconcile_rollups
+from search import SEARCH_TABLES
+
+
+# Table definitions, as intended by create_database() in the notebook
+TABLE_SCHEMAS = {
+    'providers': '''
+        CREATE TABLE {name} (
+            Provider_ID INTEGER PRIMARY KEY,
+            Name TEXT NOT NULL,
+            Type TEXT NOT NULL,
+            Address TEXT,
+            City TEXT NOT NULL,
+            Contact TEXT
+        )
+    ''',
+    'receivers': '''
+        CREATE TABLE {name} (
+            Receiver_ID INTEGER PRIMARY KEY,
+            Name TEXT NOT NULL,
+            Type TEXT NOT NULL,
+            City TEXT NOT NULL,
+            Contact TEXT
+        )
+    ''',
+    'food_listings': '''
+        CREATE TABLE {name} (
+            Food_ID INTEGER PRIMARY KEY,
+            Food_Name TEXT NOT NULL,
+            Quantity INTEGER NOT NULL,
+            Expiry_Date DATE,
+            Provider_ID INTEGER,
+            Provider_Type TEXT,
+            Location TEXT,
+            Food_Type TEXT,
+            Meal_Type TEXT,
+            FOREIGN KEY (Provider_ID) REFERENCES providers (Provider_ID)
+        )
+    ''',
+    'claims': '''
+        CREATE TABLE {name} (
+            Claim_ID INTEGER PRIMARY KEY,
+            Food_ID INTEGER,
+            Receiver_ID INTEGER,
+            Status TEXT NOT NULL,
+            Timestamp DATETIME,
+            FOREIGN KEY (Food_ID) REFERENCES food_listings (Food_ID),
+            FOREIGN KEY (Receiver_ID) REFERENCES receivers (Receiver_ID)
+        )
+    ''',
+}
+
+TABLE_COLUMNS = {
+    'providers': ['Provider_ID', 'Name', 'Type', 'Address', 'City', 'Contact'],
+    'receivers': ['Receiver_ID', 'Name', 'Type', 'City', 'Contact'],
+    'food_listings': ['Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Provider_ID',
+                      'Provider_Type', 'Location', 'Food_Type', 'Meal_Type'],
+    'claims': ['Claim_ID', 'Food_ID', 'Receiver_ID', 'Status', 'Timestamp'],
+}
+
+
+def _table_exists(conn, name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _has_primary_key(conn, name):
+    return any(col[5] for col in conn.execute(f'PRAGMA table_info("{name}")'))
+
+
+def run_script(conn, script):
+    # conn.executescript() would COMMIT the migration's transaction first,
+    # so split the script into complete statements and run them one by one
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ''
+    if statement.strip():
+        conn.execute(statement)
+
+
+# Migration 1: rebuild the base tables with real primary keys
+def _add_primary_keys(conn):
+    for name, schema in TABLE_SCHEMAS.items():
+        if not _table_exists(conn, name):
+            conn.execute(schema.format(name=name))
+            continue
+        if _has_primary_key(conn, name):
+            continue
+
+        columns = ', '.join(TABLE_COLUMNS[name])
+        conn.execute(schema.format(name=f'{name}_new'))
+        conn.execute(f'INSERT INTO {name}_new ({columns}) SELECT {columns} FROM "{name}"')
+        conn.execute(f'DROP TABLE "{name}"')
+        conn.execute(f'ALTER TABLE {name}_new RENAME TO {name}')
+
+
+# Migration 2: indexes for the joins and filters used by the 15 queries
+def _add_join_indexes(conn):
+    run_script(conn, '''
+        CREATE INDEX IF NOT EXISTS idx_food_listings_provider ON food_listings (Provider_ID);
+        CREATE INDEX IF NOT EXISTS idx_claims_food ON claims (Food_ID);
+        CREATE INDEX IF NOT EXISTS idx_claims_receiver ON claims (Receiver_ID);
+        CREATE INDEX IF NOT EXISTS idx_claims_status ON claims (Status, Food_ID);
+        CREATE INDEX IF NOT EXISTS idx_providers_city ON providers (City);
+        CREATE INDEX IF NOT EXISTS idx_receivers_city ON receivers (City);
+    ''')
+
+
+# Migration 3: single-row dashboard summary kept current by triggers
+def _add_stats_table(conn):
+    run_script(conn, '''
+        CREATE TABLE IF NOT EXISTS stats (
+            Id INTEGER PRIMARY KEY CHECK (Id = 1),
+            Total_Providers INTEGER NOT NULL DEFAULT 0,
+            Total_Receivers INTEGER NOT NULL DEFAULT 0,
+            Total_Food_Listings INTEGER NOT NULL DEFAULT 0,
+            Total_Claims INTEGER NOT NULL DEFAULT 0,
+            Total_Quantity INTEGER NOT NULL DEFAULT 0,
+            Pending_Claims INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO stats (Id) VALUES (1);
+
+        CREATE TRIGGER IF NOT EXISTS trg_stats_providers_insert AFTER INSERT ON providers
+        BEGIN
+            UPDATE stats SET Total_Providers = Total_Providers + 1 WHERE Id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stats_providers_delete AFTER DELETE ON providers
+        BEGIN
+            UPDATE stats SET Total_Providers = Total_Providers - 1 WHERE Id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_stats_receivers_insert AFTER INSERT ON receivers
+        BEGIN
+            UPDATE stats SET Total_Receivers = Total_Receivers + 1 WHERE Id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stats_receivers_delete AFTER DELETE ON receivers
+        BEGIN
+            UPDATE stats SET Total_Receivers = Total_Receivers - 1 WHERE Id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_stats_food_insert AFTER INSERT ON food_listings
+        BEGIN
+            UPDATE stats SET Total_Food_Listings = Total_Food_Listings + 1,
+                             Total_Quantity = Total_Quantity + COALESCE(NEW.Quantity, 0)
+            WHERE Id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stats_food_delete AFTER DELETE ON food_listings
+        BEGIN
+            UPDATE stats SET Total_Food_Listings = Total_Food_Listings - 1,
+                             Total_Quantity = Total_Quantity - COALESCE(OLD.Quantity, 0)
+            WHERE Id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stats_food_quantity AFTER UPDATE OF Quantity ON food_listings
+        BEGIN
+            UPDATE stats SET Total_Quantity = Total_Quantity - COALESCE(OLD.Quantity, 0) + COALESCE(NEW.Quantity, 0)
+            WHERE Id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_stats_claims_insert AFTER INSERT ON claims
+        BEGIN
+            UPDATE stats SET Total_Claims = Total_Claims + 1,
+                             Pending_Claims = Pending_Claims + (NEW.Status = 'Pending')
+            WHERE Id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stats_claims_delete AFTER DELETE ON claims
+        BEGIN
+            UPDATE stats SET Total_Claims = Total_Claims - 1,
+                             Pending_Claims = Pending_Claims - (OLD.Status = 'Pending')
+            WHERE Id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_stats_claims_status AFTER UPDATE OF Status ON claims
+        BEGIN
+            UPDATE stats SET Pending_Claims = Pending_Claims - (OLD.Status = 'Pending') + (NEW.Status = 'Pending')
+            WHERE Id = 1;
+        END;
+    ''')
+    # Seed the counters from the existing rows
+    reconcile_stats(conn, repair=True)
+
+
+# Migration 4: covering indexes for the Food Listings filters and facet counts.
+# Each filter combination has an index with the filtered columns as a prefix.
+def _add_listing_filter_indexes(conn):
+    run_script(conn, '''
+        CREATE INDEX IF NOT EXISTS idx_food_location_type_meal ON food_listings (Location, Food_Type, Meal_Type);
+        CREATE INDEX IF NOT EXISTS idx_food_type_meal_location ON food_listings (Food_Type, Meal_Type, Location);
+        CREATE INDEX IF NOT EXISTS idx_food_meal_location_type ON food_listings (Meal_Type, Location, Food_Type);
+    ''')
+
+
+# Migration 5: indexed expiry day, so near-expiry lookups are range scans.
+# A generated column is always consistent with Expiry_Date on insert and
+# update; its values are materialized in the indexes.
+def _add_expiry_day(conn):
+    columns = [col[1] for col in conn.execute("PRAGMA table_xinfo(food_listings)")]
+    if 'Expiry_Day' not in columns:
+        conn.execute('''
+            ALTER TABLE food_listings ADD COLUMN Expiry_Day INTEGER
+            GENERATED ALWAYS AS (CAST(julianday(Expiry_Date) - 2440587.5 AS INTEGER)) VIRTUAL
+        ''')
+    run_script(conn, '''
+        CREATE INDEX IF NOT EXISTS idx_food_expiry_day ON food_listings (Expiry_Day);
+        CREATE INDEX IF NOT EXISTS idx_food_location_expiry_day ON food_listings (Location, Expiry_Day);
+    ''')
+
+
+# Migration 6: per-claim reserved quantity. A claim takes its units off the
+# listing when it is made (see claims.py); existing claims reserved nothing.
+def _add_claimed_quantity(conn):
+    columns = [col[1] for col in conn.execute("PRAGMA table_info(claims)")]
+    if 'Claimed_Quantity' not in columns:
+        conn.execute("ALTER TABLE claims ADD COLUMN Claimed_Quantity INTEGER NOT NULL DEFAULT 0")
+
+
+# Migration 7: a data version every committed write bumps, whichever process
+# made it. ETags (api_server.py) and the app's query cache are keyed on it.
+def _add_data_version(conn):
+    run_script(conn, '''
+        CREATE TABLE IF NOT EXISTS data_version (
+            Id INTEGER PRIMARY KEY CHECK (Id = 1),
+            Version INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO data_version (Id, Version) VALUES (1, 0);
+    ''')
+    for table in TABLE_SCHEMAS:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_version_{table}_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_version SET Version = Version + 1 WHERE Id = 1;
+                END
+            ''')
+
+
+# Migration 8: per-table change counters, so a derived copy of the data
+# (columnar.py) can tell appends from rewrites. Updates that touch only a
+# table's hot column - the one normal use keeps changing - are counted apart.
+HOT_COLUMNS = {'providers': 'Contact', 'receivers': 'Contact', 'food_listings': 'Quantity', 'claims': 'Status'}
+
+def _add_table_changes(conn):
+    run_script(conn, '''
+        CREATE TABLE IF NOT EXISTS table_changes (
+            Table_Name TEXT PRIMARY KEY,
+            Inserts INTEGER NOT NULL DEFAULT 0,
+            Deletes INTEGER NOT NULL DEFAULT 0,
+            Updates INTEGER NOT NULL DEFAULT 0,
+            Hot_Updates INTEGER NOT NULL DEFAULT 0
+        );
+    ''')
+    for table, hot in HOT_COLUMNS.items():
+        conn.execute("INSERT OR IGNORE INTO table_changes (Table_Name) VALUES (?)", (table,))
+        # An update of the hot column and another column fires both update triggers
+        others = ', '.join(col[1] for col in conn.execute(f"PRAGMA table_info({table})") if col[1] != hot)
+        for name, event, counter in [('insert', 'INSERT', 'Inserts'), ('delete', 'DELETE', 'Deletes'),
+                                     ('update', f'UPDATE OF {others}', 'Updates'),
+                                     ('hot_update', f'UPDATE OF {hot}', 'Hot_Updates')]:
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_changes_{table}_{name} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_changes SET {counter} = {counter} + 1 WHERE Table_Name = '{table}';
+                END
+            ''')
+
+
+# Migration 9: claim counts per day (by Status and the listing's City and
+# Meal_Type) and per hour (by Status), kept current by triggers so trends
+# never rescan claims (rollups.py). Missing dates and listings count as ''.
+def _claim_delta(ref, sign):
+    """Statements adding sign * one claim (NEW or OLD row) to both rollups"""
+    listing = f"FROM food_listings WHERE Food_ID = {ref}.Food_ID"
+    day, hour = f"COALESCE(date({ref}.Timestamp), '')", f"COALESCE(strftime('%Y-%m-%d %H:00', {ref}.Timestamp), '')"
+    city, meal = f"COALESCE((SELECT Location {listing}), '')", f"COALESCE((SELECT Meal_Type {listing}), '')"
+    return f'''
+        INSERT INTO claim_rollups (Day, Status, City, Meal_Type, Claims)
+        VALUES ({day}, {ref}.Status, {city}, {meal}, {sign})
+        ON CONFLICT DO UPDATE SET Claims = Claims + excluded.Claims;
+        DELETE FROM claim_rollups
+        WHERE Day = {day} AND Status = {ref}.Status AND City = {city} AND Meal_Type = {meal} AND Claims = 0;
+        INSERT INTO claim_rollups_hourly (Hour, Status, Claims)
+        VALUES ({hour}, {ref}.Status, {sign})
+        ON CONFLICT DO UPDATE SET Claims = Claims + excluded.Claims;
+        DELETE FROM claim_rollups_hourly WHERE Hour = {hour} AND Status = {ref}.Status AND Claims = 0;
+    '''
+
+def _listing_move(ref, to_listing):
+    """Statements moving the claims on listing ref between its City/Meal_Type and ''"""
+    signs = (-1, 1) if to_listing else (1, -1)
+    statements = ''
+    for (city, meal), sign in zip([("''", "''"), (f"COALESCE({ref}.Location, '')", f"COALESCE({ref}.Meal_Type, '')")],
+                                  signs):
+        statements += f'''
+        INSERT INTO claim_rollups (Day, Status, City, Meal_Type, Claims)
+        SELECT COALESCE(date(Timestamp), ''), Status, {city}, {meal}, {sign} * COUNT(*)
+        FROM claims WHERE Food_ID = {ref}.Food_ID GROUP BY 1, 2
+        ON CONFLICT DO UPDATE SET Claims = Claims + excluded.Claims;'''
+    return statements + f'''
+        DELETE FROM claim_rollups
+        WHERE Day IN (SELECT COALESCE(date(Timestamp), '') FROM claims WHERE Food_ID = {ref}.Food_ID) AND Claims = 0;
+    '''
+
+def _add_claim_rollups(conn):
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS claim_rollups (
+            Day TEXT NOT NULL,
+            Status TEXT NOT NULL,
+            City TEXT NOT NULL,
+            Meal_Type TEXT NOT NULL,
+            Claims INTEGER NOT NULL,
+            PRIMARY KEY (Day, Status, City, Meal_Type)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_claim_rollups_city ON claim_rollups (City, Day);
+        CREATE TABLE IF NOT EXISTS claim_rollups_hourly (
+            Hour TEXT NOT NULL,
+            Status TEXT NOT NULL,
+            Claims INTEGER NOT NULL,
+            PRIMARY KEY (Hour, Status)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_claims_insert AFTER INSERT ON claims
+        BEGIN
+            {_claim_delta('NEW', 1)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_claims_delete AFTER DELETE ON claims
+        BEGIN
+            {_claim_delta('OLD', -1)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_claims_update AFTER UPDATE OF Food_ID, Status, Timestamp ON claims
+        WHEN OLD.Food_ID IS NOT NEW.Food_ID OR OLD.Status IS NOT NEW.Status OR OLD.Timestamp IS NOT NEW.Timestamp
+        BEGIN
+            {_claim_delta('OLD', -1)}
+            {_claim_delta('NEW', 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_food_insert AFTER INSERT ON food_listings
+        BEGIN
+            {_listing_move('NEW', to_listing=True)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_food_delete AFTER DELETE ON food_listings
+        BEGIN
+            {_listing_move('OLD', to_listing=False)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_food_update AFTER UPDATE OF Food_ID, Location, Meal_Type ON food_listings
+        WHEN OLD.Food_ID IS NOT NEW.Food_ID OR OLD.Location IS NOT NEW.Location OR OLD.Meal_Type IS NOT NEW.Meal_Type
+        BEGIN
+            {_listing_move('OLD', to_listing=False)}
+            {_listing_move('NEW', to_listing=True)}
+        END;
+    ''')
+    # Seed the rollups from the existing claims
+    reconcile_rollups(conn, repair=True)
+
+
+# Migration 10: per-receiver and per-provider totals (and their daily splits)
+# for the top-N leaderboards, kept current by triggers on all four tables
+# (leaderboards.py). A claim counts while Completed and its listing exists.
+DAILY_UPSERT = '''
+        ON CONFLICT DO UPDATE SET Completed_Claims = Completed_Claims + excluded.Completed_Claims,
+                                  Quantity_Claimed = Quantity_Claimed + excluded.Quantity_Claimed;'''
+
+def _claim_credit(ref, sign):
+    """Statements adding sign * one claim (NEW or OLD row), if Completed, to the leaderboards"""
+    quantity = f"(SELECT Quantity FROM food_listings WHERE Food_ID = {ref}.Food_ID)"
+    provider = f"(SELECT Provider_ID FROM food_listings WHERE Food_ID = {ref}.Food_ID)"
+    day = f"COALESCE(date({ref}.Timestamp), '')"
+    completed = f"{ref}.Status = 'Completed'"
+    return f'''
+        UPDATE receiver_leaderboard
+        SET Completed_Claims = Completed_Claims + {sign}, Quantity_Claimed = Quantity_Claimed + {sign} * {quantity}
+        WHERE Receiver_ID = {ref}.Receiver_ID AND {completed} AND {quantity} IS NOT NULL;
+        UPDATE provider_leaderboard
+        SET Completed_Claims = Completed_Claims + {sign}, Quantity_Claimed = Quantity_Claimed + {sign} * {quantity}
+        WHERE Provider_ID = {provider} AND {completed};
+        INSERT INTO receiver_leaderboard_daily (Day, Receiver_ID, Completed_Claims, Quantity_Claimed)
+        SELECT {day}, {ref}.Receiver_ID, {sign}, {sign} * Quantity FROM food_listings
+        WHERE Food_ID = {ref}.Food_ID AND {completed} AND {ref}.Receiver_ID IS NOT NULL{DAILY_UPSERT}
+        INSERT INTO provider_leaderboard_daily (Day, Provider_ID, Completed_Claims, Quantity_Claimed)
+        SELECT {day}, Provider_ID, {sign}, {sign} * Quantity FROM food_listings
+        WHERE Food_ID = {ref}.Food_ID AND {completed} AND Provider_ID IS NOT NULL{DAILY_UPSERT}
+        DELETE FROM receiver_leaderboard_daily
+        WHERE Day = {day} AND Receiver_ID = {ref}.Receiver_ID AND Completed_Claims = 0;
+        DELETE FROM provider_leaderboard_daily
+        WHERE Day = {day} AND Provider_ID = {provider} AND Completed_Claims = 0;
+    '''
+
+def _listing_credit(ref, sign):
+    """Statements adding sign * listing ref and its completed claims to the leaderboards"""
+    completed = f"FROM claims WHERE Food_ID = {ref}.Food_ID AND Status = 'Completed'"
+    claims = f"(SELECT COUNT(*) {completed})"
+    receiver_claims = f"(SELECT COUNT(*) {completed} AND Receiver_ID = receiver_leaderboard.Receiver_ID)"
+    return f'''
+        UPDATE provider_leaderboard
+        SET Food_Items = Food_Items + {sign},
+            Quantity_Donated = CASE WHEN Food_Items + {sign} = 0 THEN NULL
+                                    ELSE COALESCE(Quantity_Donated, 0) + {sign} * {ref}.Quantity END,
+            Completed_Claims = Completed_Claims + {sign} * {claims},
+            Quantity_Claimed = Quantity_Claimed + {sign} * {ref}.Quantity * {claims}
+        WHERE Provider_ID = {ref}.Provider_ID;
+        UPDATE receiver_leaderboard
+        SET Completed_Claims = Completed_Claims + {sign} * {receiver_claims},
+            Quantity_Claimed = Quantity_Claimed + {sign} * {ref}.Quantity * {receiver_claims}
+        WHERE Receiver_ID IN (SELECT Receiver_ID {completed});
+        INSERT INTO receiver_leaderboard_daily (Day, Receiver_ID, Completed_Claims, Quantity_Claimed)
+        SELECT COALESCE(date(Timestamp), ''), Receiver_ID, {sign} * COUNT(*), {sign} * COUNT(*) * {ref}.Quantity
+        {completed} AND Receiver_ID IS NOT NULL GROUP BY 1, 2{DAILY_UPSERT}
+        INSERT INTO provider_leaderboard_daily (Day, Provider_ID, Completed_Claims, Quantity_Claimed)
+        SELECT COALESCE(date(Timestamp), ''), {ref}.Provider_ID, {sign} * COUNT(*), {sign} * COUNT(*) * {ref}.Quantity
+        {completed} AND {ref}.Provider_ID IS NOT NULL GROUP BY 1{DAILY_UPSERT}
+        DELETE FROM receiver_leaderboard_daily
+        WHERE Day IN (SELECT COALESCE(date(Timestamp), '') {completed})
+          AND Receiver_ID IN (SELECT Receiver_ID {completed}) AND Completed_Claims = 0;
+        DELETE FROM provider_leaderboard_daily
+        WHERE Day IN (SELECT COALESCE(date(Timestamp), '') {completed})
+          AND Provider_ID = {ref}.Provider_ID AND Completed_Claims = 0;
+    '''
+
+def _listing_quantity_delta(ref, delta):
+    """Statements adding delta to listing ref's quantity in the leaderboards"""
+    completed = f"FROM claims WHERE Food_ID = {ref}.Food_ID AND Status = 'Completed'"
+    return f'''
+        UPDATE provider_leaderboard
+        SET Quantity_Donated = Quantity_Donated + {delta},
+            Quantity_Claimed = Quantity_Claimed + {delta} * (SELECT COUNT(*) {completed})
+        WHERE Provider_ID = {ref}.Provider_ID;
+        UPDATE receiver_leaderboard
+        SET Quantity_Claimed = Quantity_Claimed + {delta} *
+            (SELECT COUNT(*) {completed} AND Receiver_ID = receiver_leaderboard.Receiver_ID)
+        WHERE Receiver_ID IN (SELECT Receiver_ID {completed});
+        UPDATE receiver_leaderboard_daily
+        SET Quantity_Claimed = Quantity_Claimed + {delta} *
+            (SELECT COUNT(*) {completed} AND Receiver_ID = receiver_leaderboard_daily.Receiver_ID
+             AND COALESCE(date(Timestamp), '') = receiver_leaderboard_daily.Day)
+        WHERE (Day, Receiver_ID) IN (SELECT COALESCE(date(Timestamp), ''), Receiver_ID {completed});
+        UPDATE provider_leaderboard_daily
+        SET Quantity_Claimed = Quantity_Claimed + {delta} *
+            (SELECT COUNT(*) {completed} AND COALESCE(date(Timestamp), '') = provider_leaderboard_daily.Day)
+        WHERE Provider_ID = {ref}.Provider_ID AND Day IN (SELECT COALESCE(date(Timestamp), '') {completed});
+    '''
+
+# Migration 10's totals of one receiver / provider (the trigger SQL it shipped
+# with; leaderboards.py holds the current ones, used from migration 14)
+V10_RECEIVER_TOTALS_SQL = """
+    SELECT r.Receiver_ID,
+           (SELECT COUNT(*) FROM claims c CROSS JOIN food_listings fl ON fl.Food_ID = c.Food_ID
+            WHERE c.Receiver_ID = r.Receiver_ID AND c.Status = 'Completed') as Completed_Claims,
+           (SELECT COALESCE(SUM(fl.Quantity), 0) FROM claims c CROSS JOIN food_listings fl ON fl.Food_ID = c.Food_ID
+            WHERE c.Receiver_ID = r.Receiver_ID AND c.Status = 'Completed') as Quantity_Claimed
+    FROM receivers r
+"""
+V10_PROVIDER_TOTALS_SQL = """
+    SELECT p.Provider_ID,
+           (SELECT COUNT(*) FROM food_listings fl WHERE fl.Provider_ID = p.Provider_ID) as Food_Items,
+           (SELECT SUM(fl.Quantity) FROM food_listings fl WHERE fl.Provider_ID = p.Provider_ID) as Quantity_Donated,
+           (SELECT COUNT(*) FROM food_listings fl CROSS JOIN claims c ON c.Food_ID = fl.Food_ID
+            WHERE fl.Provider_ID = p.Provider_ID AND c.Status = 'Completed') as Completed_Claims,
+           (SELECT COALESCE(SUM(fl.Quantity), 0) FROM food_listings fl CROSS JOIN claims c ON c.Food_ID = fl.Food_ID
+            WHERE fl.Provider_ID = p.Provider_ID AND c.Status = 'Completed') as Quantity_Claimed
+    FROM providers p
+"""
+
+def _add_leaderboards(conn):
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS receiver_leaderboard (
+            Receiver_ID INTEGER PRIMARY KEY,
+            Completed_Claims INTEGER NOT NULL,
+            Quantity_Claimed INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_receiver_leaderboard_quantity ON receiver_leaderboard (Quantity_Claimed);
+        CREATE TABLE IF NOT EXISTS provider_leaderboard (
+            Provider_ID INTEGER PRIMARY KEY,
+            Food_Items INTEGER NOT NULL,
+            Quantity_Donated INTEGER,
+            Completed_Claims INTEGER NOT NULL,
+            Quantity_Claimed INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_provider_leaderboard_claims ON provider_leaderboard (Completed_Claims);
+        CREATE INDEX IF NOT EXISTS idx_provider_leaderboard_donated ON provider_leaderboard (Quantity_Donated);
+        CREATE TABLE IF NOT EXISTS receiver_leaderboard_daily (
+            Day TEXT NOT NULL,
+            Receiver_ID INTEGER NOT NULL,
+            Completed_Claims INTEGER NOT NULL,
+            Quantity_Claimed INTEGER NOT NULL,
+            PRIMARY KEY (Day, Receiver_ID)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS provider_leaderboard_daily (
+            Day TEXT NOT NULL,
+            Provider_ID INTEGER NOT NULL,
+            Completed_Claims INTEGER NOT NULL,
+            Quantity_Claimed INTEGER NOT NULL,
+            PRIMARY KEY (Day, Provider_ID)
+        ) WITHOUT ROWID;
+
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_claims_insert AFTER INSERT ON claims
+        WHEN NEW.Status = 'Completed'
+        BEGIN
+            {_claim_credit('NEW', 1)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_claims_delete AFTER DELETE ON claims
+        WHEN OLD.Status = 'Completed'
+        BEGIN
+            {_claim_credit('OLD', -1)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_claims_update
+        AFTER UPDATE OF Food_ID, Receiver_ID, Status, Timestamp ON claims
+        WHEN (OLD.Status = 'Completed' OR NEW.Status = 'Completed')
+         AND (OLD.Food_ID IS NOT NEW.Food_ID OR OLD.Receiver_ID IS NOT NEW.Receiver_ID
+              OR OLD.Status IS NOT NEW.Status OR OLD.Timestamp IS NOT NEW.Timestamp)
+        BEGIN
+            {_claim_credit('OLD', -1)}
+            {_claim_credit('NEW', 1)}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_food_insert AFTER INSERT ON food_listings
+        BEGIN
+            {_listing_credit('NEW', 1)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_food_delete AFTER DELETE ON food_listings
+        BEGIN
+            {_listing_credit('OLD', -1)}
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_food_update AFTER UPDATE OF Food_ID, Provider_ID ON food_listings
+        WHEN OLD.Food_ID IS NOT NEW.Food_ID OR OLD.Provider_ID IS NOT NEW.Provider_ID
+        BEGIN
+            {_listing_credit('OLD', -1)}
+            {_listing_credit('NEW', 1)}
+        END;
+        -- Every claim reservation changes a Quantity, so that case only applies the difference
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_food_quantity AFTER UPDATE OF Quantity ON food_listings
+        WHEN OLD.Quantity IS NOT NEW.Quantity AND OLD.Food_ID IS NEW.Food_ID AND OLD.Provider_ID IS NEW.Provider_ID
+        BEGIN
+            {_listing_quantity_delta('NEW', '(NEW.Quantity - OLD.Quantity)')}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_providers_insert AFTER INSERT ON providers
+        BEGIN
+            INSERT OR REPLACE INTO provider_leaderboard {V10_PROVIDER_TOTALS_SQL} WHERE p.Provider_ID = NEW.Provider_ID;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_providers_delete AFTER DELETE ON providers
+        BEGIN
+            DELETE FROM provider_leaderboard WHERE Provider_ID = OLD.Provider_ID;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_providers_update AFTER UPDATE OF Provider_ID ON providers
+        WHEN OLD.Provider_ID IS NOT NEW.Provider_ID
+        BEGIN
+            DELETE FROM provider_leaderboard WHERE Provider_ID = OLD.Provider_ID;
+            INSERT OR REPLACE INTO provider_leaderboard {V10_PROVIDER_TOTALS_SQL} WHERE p.Provider_ID = NEW.Provider_ID;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_receivers_insert AFTER INSERT ON receivers
+        BEGIN
+            INSERT OR REPLACE INTO receiver_leaderboard {V10_RECEIVER_TOTALS_SQL} WHERE r.Receiver_ID = NEW.Receiver_ID;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_receivers_delete AFTER DELETE ON receivers
+        BEGIN
+            DELETE FROM receiver_leaderboard WHERE Receiver_ID = OLD.Receiver_ID;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_leaderboard_receivers_update AFTER UPDATE OF Receiver_ID ON receivers
+        WHEN OLD.Receiver_ID IS NOT NEW.Receiver_ID
+        BEGIN
+            DELETE FROM receiver_leaderboard WHERE Receiver_ID = OLD.Receiver_ID;
+            INSERT OR REPLACE INTO receiver_leaderboard {V10_RECEIVER_TOTALS_SQL} WHERE r.Receiver_ID = NEW.Receiver_ID;
+        END;
+    ''')
+    # Seed the leaderboards from the existing rows
+    reconcile_leaderboards(conn, repair=True)
+
+
+# Migration 11: FTS5 indexes over the searchable text columns (search.py).
+# They are external-content tables, so triggers pass them the old values to
+# remove and the new values to add.
+def _add_search_index(conn):
+    for table, (fts, key, weights, _) in SEARCH_TABLES.items():
+        columns = ', '.join(weights)
+        new = ', '.join(f'NEW.{column}' for column in weights)
+        old = ', '.join(f'OLD.{column}' for column in weights)
+        changed = ' OR '.join(f'OLD.{column} IS NOT NEW.{column}' for column in [key, *weights])
+        run_script(conn, f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {columns}, content='{table}', content_rowid='{key}',
+                prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS trg_search_{table}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {fts} (rowid, {columns}) VALUES (NEW.{key}, {new});
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_search_{table}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', OLD.{key}, {old});
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_search_{table}_update AFTER UPDATE OF {key}, {columns} ON {table}
+            WHEN {changed}
+            BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', OLD.{key}, {old});
+                INSERT INTO {fts} (rowid, {columns}) VALUES (NEW.{key}, {new});
+            END;
+            INSERT INTO {fts} ({fts}) VALUES ('rebuild');
+        ''')
+
+
+# Migration 12: archive.py moves old listings and claims out of the hot tables
+# without taking them out of the claim history. While it holds the archiving
+# guard row, the rollup and leaderboard delete triggers leave the totals alone.
+NOT_ARCHIVING = "NOT EXISTS (SELECT 1 FROM archiving)"
+
+def _add_archive_guard(conn):
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS archiving (
+            Id INTEGER PRIMARY KEY CHECK (Id = 1)
+        );
+
+        DROP TRIGGER IF EXISTS trg_rollup_claims_delete;
+        CREATE TRIGGER trg_rollup_claims_delete AFTER DELETE ON claims
+        WHEN {NOT_ARCHIVING}
+        BEGIN
+            {_claim_delta('OLD', -1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_rollup_food_delete;
+        CREATE TRIGGER trg_rollup_food_delete AFTER DELETE ON food_listings
+        WHEN {NOT_ARCHIVING}
+        BEGIN
+            {_listing_move('OLD', to_listing=False)}
+        END;
+
+        DROP TRIGGER IF EXISTS trg_leaderboard_claims_delete;
+        CREATE TRIGGER trg_leaderboard_claims_delete AFTER DELETE ON claims
+        WHEN OLD.Status = 'Completed' AND {NOT_ARCHIVING}
+        BEGIN
+            {_claim_credit('OLD', -1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_food_delete;
+        CREATE TRIGGER trg_leaderboard_food_delete AFTER DELETE ON food_listings
+        WHEN {NOT_ARCHIVING}
+        BEGIN
+            {_listing_credit('OLD', -1)}
+        END;
+    ''')
+
+
+# Migration 13: a change feed (changes.py). Every write appends the changed
+# row's key to change_log under a growing Seq; an update that changes the key
+# logs the old key too. The log keeps only the last CHANGE_LOG_ROWS changes.
+def _add_change_log(conn):
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS change_log (
+            Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            Table_Name TEXT NOT NULL,
+            Row_ID INTEGER
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_change_log_trim AFTER INSERT ON change_log
+        BEGIN
+            DELETE FROM change_log WHERE Seq = NEW.Seq - {CHANGE_LOG_ROWS};
+        END;
+    ''')
+    for table, key in CHANGE_KEYS.items():
+        run_script(conn, f'''
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO change_log (Table_Name, Row_ID) VALUES ('{table}', NEW.{key});
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO change_log (Table_Name, Row_ID) VALUES ('{table}', OLD.{key});
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_change_log_{table}_update AFTER UPDATE ON {table}
+            BEGIN
+                INSERT INTO change_log (Table_Name, Row_ID) SELECT '{table}', OLD.{key} WHERE OLD.{key} IS NOT NEW.{key};
+                INSERT INTO change_log (Table_Name, Row_ID) VALUES ('{table}', NEW.{key});
+            END;
+        ''')
+
+
+# Migration 14: leaderboards count a claim for the quantity it reserved
+# (Claimed_Quantity) or, if that is 0, its listing's Quantity, rather than
+# what is left on the listing. The claim and listing triggers are recreated
+# from the helpers below, and the totals are recounted. Migrations 10 and 12
+# keep building the triggers they shipped with.
+def _reserved_claim_credit(ref, sign):
+    """Statements adding sign * one claim (NEW or OLD row), if Completed, to the leaderboards"""
+    listing_quantity = f"(SELECT Quantity FROM food_listings WHERE Food_ID = {ref}.Food_ID)"
+    quantity = f"COALESCE(NULLIF({ref}.Claimed_Quantity, 0), {listing_quantity})"
+    provider = f"(SELECT Provider_ID FROM food_listings WHERE Food_ID = {ref}.Food_ID)"
+    day = f"COALESCE(date({ref}.Timestamp), '')"
+    completed = f"{ref}.Status = 'Completed'"
+    return f'''
+        UPDATE receiver_leaderboard
+        SET Completed_Claims = Completed_Claims + {sign}, Quantity_Claimed = Quantity_Claimed + {sign} * {quantity}
+        WHERE Receiver_ID = {ref}.Receiver_ID AND {completed} AND {listing_quantity} IS NOT NULL;
+        UPDATE provider_leaderboard
+        SET Completed_Claims = Completed_Claims + {sign}, Quantity_Claimed = Quantity_Claimed + {sign} * {quantity}
+        WHERE Provider_ID = {provider} AND {completed};
+        INSERT INTO receiver_leaderboard_daily (Day, Receiver_ID, Completed_Claims, Quantity_Claimed)
+        SELECT {day}, {ref}.Receiver_ID, {sign}, {sign} * COALESCE(NULLIF({ref}.Claimed_Quantity, 0), Quantity)
+        FROM food_listings
+        WHERE Food_ID = {ref}.Food_ID AND {completed} AND {ref}.Receiver_ID IS NOT NULL{DAILY_UPSERT}
+        INSERT INTO provider_leaderboard_daily (Day, Provider_ID, Completed_Claims, Quantity_Claimed)
+        SELECT {day}, Provider_ID, {sign}, {sign} * COALESCE(NULLIF({ref}.Claimed_Quantity, 0), Quantity)
+        FROM food_listings
+        WHERE Food_ID = {ref}.Food_ID AND {completed} AND Provider_ID IS NOT NULL{DAILY_UPSERT}
+        DELETE FROM receiver_leaderboard_daily
+        WHERE Day = {day} AND Receiver_ID = {ref}.Receiver_ID AND Completed_Claims = 0;
+        DELETE FROM provider_leaderboard_daily
+        WHERE Day = {day} AND Provider_ID = {provider} AND Completed_Claims = 0;
+    '''
+
+def _reserved_listing_credit(ref, sign):
+    """Statements adding sign * listing ref and its completed claims to the leaderboards"""
+    completed = f"FROM claims WHERE Food_ID = {ref}.Food_ID AND Status = 'Completed'"
+    quantity = f"COALESCE(NULLIF(Claimed_Quantity, 0), {ref}.Quantity)"
+    claims = f"(SELECT COUNT(*) {completed})"
+    claimed = f"(SELECT COALESCE(SUM({quantity}), 0) {completed})"
+    receiver = "AND Receiver_ID = receiver_leaderboard.Receiver_ID"
+    return f'''
+        UPDATE provider_leaderboard
+        SET Food_Items = Food_Items + {sign},
+            Quantity_Donated = CASE WHEN Food_Items + {sign} = 0 THEN NULL
+                                    ELSE COALESCE(Quantity_Donated, 0) + {sign} * {ref}.Quantity END,
+            Completed_Claims = Completed_Claims + {sign} * {claims},
+            Quantity_Claimed = Quantity_Claimed + {sign} * {claimed}
+        WHERE Provider_ID = {ref}.Provider_ID;
+        UPDATE receiver_leaderboard
+        SET Completed_Claims = Completed_Claims + {sign} * (SELECT COUNT(*) {completed} {receiver}),
+            Quantity_Claimed = Quantity_Claimed + {sign} * (SELECT COALESCE(SUM({quantity}), 0) {completed} {receiver})
+        WHERE Receiver_ID IN (SELECT Receiver_ID {completed});
+        INSERT INTO receiver_leaderboard_daily (Day, Receiver_ID, Completed_Claims, Quantity_Claimed)
+        SELECT COALESCE(date(Timestamp), ''), Receiver_ID, {sign} * COUNT(*), {sign} * SUM({quantity})
+        {completed} AND Receiver_ID IS NOT NULL GROUP BY 1, 2{DAILY_UPSERT}
+        INSERT INTO provider_leaderboard_daily (Day, Provider_ID, Completed_Claims, Quantity_Claimed)
+        SELECT COALESCE(date(Timestamp), ''), {ref}.Provider_ID, {sign} * COUNT(*), {sign} * SUM({quantity})
+        {completed} AND {ref}.Provider_ID IS NOT NULL GROUP BY 1{DAILY_UPSERT}
+        DELETE FROM receiver_leaderboard_daily
+        WHERE Day IN (SELECT COALESCE(date(Timestamp), '') {completed})
+          AND Receiver_ID IN (SELECT Receiver_ID {completed}) AND Completed_Claims = 0;
+        DELETE FROM provider_leaderboard_daily
+        WHERE Day IN (SELECT COALESCE(date(Timestamp), '') {completed})
+          AND Provider_ID = {ref}.Provider_ID AND Completed_Claims = 0;
+    '''
+
+def _reserved_quantity_delta(ref, delta):
+    """Statements adding delta to listing ref's quantity in the leaderboards"""
+    # Only the claims without a Claimed_Quantity count for the listing's Quantity
+    completed = f"FROM claims WHERE Food_ID = {ref}.Food_ID AND Status = 'Completed' AND Claimed_Quantity = 0"
+    return f'''
+        UPDATE provider_leaderboard
+        SET Quantity_Donated = Quantity_Donated + {delta},
+            Quantity_Claimed = Quantity_Claimed + {delta} * (SELECT COUNT(*) {completed})
+        WHERE Provider_ID = {ref}.Provider_ID;
+        UPDATE receiver_leaderboard
+        SET Quantity_Claimed = Quantity_Claimed + {delta} *
+            (SELECT COUNT(*) {completed} AND Receiver_ID = receiver_leaderboard.Receiver_ID)
+        WHERE Receiver_ID IN (SELECT Receiver_ID {completed});
+        UPDATE receiver_leaderboard_daily
+        SET Quantity_Claimed = Quantity_Claimed + {delta} *
+            (SELECT COUNT(*) {completed} AND Receiver_ID = receiver_leaderboard_daily.Receiver_ID
+             AND COALESCE(date(Timestamp), '') = receiver_leaderboard_daily.Day)
+        WHERE (Day, Receiver_ID) IN (SELECT COALESCE(date(Timestamp), ''), Receiver_ID {completed});
+        UPDATE provider_leaderboard_daily
+        SET Quantity_Claimed = Quantity_Claimed + {delta} *
+            (SELECT COUNT(*) {completed} AND COALESCE(date(Timestamp), '') = provider_leaderboard_daily.Day)
+        WHERE Provider_ID = {ref}.Provider_ID AND Day IN (SELECT COALESCE(date(Timestamp), '') {completed});
+    '''
+
+
+def _count_claimed_quantity(conn):
+    run_script(conn, f'''
+        DROP TRIGGER IF EXISTS trg_leaderboard_claims_insert;
+        CREATE TRIGGER trg_leaderboard_claims_insert AFTER INSERT ON claims
+        WHEN NEW.Status = 'Completed'
+        BEGIN
+            {_reserved_claim_credit('NEW', 1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_claims_delete;
+        CREATE TRIGGER trg_leaderboard_claims_delete AFTER DELETE ON claims
+        WHEN OLD.Status = 'Completed' AND {NOT_ARCHIVING}
+        BEGIN
+            {_reserved_claim_credit('OLD', -1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_claims_update;
+        CREATE TRIGGER trg_leaderboard_claims_update
+        AFTER UPDATE OF Food_ID, Receiver_ID, Status, Timestamp, Claimed_Quantity ON claims
+        WHEN (OLD.Status = 'Completed' OR NEW.Status = 'Completed')
+         AND (OLD.Food_ID IS NOT NEW.Food_ID OR OLD.Receiver_ID IS NOT NEW.Receiver_ID
+              OR OLD.Status IS NOT NEW.Status OR OLD.Timestamp IS NOT NEW.Timestamp
+              OR OLD.Claimed_Quantity IS NOT NEW.Claimed_Quantity)
+        BEGIN
+            {_reserved_claim_credit('OLD', -1)}
+            {_reserved_claim_credit('NEW', 1)}
+        END;
+
+        DROP TRIGGER IF EXISTS trg_leaderboard_food_insert;
+        CREATE TRIGGER trg_leaderboard_food_insert AFTER INSERT ON food_listings
+        BEGIN
+            {_reserved_listing_credit('NEW', 1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_food_delete;
+        CREATE TRIGGER trg_leaderboard_food_delete AFTER DELETE ON food_listings
+        WHEN {NOT_ARCHIVING}
+        BEGIN
+            {_reserved_listing_credit('OLD', -1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_food_update;
+        CREATE TRIGGER trg_leaderboard_food_update AFTER UPDATE OF Food_ID, Provider_ID ON food_listings
+        WHEN OLD.Food_ID IS NOT NEW.Food_ID OR OLD.Provider_ID IS NOT NEW.Provider_ID
+        BEGIN
+            {_reserved_listing_credit('OLD', -1)}
+            {_reserved_listing_credit('NEW', 1)}
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_food_quantity;
+        CREATE TRIGGER trg_leaderboard_food_quantity AFTER UPDATE OF Quantity ON food_listings
+        WHEN OLD.Quantity IS NOT NEW.Quantity AND OLD.Food_ID IS NEW.Food_ID AND OLD.Provider_ID IS NEW.Provider_ID
+        BEGIN
+            {_reserved_quantity_delta('NEW', '(NEW.Quantity - OLD.Quantity)')}
+        END;
+
+        DROP TRIGGER IF EXISTS trg_leaderboard_providers_insert;
+        CREATE TRIGGER trg_leaderboard_providers_insert AFTER INSERT ON providers
+        BEGIN
+            INSERT OR REPLACE INTO provider_leaderboard {PROVIDER_TOTALS_SQL} WHERE p.Provider_ID = NEW.Provider_ID;
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_providers_update;
+        CREATE TRIGGER trg_leaderboard_providers_update AFTER UPDATE OF Provider_ID ON providers
+        WHEN OLD.Provider_ID IS NOT NEW.Provider_ID
+        BEGIN
+            DELETE FROM provider_leaderboard WHERE Provider_ID = OLD.Provider_ID;
+            INSERT OR REPLACE INTO provider_leaderboard {PROVIDER_TOTALS_SQL} WHERE p.Provider_ID = NEW.Provider_ID;
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_receivers_insert;
+        CREATE TRIGGER trg_leaderboard_receivers_insert AFTER INSERT ON receivers
+        BEGIN
+            INSERT OR REPLACE INTO receiver_leaderboard {RECEIVER_TOTALS_SQL} WHERE r.Receiver_ID = NEW.Receiver_ID;
+        END;
+        DROP TRIGGER IF EXISTS trg_leaderboard_receivers_update;
+        CREATE TRIGGER trg_leaderboard_receivers_update AFTER UPDATE OF Receiver_ID ON receivers
+        WHEN OLD.Receiver_ID IS NOT NEW.Receiver_ID
+        BEGIN
+            DELETE FROM receiver_leaderboard WHERE Receiver_ID = OLD.Receiver_ID;
+            INSERT OR REPLACE INTO receiver_leaderboard {RECEIVER_TOTALS_SQL} WHERE r.Receiver_ID = NEW.Receiver_ID;
+        END;
+    ''')
+    reconcile_leaderboards(conn, repair=True)
+
+
+# (version, description, function) - append new migrations to the end, never reorder
+MIGRATIONS = [
+    (1, "Rebuild base tables with primary keys", _add_primary_keys),
+    (2, "Add join and filter indexes", _add_join_indexes),
+    (3, "Add trigger-maintained dashboard stats table", _add_stats_table),
+    (4, "Add Food Listings filter indexes", _add_listing_filter_indexes),
+    (5, "Add indexed Expiry_Day column", _add_expiry_day),
+    (6, "Add Claimed_Quantity to claims", _add_claimed_quantity),
+    (7, "Add trigger-maintained data version", _add_data_version),
+    (8, "Add per-table change counters", _add_table_changes),
+    (9, "Add trigger-maintained claim rollups", _add_claim_rollups),
+    (10, "Add trigger-maintained leaderboards", _add_leaderboards),
+    (11, "Add full-text search indexes", _add_search_index),
+    (12, "Add archiving guard to history triggers", _add_archive_guard),
+    (13, "Add change log", _add_change_log),
+    (14, "Count claims for their Claimed_Quantity in leaderboards", _count_claimed_quantity),
+]
+
+
+def get_schema_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            Version INTEGER PRIMARY KEY,
+            Description TEXT NOT NULL,
+            Applied_At TEXT NOT NULL
+        )
+    ''')
+    conn.commit()
+    return conn.execute("SELECT COALESCE(MAX(Version), 0) FROM schema_migrations").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply all pending migrations and return the list of versions applied"""
+    applied = []
+    current = get_schema_version(conn)
+    if current < MIGRATIONS[-1][0]:
+        # Migrations rebuild tables; the views over them come back below
+        drop_history_views(conn)
+
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have applied it while we waited for the lock
+            done = conn.execute("SELECT 1 FROM schema_migrations WHERE Version = ?", (version,)).fetchone()
+            if not done:
+                apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_migrations (Version, Description, Applied_At) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                )
+                applied.append(version)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    attach_archive(conn)
+    history_views(conn)
+    return applied
+
+
+if __name__ == '__main__':
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'food_management.db'
+    connection = sqlite3.connect(db_path)
+    versions = migrate(connection)
+    if versions:
+        print(f"✅ Applied migrations: {', '.join(str(v) for v in versions)}")
+    else:
+        print("✅ Schema is up to date")
+    print(f"Schema version: {get_schema_version(connection)}")
+    connection.close()
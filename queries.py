@@ -0,0 +1,253 @@
+"""SQL for the 15 analytics queries and the Analytics page charts.
+
+Kept free of Streamlit so the queries can be run headless, e.g. by
+benchmarks/bench_queries.py.
+
+Queries about what has been donated and claimed cover the whole history:
+they read the all_* views (database.py), which add the rows archive.py has
+moved out, or the trigger-maintained leaderboards and rollups, which keep
+counting them. Queries 5, 6, 7 and 14 and the food type chart describe the
+food on offer now, so they read the hot food_listings only
+(CURRENT_LISTINGS_QUERIES).
+"""
+from aggregation import binned_query, top_n_frame, top_n_query
+from expiry import near_expiry_query
+from leaderboards import top_donors_query, top_providers_query, top_receivers_query
+from rollups import claims_trend_query
+
+
+# The 15 SQL Queries
+queries = [
+    """
+    SELECT 
+        p.City,
+        COUNT(DISTINCT p.Provider_ID) as Total_Providers,
+        COUNT(DISTINCT r.Receiver_ID) as Total_Receivers
+    FROM providers p
+    LEFT JOIN receivers r ON p.City = r.City
+    GROUP BY p.City
+    ORDER BY Total_Providers DESC;
+    """,
+    
+    """
+    SELECT 
+        p.Type as Provider_Type,
+        COUNT(fl.Food_ID) as Total_Food_Listings,
+        SUM(fl.Quantity) as Total_Quantity
+    FROM providers p
+    JOIN all_food_listings fl ON p.Provider_ID = fl.Provider_ID
+    GROUP BY p.Type
+    ORDER BY Total_Quantity DESC, Provider_Type;
+    """,
+    
+    """
+    SELECT 
+        City,
+        Name,
+        Type,
+        Contact,
+        Address
+    FROM providers
+    ORDER BY City, Name;
+    """,
+    
+    # Query 4 is served by the trigger-maintained leaderboards in leaderboards.py
+    top_receivers_query(10)[0],
+    
+    """
+    SELECT 
+        SUM(Quantity) as Total_Available_Quantity,
+        COUNT(Food_ID) as Total_Food_Items,
+        COUNT(DISTINCT Provider_ID) as Total_Active_Providers
+    FROM food_listings;
+    """,
+    
+    """
+    SELECT 
+        Location as City,
+        COUNT(Food_ID) as Total_Listings,
+        SUM(Quantity) as Total_Quantity,
+        AVG(Quantity) as Average_Quantity_Per_Listing
+    FROM food_listings
+    GROUP BY Location
+    ORDER BY Total_Listings DESC, City;
+    """,
+    
+    """
+    SELECT 
+        Food_Type,
+        COUNT(Food_ID) as Total_Listings,
+        SUM(Quantity) as Total_Quantity,
+        ROUND(AVG(Quantity), 2) as Average_Quantity
+    FROM food_listings
+    GROUP BY Food_Type
+    ORDER BY Total_Quantity DESC, Food_Type;
+    """,
+    
+    """
+    SELECT 
+        fl.Food_Name,
+        fl.Food_Type,
+        fl.Meal_Type,
+        COALESCE(c.Total_Claims, 0) as Total_Claims,
+        fl.Quantity as Available_Quantity
+    FROM all_food_listings fl
+    LEFT JOIN (
+        SELECT Listing_ID, COUNT(*) as Total_Claims
+        FROM all_claim_listings
+        WHERE Listing_ID IS NOT NULL
+        GROUP BY Listing_ID
+    ) c ON c.Listing_ID = fl.Food_ID
+    ORDER BY Total_Claims DESC, fl.Food_ID
+    LIMIT 15;
+    """,
+    
+    # Query 9 is served by the trigger-maintained leaderboards in leaderboards.py
+    top_providers_query(10)[0],
+    
+    # Query 10 counts from the claim rollups in rollups.py, so archived claims still count
+    """
+    SELECT 
+        Status,
+        SUM(Claims) as Count,
+        ROUND(SUM(Claims) * 100.0 / (SELECT SUM(Claims) FROM claim_rollups_hourly), 2) as Percentage
+    FROM claim_rollups_hourly
+    GROUP BY Status
+    ORDER BY Count DESC;
+    """,
+    
+    """
+    SELECT 
+        r.Type as Receiver_Type,
+        COUNT(DISTINCT r.Receiver_ID) as Total_Receivers,
+        SUM(COALESCE(NULLIF(c.Claimed_Quantity, 0), c.Quantity)) as Total_Quantity_Claimed,
+        ROUND(AVG(COALESCE(NULLIF(c.Claimed_Quantity, 0), c.Quantity)), 2) as Average_Quantity_Per_Claim
+    FROM receivers r
+    JOIN all_claim_listings c ON r.Receiver_ID = c.Receiver_ID
+    WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL
+    GROUP BY r.Type
+    ORDER BY Average_Quantity_Per_Claim DESC, Receiver_Type;
+    """,
+    
+    """
+    SELECT 
+        c.Meal_Type,
+        COUNT(c.Claim_ID) as Total_Claims,
+        SUM(COALESCE(NULLIF(c.Claimed_Quantity, 0), c.Quantity)) as Total_Quantity_Claimed,
+        ROUND(AVG(COALESCE(NULLIF(c.Claimed_Quantity, 0), c.Quantity)), 2) as Average_Quantity_Per_Claim
+    FROM all_claim_listings c
+    WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL
+    GROUP BY c.Meal_Type
+    ORDER BY Total_Quantity_Claimed DESC, Meal_Type;
+    """,
+    
+    # Query 13 is served by the trigger-maintained leaderboards in leaderboards.py
+    top_donors_query(15)[0],
+    
+    # Query 14 is served by the indexed near-expiry lookup in expiry.py
+    near_expiry_query(days=7)[0],
+    
+    # Query 15 is served by the trigger-maintained claim rollups in rollups.py
+    claims_trend_query('month')[0]
+]
+
+# Query descriptions
+query_descriptions = [
+    "1. Food Providers and Receivers Count by City",
+    "2. Provider Type Contribution Analysis", 
+    "3. Provider Contact Information by City",
+    "4. Top 10 Receivers by Quantity Claimed",
+    "5. Overall Food Availability Statistics",
+    "6. Food Listings Count by City",
+    "7. Food Type Availability Analysis",
+    "8. Top 15 Food Items by Number of Claims",
+    "9. Top 10 Providers by Successful Claims",
+    "10. Claims Status Distribution",
+    "11. Average Quantity Claimed by Receiver Type",
+    "12. Meal Type Claims Analysis",
+    "13. Top 15 Providers by Total Quantity Donated",
+    "14. Food Items Expiring Within 7 Days",
+    "15. Monthly Claims Trend"
+]
+
+# Indexes (0-based) of the queries over the food on offer now, which leave archived listings out
+CURRENT_LISTINGS_QUERIES = {4, 5, 6, 13}
+
+# Queries behind the Analytics page charts
+PROVIDER_CHART_QUERY = """
+    SELECT p.Type as Provider_Type, COUNT(fl.Food_ID) as Total_Food_Listings, SUM(fl.Quantity) as Total_Quantity
+    FROM providers p
+    JOIN all_food_listings fl ON p.Provider_ID = fl.Provider_ID
+    GROUP BY p.Type
+    ORDER BY Total_Quantity DESC;
+"""
+
+# From the claim rollups, like Query 10, so archived claims count here too
+CLAIMS_CHART_QUERY = """
+    SELECT Status, SUM(Claims) as Count
+    FROM claim_rollups_hourly
+    GROUP BY Status
+    ORDER BY Count DESC;
+"""
+
+FOOD_TYPE_CHART_QUERY = """
+    SELECT Food_Type, COUNT(Food_ID) as Total_Listings, SUM(Quantity) as Total_Quantity
+    FROM food_listings
+    GROUP BY Food_Type
+    ORDER BY Total_Quantity DESC;
+"""
+
+# How each query's chart aggregates its data in SQL (aggregation.py): top_n
+# keeps the n largest rows plus an "Other" row (other=None drops the rest),
+# binned groups a numeric column into at most n bins; n is the default the
+# page starts with. None: the chart draws the query result as it is.
+PROVIDERS_BY_CITY_QUERY = "SELECT City, COUNT(*) as Providers FROM providers GROUP BY City"
+
+QUERY_CHARTS = [
+    ('top_n', {'label': 'City', 'measures': {'Total_Providers': 'SUM', 'Total_Receivers': 'SUM'}, 'n': 20}),
+    ('top_n', {'label': 'Provider_Type', 'measures': {'Total_Quantity': 'SUM', 'Total_Food_Listings': 'SUM'}, 'n': 10}),
+    ('top_n', {'sql': PROVIDERS_BY_CITY_QUERY, 'label': 'City', 'measures': {'Providers': 'SUM'}, 'n': 20}),
+    ('top_n', {'label': 'Receiver_Name', 'measures': {'Total_Quantity_Claimed': 'SUM'}, 'n': 10, 'other': None}),
+    None,
+    ('top_n', {'label': 'City', 'measures': {'Total_Listings': 'SUM'}, 'n': 20}),
+    ('top_n', {'label': 'Food_Type', 'measures': {'Total_Quantity': 'SUM', 'Total_Listings': 'SUM'}, 'n': 10}),
+    ('top_n', {'label': 'Food_Name', 'measures': {'Total_Claims': 'SUM'}, 'n': 10, 'other': None}),
+    ('top_n', {'label': 'Provider_Name', 'measures': {'Successful_Claims': 'SUM'}, 'n': 10, 'other': None}),
+    ('top_n', {'label': 'Status', 'measures': {'Count': 'SUM', 'Percentage': 'SUM'}, 'n': 10}),
+    # Averages don't add up into an "Other" row
+    ('top_n', {'label': 'Receiver_Type', 'measures': {'Average_Quantity_Per_Claim': 'AVG'}, 'n': 10, 'other': None}),
+    ('top_n', {'label': 'Meal_Type', 'measures': {'Total_Claims': 'SUM', 'Total_Quantity_Claimed': 'SUM'}, 'n': 10}),
+    ('top_n', {'label': 'Provider_Name', 'measures': {'Total_Quantity_Donated': 'SUM'}, 'n': 10, 'other': None}),
+    ('binned', {'column': 'Days_Until_Expiry', 'measures': ['Quantity'], 'n': 20}),
+    None,
+]
+
+
+def chart_query(index, n=None):
+    """(sql, params) for the chart of query index (0-based) with n bars, or None if it uses the result as is"""
+    if QUERY_CHARTS[index] is None:
+        return None
+    kind, spec = QUERY_CHARTS[index]
+    spec = dict(spec)
+    sql = spec.pop('sql', queries[index])
+    default_n = spec.pop('n')
+    n = n or default_n
+    if kind == 'binned':
+        return binned_query(sql, column=spec['column'], measures=spec['measures'], max_bins=n)
+    return top_n_query(sql, n=n, **spec)
+
+
+def chart_frame(index, df, n=None):
+    """chart_query()'s rows computed from df, the result of query index, or None if that needs SQL.
+
+    For results that don't come from SQL (columnar.py); only top_n charts of
+    the query's own result can be computed this way.
+    """
+    if QUERY_CHARTS[index] is None:
+        return df
+    kind, spec = QUERY_CHARTS[index]
+    if kind != 'top_n' or 'sql' in spec:
+        return None
+    spec = dict(spec)
+    default_n = spec.pop('n')
+    return top_n_frame(df, n=n or default_n, **spec)
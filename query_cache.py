@@ -0,0 +1,127 @@
+"""Result cache for read-only SQL queries, invalidated by a data version.
+
+Every CRUD write calls bump_data_version(). Cached results are keyed on
+(query, params, data version), so a write makes all older entries unreachable
+and they age out through LRU eviction.
+
+bump_data_version() only sees writes made in this process. When other
+processes write too (api_server.py, ingest.py), give the cache a
+version_source that reads stored_data_version(), which triggers bump on
+every committed write (migration 7).
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from instrumentation import read_sql
+
+
+_version_lock = threading.Lock()
+_data_version = 0
+
+
+def data_version():
+    return _data_version
+
+
+def stored_data_version(conn):
+    """The database-wide version bumped by the data_version triggers"""
+    row = conn.execute("SELECT Version FROM data_version WHERE Id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def bump_data_version():
+    """Record that the data changed; called by every insert/update/delete"""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+
+class QueryCache:
+    """LRU cache of query results, bounded by entry count and DataFrame size.
+
+    Cached DataFrames are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024, version_source=data_version):
+        self.max_entries = max_entries
+        self.version_source = version_source
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    @staticmethod
+    def _key(query, params, version):
+        return (query, tuple(params) if params is not None else None, version)
+
+    def read_sql(self, query, conn, params=None, load=read_sql):
+        """Cached equivalent of pd.read_sql_query(query, conn, params=params); a miss calls load()"""
+        key = self._key(query, params, self.version_source())
+        df = self.get(key)
+        if df is None:
+            df = load(query, conn, params=params)
+            self.put(key, df)
+        return df
+
+    def read_sql_many(self, queries, executor, return_exceptions=False):
+        """Cached equivalent of executor.run_all(queries); only misses reach the database"""
+        version = self.version_source()
+        items = [item if isinstance(item, tuple) else (item, None) for item in queries]
+        keys = [self._key(query, params, version) for query, params in items]
+        results = [self.get(key) for key in keys]
+
+        missing = [i for i, df in enumerate(results) if df is None]
+        fetched = executor.run_all([items[i] for i in missing], return_exceptions=return_exceptions)
+        for i, df in zip(missing, fetched):
+            if isinstance(df, pd.DataFrame):
+                self.put(keys[i], df)
+            results[i] = df
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'data_version': self.version_source(),
+            }
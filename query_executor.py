@@ -0,0 +1,70 @@
+"""Run independent read queries concurrently on a thread pool.
+
+Each worker thread opens its own read-only connection to the database, so
+queries no longer serialize through the app's shared connection. The
+database is put in WAL mode by database.connect(), so readers run alongside
+the writer. A worker picks the archive database up (and with it the
+all_* history views) as soon as it exists, like the pooled connections.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database import attach_archive, connect, history_views
+from instrumentation import read_sql
+
+
+class ParallelQueryExecutor:
+    def __init__(self, db_path, max_workers=4):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sql-reader')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_path, read_only=True)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        elif attach_archive(conn):
+            # The archive was created since this thread connected
+            history_views(conn)
+        return conn
+
+    def _read_sql(self, query, params):
+        return read_sql(query, self._connection(), params=params)
+
+    def submit(self, query, params=None):
+        """Schedule one query; returns a Future resolving to a DataFrame"""
+        return self._pool.submit(self._read_sql, query, params)
+
+    def run_all(self, queries, return_exceptions=False):
+        """Run queries concurrently and return their DataFrames in input order.
+
+        Each item is either a SQL string or a (sql, params) pair. With
+        return_exceptions=True a failed query yields its exception in place of
+        a DataFrame instead of raising.
+        """
+        futures = []
+        for item in queries:
+            query, params = item if isinstance(item, tuple) else (item, None)
+            futures.append(self.submit(query, params))
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
@@ -0,0 +1,140 @@
+"""Claim trends served from the trigger-maintained claim rollups.
+
+claim_rollups counts claims per day by Status and by the City (Location)
+and Meal_Type of the claimed listing; claim_rollups_hourly counts them per
+hour by Status. Triggers on claims and food_listings (migration 9) keep
+both current, so a trend at any granularity or over any date range groups
+rollup rows instead of rescanning claims. A claim without a parseable
+Timestamp or without its listing is counted under ''. Claims moved to the
+archive (archive.py) stay counted.
+
+reconcile_rollups() recounts both tables from the hot and archived claims
+(all_claim_listings) to detect, and optionally repair, any drift.
+
+    python rollups.py [db_path] [--repair]
+"""
+import argparse
+
+from database import attach_archive, connect, history_views
+
+
+# Period expression by granularity, over a day column. Unfiltered trends read
+# the hourly rollups (a few rows per hour); city or meal type filters need
+# the daily ones. Weeks start on Monday and are labelled by that date
+PERIODS = {
+    'hour': "{hour}",
+    'day': "{day}",
+    'week': "date({day}, 'weekday 0', '-6 days')",
+    'month': "substr({day}, 1, 7)",
+    'year': "substr({day}, 1, 4)",
+}
+GRANULARITIES = list(PERIODS)
+
+# Full recounts over the hot and archived rows, used only for reconciliation
+RECOMPUTE_SQL = {
+    'claim_rollups': """
+        SELECT COALESCE(date(c.Timestamp), '') as Day, c.Status,
+               COALESCE(c.Location, '') as City, COALESCE(c.Meal_Type, '') as Meal_Type, COUNT(*) as Claims
+        FROM all_claim_listings c
+        GROUP BY 1, 2, 3, 4
+    """,
+    'claim_rollups_hourly': """
+        SELECT COALESCE(strftime('%Y-%m-%d %H:00', Timestamp), '') as Hour, Status, COUNT(*) as Claims
+        FROM all_claims
+        GROUP BY 1, 2
+    """,
+}
+
+
+def claims_trend_query(granularity='month', start=None, end=None, city=None, meal_type=None):
+    """Return (sql, params) for claim counts by status per period, newest first.
+
+    start and end are inclusive 'YYYY-MM-DD' days. City and meal type
+    filters need a daily or coarser granularity. The period column is named
+    after the granularity ('Month', 'Day', ...).
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}; expected one of {', '.join(GRANULARITIES)}")
+    conditions, params = [], []
+    if city is None and meal_type is None:
+        table, column = 'claim_rollups_hourly', 'Hour'
+        period = PERIODS[granularity].format(hour='Hour', day='substr(Hour, 1, 10)')
+        if start is not None:
+            conditions.append("Hour >= ?")
+            params.append(str(start))
+        if end is not None:
+            conditions.append("Hour < date(?, '+1 day')")
+            params.append(str(end))
+    else:
+        if granularity == 'hour':
+            raise ValueError("Hourly trends can't be filtered by city or meal type")
+        table, column = 'claim_rollups', 'Day'
+        period = PERIODS[granularity].format(day='Day')
+        for value, condition in [(start, "Day >= ?"), (end, "Day <= ?"), (city, "City = ?"), (meal_type, "Meal_Type = ?")]:
+            if value is not None:
+                conditions.append(condition)
+                params.append(str(value))
+    if start is not None or end is not None:
+        conditions.append(f"{column} <> ''")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    label = granularity.capitalize()
+
+    query = f"""
+    SELECT
+        NULLIF({period}, '') as {label},
+        SUM(Claims) as Total_Claims,
+        SUM(CASE WHEN Status = 'Completed' THEN Claims ELSE 0 END) as Completed_Claims,
+        SUM(CASE WHEN Status = 'Pending' THEN Claims ELSE 0 END) as Pending_Claims,
+        SUM(CASE WHEN Status = 'Cancelled' THEN Claims ELSE 0 END) as Cancelled_Claims
+    FROM {table}
+    {where}
+    GROUP BY 1
+    ORDER BY {label} DESC;
+    """
+    return query, params
+
+
+def reconcile_rollups(conn, repair=False):
+    """Compare the rollup tables with a full recount of the claims.
+
+    Returns {table: number of rows that differ} for every table that
+    drifted. With repair=True the tables are overwritten with the recount;
+    the caller is responsible for committing.
+    """
+    attach_archive(conn)
+    history_views(conn)
+    drift = {}
+    for table, recompute in RECOMPUTE_SQL.items():
+        differing = conn.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT * FROM (SELECT * FROM {table} EXCEPT {recompute})
+                UNION ALL
+                SELECT * FROM ({recompute} EXCEPT SELECT * FROM {table})
+            )
+        """).fetchone()[0]
+        if differing:
+            drift[table] = differing
+        if repair and differing:
+            conn.execute(f"DELETE FROM {table}")
+            conn.execute(f"INSERT INTO {table} {recompute}")
+    return drift
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the claim rollups against a full recount")
+    parser.add_argument('db_path', nargs='?', default='food_management.db')
+    parser.add_argument('--repair', action='store_true', help="overwrite drifted rollups with the recount")
+    args = parser.parse_args()
+
+    connection = connect(args.db_path)
+    drift = reconcile_rollups(connection, repair=args.repair)
+    connection.commit()
+    connection.close()
+
+    if not drift:
+        print("✅ Claim rollups match a full recount")
+    else:
+        for table, rows in drift.items():
+            print(f"❌ {table}: {rows} rows differ")
+        print("🔧 Rollups repaired" if args.repair else "Run with --repair to fix")
+    raise SystemExit(1 if drift and not args.repair else 0)
@@ -0,0 +1,115 @@
+"""Full-text search over food listings, providers and receivers (SQLite FTS5).
+
+listings_fts indexes Food_Name, providers_fts provider Name, Address and
+City, and receivers_fts receiver Name and City. They are external-content
+tables: they store only the index and read the text from the base tables,
+which triggers (migration 11) keep them in sync with. Every word typed
+matches as a prefix ("fre veg" finds "Fresh Vegetables"), accents are
+ignored, and results are ranked by bm25 with names weighted highest.
+
+check_search_index() runs FTS5's integrity check against the base tables
+and can rebuild an index that drifted.
+
+    python search.py [db_path] [--repair]
+"""
+import argparse
+import re
+import sqlite3
+
+from instrumentation import read_sql
+
+
+# base table: (FTS table, key, {indexed column: bm25 weight}, columns returned)
+SEARCH_TABLES = {
+    'food_listings': ('listings_fts', 'Food_ID', {'Food_Name': 1.0},
+                      ['Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Location', 'Food_Type', 'Meal_Type']),
+    'providers': ('providers_fts', 'Provider_ID', {'Name': 10.0, 'Address': 1.0, 'City': 3.0},
+                  ['Provider_ID', 'Name', 'Type', 'Address', 'City', 'Contact']),
+    'receivers': ('receivers_fts', 'Receiver_ID', {'Name': 10.0, 'City': 3.0},
+                  ['Receiver_ID', 'Name', 'Type', 'City', 'Contact']),
+}
+MIN_WORD_LENGTH = 2
+
+
+def match_expression(text):
+    """The FTS5 MATCH expression for what the user typed, or None if it has no word to search.
+
+    Each word is quoted, so FTS5 operators and punctuation in the input are
+    searched for literally instead of being parsed.
+    """
+    words = re.findall(r'\w+', text or '')
+    # A one-letter prefix matches a large share of any index, so ranking it
+    # can't be fast; wait for a longer word
+    if not any(len(word) >= MIN_WORD_LENGTH for word in words):
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_query(table, text, limit=20):
+    """Return (sql, params) for the best matches in one base table, or (None, None)"""
+    expression = match_expression(text)
+    if expression is None:
+        return None, None
+    fts, key, weights, columns = SEARCH_TABLES[table]
+    selected = ', '.join(f't.{column}' for column in columns)
+    # Rank inside the index and look up only the best rows in the base table
+    query = f"""
+    SELECT {selected}
+    FROM (
+        SELECT rowid, bm25({fts}, {', '.join(str(weight) for weight in weights.values())}) as Score
+        FROM {fts}
+        WHERE {fts} MATCH ?
+        ORDER BY Score
+        LIMIT ?
+    ) m
+    JOIN {table} t ON t.{key} = m.rowid
+    ORDER BY m.Score;
+    """
+    return query, [expression, int(limit)]
+
+
+def search(conn, text, limit=20):
+    """Best matches for text in each base table, as {table: DataFrame}; empty if there is no word to search"""
+    results = {}
+    for table in SEARCH_TABLES:
+        query, params = search_query(table, text, limit)
+        if query is not None:
+            results[table] = read_sql(query, conn, params=params)
+    return results
+
+
+def check_search_index(conn, repair=False):
+    """Run the FTS5 integrity check on every search index.
+
+    Returns the FTS tables that don't match their base table. With
+    repair=True those are rebuilt; the caller is responsible for committing.
+    """
+    failed = []
+    for fts, _, _, _ in SEARCH_TABLES.values():
+        try:
+            conn.execute(f"INSERT INTO {fts} ({fts}, rank) VALUES ('integrity-check', 1)")
+        except sqlite3.DatabaseError:
+            failed.append(fts)
+            if repair:
+                conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    return failed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the full-text search indexes against their tables")
+    parser.add_argument('db_path', nargs='?', default='food_management.db')
+    parser.add_argument('--repair', action='store_true', help="rebuild indexes that don't match")
+    args = parser.parse_args()
+
+    connection = sqlite3.connect(args.db_path)
+    failed = check_search_index(connection, repair=args.repair)
+    connection.commit()
+    connection.close()
+
+    if not failed:
+        print("✅ Search indexes match their tables")
+    else:
+        for fts in failed:
+            print(f"❌ {fts} is out of sync")
+        print("🔧 Search indexes rebuilt" if args.repair else "Run with --repair to fix")
+    raise SystemExit(1 if failed and not args.repair else 0)
@@ -0,0 +1,116 @@
+"""Shared fixtures: a migrated database in a temporary directory.
+
+Run from the repository root with python -m pytest.
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud
+from archive import archive_expired
+from dashboard_stats import reconcile_stats
+from database import DatabaseWriter, connect
+from leaderboards import reconcile_leaderboards
+from migrations import migrate
+from rollups import reconcile_rollups
+from search import check_search_index
+
+
+PROVIDERS = [
+    (1, 'Green Grocer', 'Grocery Store', '1 Main St', 'Springfield', '555-0101'),
+    (2, 'Corner Bakery', 'Restaurant', '2 Oak Ave', 'Springfield', '555-0102'),
+    (3, 'Harbor Market', 'Supermarket', '3 Dock Rd', 'Shelbyville', '555-0103'),
+]
+RECEIVERS = [
+    (1, 'Food For All', 'NGO', 'Springfield', '555-0201'),
+    (2, 'Night Shelter', 'Shelter', 'Springfield', '555-0202'),
+    (3, 'Sam Smith', 'Individual', 'Springfield', '555-0203'),
+    (4, 'Harbor Charity', 'Charity', 'Shelbyville', '555-0204'),
+]
+LISTINGS = [
+    (1, 'Bread', 20, '2030-01-10', 2, 'Restaurant', 'Springfield', 'Vegetarian', 'Breakfast'),
+    (2, 'Soup', 15, '2030-01-05', 1, 'Grocery Store', 'Springfield', 'Vegan', 'Dinner'),
+    (3, 'Chicken', 10, '2030-01-03', 1, 'Grocery Store', 'Springfield', 'Non-Vegetarian', 'Lunch'),
+    (4, 'Fish', 12, '2030-01-04', 3, 'Supermarket', 'Shelbyville', 'Non-Vegetarian', 'Dinner'),
+    (5, 'Salad', 8, '2030-01-02', 3, 'Supermarket', 'Shelbyville', 'Vegan', 'Lunch'),
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'food_management.db')
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def writer(db_path, monkeypatch):
+    # Listeners registered by a test must not outlive it
+    monkeypatch.setattr(crud, '_write_listeners', [])
+    writer = DatabaseWriter(db_path)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = connect(db_path, isolation_level=None)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def seeded(writer):
+    """The writer over a database holding a few providers, receivers and listings"""
+    crud.insert_providers_many(writer, PROVIDERS)
+    crud.insert_receivers_many(writer, RECEIVERS)
+    crud.insert_food_listings_many(writer, LISTINGS)
+    return writer
+
+
+@pytest.fixture
+def churned(seeded, conn):
+    """seeded after a mix of inserts, updates, deletes and an archival run"""
+    crud.insert_claims_many(seeded, [
+        (1, 1, 1, 'Completed', '2030-01-01 09:00:00'),
+        (2, 2, 2, 'Pending', '2030-01-01 10:30:00'),
+        (3, 3, 3, 'Completed', '2030-01-02 11:00:00'),
+        (4, 4, 4, 'Cancelled', '2030-01-08 12:00:00'),
+        (5, 5, 1, 'Pending', 'not a date'),
+    ])
+    crud.claim_food(seeded, 1, 2, quantity=2, claim_id=6, timestamp='2030-01-03 08:00:00')
+    crud.update_claim_status_many(seeded, [(2, 'Completed'), (6, 'Cancelled'), (5, 'Completed')])
+    crud.update_food_quantity(seeded, 4, 30)
+    crud.update_provider_contact(seeded, 1, '555-0999')
+    crud.delete_claim(seeded, 3)
+    # Claim 4 is left without its listing, claim 1 without its receiver
+    crud.delete_food_listing(seeded, 4)
+    crud.delete_receiver(seeded, 1)
+    crud.insert_food_listing(seeded, 6, 'Rice', 25, '2030-03-01', 2, 'Restaurant', 'Springfield', 'Vegan', 'Dinner')
+    crud.claim_food(seeded, 6, 3, quantity=5, claim_id=7, timestamp='2030-02-01 09:00:00')
+    report = archive_expired(conn, cutoff='2030-02-01')
+    assert report['food_listings'] and report['claims']
+    crud.update_claim_status(seeded, 7, 'Completed')
+    crud.claim_food(seeded, 6, 2, quantity=1, claim_id=8, timestamp='2030-02-02 09:00:00')
+    crud.delete_claim(seeded, 8)
+    return seeded
+
+
+@pytest.fixture
+def drift():
+    """drift(conn): every trigger-maintained summary that differs from a plain recount"""
+    def check(conn):
+        found = {
+            'stats': reconcile_stats(conn),
+            'rollups': reconcile_rollups(conn),
+            'leaderboards': reconcile_leaderboards(conn),
+            'search': check_search_index(conn),
+        }
+        return {name: differing for name, differing in found.items() if differing}
+    return check
@@ -0,0 +1,65 @@
+"""Top-N + "Other" and binning in SQL agree with the full result they summarize"""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import crud
+from aggregation import binned_query, top_n_frame, top_n_query
+from queries import QUERY_CHARTS, chart_frame, chart_query, queries
+
+
+@pytest.fixture
+def cities():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE t (City TEXT, Listings INTEGER, Quantity REAL)")
+    rows = [(f'City {i:02}', (i * 7) % 11, i - 5.5) for i in range(25)]
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)", rows)
+    yield conn
+    conn.close()
+
+
+def test_top_n_keeps_totals(cities):
+    full = pd.read_sql("SELECT City, Listings FROM t", cities)
+    sql, params = top_n_query("SELECT City, Listings FROM t;", label='City', measures={'Listings': 'SUM'}, n=5)
+    top = pd.read_sql(sql, cities, params=params)
+    assert len(top) == 6 and top['City'].iloc[-1] == 'Other'
+    assert top['Listings'].sum() == full['Listings'].sum()
+    # Ties on the measure are broken by label
+    expected = full.sort_values(['Listings', 'City'], ascending=[False, True]).head(5)
+    assert top['City'].iloc[:5].tolist() == expected['City'].tolist()
+    pd.testing.assert_frame_equal(top_n_frame(full, label='City', measures={'Listings': 'SUM'}, n=5), top)
+
+    sql, params = top_n_query("SELECT City, Listings FROM t", label='City', measures={'Listings': 'SUM'}, n=5, other=None)
+    assert len(pd.read_sql(sql, cities, params=params)) == 5
+    sql, params = top_n_query("SELECT City, Listings FROM t", label='City', measures={'Listings': 'SUM'}, n=30)
+    assert len(pd.read_sql(sql, cities, params=params)) == 25
+
+
+def test_bins_cover_every_row(cities):
+    sql, params = binned_query("SELECT * FROM t", column='Quantity', measures=['Listings'], max_bins=4)
+    bins = pd.read_sql(sql, cities, params=params)
+    assert len(bins) <= 4 and bins['Rows'].sum() == 25
+    assert bins['Listings'].sum() == cities.execute("SELECT SUM(Listings) FROM t").fetchone()[0]
+    # Floored: -5.5 falls in the bin starting at -6
+    assert bins['Bin_Start'].iloc[0] == -6
+    assert (bins['Bin_Start'].iloc[1:].values == bins['Bin_End'].iloc[:-1].values + 1).all()
+
+    sql, params = binned_query("SELECT * FROM t WHERE Listings < 3", column='Listings', max_bins=20)
+    bins = pd.read_sql(sql, cities, params=params)
+    assert bins['Bin'].tolist() == ['0', '1', '2']
+
+
+def test_every_query_chart_runs(seeded, conn):
+    crud.insert_claims_many(seeded, [(1, 1, 1, 'Completed', '2030-01-01 09:00:00'),
+                                     (2, 2, 2, 'Pending', '2030-01-02 10:00:00')])
+    for index, chart in enumerate(QUERY_CHARTS):
+        query = chart_query(index, n=2)
+        if query is None:
+            continue
+        df = pd.read_sql(query[0], conn, params=query[1])
+        assert len(df) <= 3, chart
+        # Charts of a query's own result can be computed from it, with the same rows
+        frame = chart_frame(index, pd.read_sql(queries[index], conn), n=2)
+        if frame is not None:
+            pd.testing.assert_frame_equal(frame, df, check_dtype=False)
@@ -0,0 +1,137 @@
+"""The JSON API, driven through ApiServer.respond() and read_request() without a socket"""
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from api_server import GZIP_MIN_BYTES, MAX_BODY_BYTES, ApiServer, HttpError, Request
+
+
+@pytest.fixture
+def api(db_path):
+    api = ApiServer(db_path, workers=2)
+    yield api
+    api.close()
+
+
+def read(api, raw):
+    """Parse raw request bytes the way the server does"""
+    async def parse():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await api.read_request(reader)
+    return asyncio.run(parse())
+
+
+@pytest.mark.parametrize('length', ['abc', '-5', '1.5'])
+def test_bad_content_length_is_400(api, length):
+    with pytest.raises(HttpError) as error:
+        read(api, f"POST /providers HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+    assert error.value.status == 400
+
+
+def test_oversized_body_is_413(api):
+    with pytest.raises(HttpError) as error:
+        read(api, f"POST /providers HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n".encode())
+    assert error.value.status == 413
+
+
+def test_body_is_read_to_content_length(api):
+    request = read(api, b'POST /providers/batch HTTP/1.1\r\nContent-Length: 11\r\n\r\n{"rows": []}')
+    assert (request.method, request.path, request.body) == ('POST', '/providers/batch', b'{"rows": []')
+
+
+def post(api, path, payload):
+    request = Request('POST', path, {}, {}, json.dumps(payload).encode())
+    head, _, body = api.respond(request).partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_insert_validation(api):
+    provider = {'Provider_ID': 1, 'Name': 'Green Grocer', 'Type': 'Grocery Store',
+                'Address': '1 Main St', 'City': 'Springfield', 'Contact': '555-0101'}
+    listing = {'Food_ID': 1, 'Food_Name': 'Bread', 'Quantity': 5, 'Expiry_Date': '2030-01-10', 'Provider_ID': 1,
+               'Provider_Type': 'Grocery Store', 'Location': 'Springfield', 'Food_Type': 'Vegan', 'Meal_Type': 'Lunch'}
+    assert post(api, '/providers', provider)[0] == 201
+    assert post(api, '/food_listings', {**listing, 'Quantity': -3})[0] == 400
+    assert post(api, '/food_listings', {**listing, 'Provider_ID': 99})[0] == 422
+
+    status, payload = post(api, '/food_listings/batch', {'rows': [
+        {**listing, 'Food_ID': 2, 'Quantity': -1},
+        {**listing, 'Food_ID': 3, 'Provider_ID': 99},
+        {**listing, 'Food_ID': 4},
+        'not a row',
+    ]})
+    assert status == 200 and payload['inserted'] == 1
+    assert [(o['id'], o['ok']) for o in payload['outcomes']] == [(2, False), (3, False), (4, True), (None, False)]
+    assert payload['outcomes'][0]['message'] == "negative Quantity"
+    assert payload['outcomes'][1]['message'] == "unknown Provider_ID 99"
+
+    status, payload = post(api, '/food_listings/batch', {'rows': [{**listing, 'Food_ID': 5, 'Provider_ID': 98}]})
+    assert status == 422 and payload['inserted'] == 0
+
+    assert post(api, '/claims', {'Food_ID': 4, 'Receiver_ID': 7})[0] == 422
+    assert post(api, '/claims', {'Food_ID': 4, 'Receiver_ID': 7, 'Quantity': -2})[0] == 400
+
+
+def get(api, target, headers=None):
+    """(status, headers, body) of GET target, parsed and answered like a socket request"""
+    raw = f"GET {target} HTTP/1.1\r\n" + ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    head, _, body = api.respond(read(api, (raw + "\r\n").encode())).partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    return int(lines[0].split()[1]), dict(line.split(': ', 1) for line in lines[1:]), body
+
+
+def add_providers(api, ids):
+    rows = [{'Provider_ID': i, 'Name': f'Provider {i}', 'Type': 'Restaurant', 'Address': f'{i} Main St',
+             'City': 'Springfield' if i % 2 else 'Shelbyville', 'Contact': f'555-{i:04}'} for i in ids]
+    status, payload = post(api, '/providers/batch', {'rows': rows})
+    assert (status, payload['inserted']) == (200, len(rows))
+
+
+def test_etag_revalidation(api):
+    add_providers(api, range(1, 4))
+    status, headers, body = get(api, '/providers')
+    assert status == 200 and headers['ETag'].startswith('W/"')
+    status, revalidated, body = get(api, '/providers', {'If-None-Match': headers['ETag']})
+    assert (status, body, revalidated['ETag']) == (304, b'', headers['ETag'])
+
+    # Any committed write changes the tag
+    add_providers(api, [4])
+    status, changed, body = get(api, '/providers', {'If-None-Match': headers['ETag']})
+    assert status == 200 and changed['ETag'] != headers['ETag']
+    assert len(json.loads(body)['rows']) == 4
+
+
+def test_large_bodies_are_gzipped(api):
+    add_providers(api, range(1, 31))
+    _, headers, plain = get(api, '/providers')
+    assert len(plain) >= GZIP_MIN_BYTES and 'Content-Encoding' not in headers
+    _, headers, body = get(api, '/providers', {'Accept-Encoding': 'gzip, deflate'})
+    assert headers['Content-Encoding'] == 'gzip' and headers['Content-Length'] == str(len(body))
+    assert gzip.decompress(body) == plain
+    _, headers, _ = get(api, '/health', {'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in headers
+
+
+def test_keyset_pagination(api):
+    add_providers(api, range(1, 31))
+    seen, target = [], '/providers?limit=7'
+    while target:
+        status, _, body = get(api, target)
+        page = json.loads(body)
+        assert status == 200 and len(page['rows']) <= 7
+        seen += [row['Provider_ID'] for row in page['rows']]
+        after = page['next_after_id']
+        target = f'/providers?limit=7&after_id={after}' if after is not None else None
+    assert seen == list(range(1, 31))
+
+    # A row inserted behind the cursor doesn't shift the next page
+    _, _, body = get(api, '/providers?limit=10')
+    after = json.loads(body)['next_after_id']
+    add_providers(api, [0])
+    _, _, body = get(api, f'/providers?limit=10&after_id={after}')
+    assert [row['Provider_ID'] for row in json.loads(body)['rows']] == list(range(11, 21))
+    assert get(api, '/providers?limit=0')[0] == 400
@@ -0,0 +1,110 @@
+"""Archiving keeps the summaries exact and the archived IDs out of reach"""
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import crud
+from archive import archive_expired
+from claims import ClaimError
+from columnar import COLUMNAR_QUERIES, ColumnarSnapshot
+from matching import MatchIndex
+from queries import CLAIMS_CHART_QUERY, CURRENT_LISTINGS_QUERIES, PROVIDER_CHART_QUERY, queries
+
+
+CLAIMS = [
+    (1, 1, 1, 'Completed', '2030-01-01 09:00:00'),
+    (2, 2, 2, 'Cancelled', '2030-01-01 10:00:00'),
+    (3, 3, 3, 'Completed', '2030-01-01 11:00:00'),
+    (4, 5, 4, 'Pending', '2030-01-01 12:00:00'),
+]
+NEW_LISTING = ('Bread', 5, '2030-02-01', 2, 'Restaurant', 'Springfield', 'Vegetarian', 'Breakfast')
+
+
+@pytest.fixture
+def archived(seeded, conn):
+    """Listings 1-4 and claims 1-3 archived; listing 5 and claim 4 stay hot"""
+    crud.insert_claims_many(seeded, CLAIMS)
+    report = archive_expired(conn, cutoff='2031-01-01')
+    assert (report['food_listings'], report['claims']) == (4, 3)
+    return seeded
+
+
+def test_archived_ids_are_not_reused(archived, conn, drift):
+    with pytest.raises(sqlite3.IntegrityError, match="archived listing"):
+        crud.insert_food_listing(archived, 1, *NEW_LISTING)
+    outcomes = crud.insert_food_listings_many(archived, [(2, *NEW_LISTING), (6, *NEW_LISTING)])
+    assert [o['ok'] for o in outcomes] == [False, True]
+
+    with pytest.raises(sqlite3.IntegrityError, match="archived claim"):
+        crud.insert_claim(archived, 1, 5, 1, 'Pending', '2030-01-02 09:00:00')
+    outcomes = crud.insert_claims_many(archived, [(2, 5, 1, 'Pending', '2030-01-02 09:00:00'),
+                                                 (5, 3, 1, 'Pending', '2030-01-02 09:00:00'),
+                                                 (6, 5, 1, 'Pending', '2030-01-02 09:00:00')])
+    assert [o['ok'] for o in outcomes] == [False, False, True]
+    assert outcomes[1]['message'] == "unknown Food_ID 3"
+    with pytest.raises(sqlite3.IntegrityError, match="archived listing"):
+        crud.insert_claim(archived, 7, 3, 1, 'Pending', '2030-01-02 09:00:00')
+
+    with pytest.raises(ClaimError, match="not found"):
+        crud.claim_food(archived, 3, 1)
+    with pytest.raises(sqlite3.IntegrityError, match="archived claim"):
+        crud.claim_food(archived, 5, 1, claim_id=3)
+    # The refused reservation took nothing off the listing
+    assert conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = 5").fetchone() == (8,)
+
+    assert conn.execute("SELECT COUNT(*) FROM all_food_listings").fetchone() == (6,)
+    assert conn.execute("SELECT COUNT(*) FROM all_claims").fetchone() == (5,)
+    assert drift(conn) == {}
+
+
+def test_archive_keeps_summaries_exact(archived, conn, drift):
+    assert drift(conn) == {}
+    crud.claim_food(archived, 5, 1, quantity=3)
+    crud.update_claim_status(archived, 4, 'Cancelled')
+    crud.delete_food_listing(archived, 5)
+    assert drift(conn) == {}
+
+
+def test_history_queries_see_archived_rows(seeded, conn, tmp_path):
+    history = [query for i, query in enumerate(queries) if i not in CURRENT_LISTINGS_QUERIES]
+    history += [PROVIDER_CHART_QUERY, CLAIMS_CHART_QUERY]
+    crud.insert_claims_many(seeded, CLAIMS)
+    before = [pd.read_sql(query, conn) for query in history]
+    affinity = {r: +counts for r, counts in MatchIndex.load(conn)._affinity.items() if +counts}
+
+    archive_expired(conn, cutoff='2031-01-01')
+    for query, expected in zip(history, before):
+        pd.testing.assert_frame_equal(pd.read_sql(query, conn), expected)
+    assert {r: +counts for r, counts in MatchIndex.load(conn)._affinity.items() if +counts} == affinity
+
+    # Queries 6 and 7 count listing 5 only, the columnar snapshot too
+    snapshot = ColumnarSnapshot(str(tmp_path / 'snapshot.columnar'))
+    for query in COLUMNAR_QUERIES:
+        pd.testing.assert_frame_equal(snapshot.read_sql(query, conn), pd.read_sql(query, conn), check_dtype=False)
+    assert pd.read_sql(queries[5], conn)['Total_Listings'].tolist() == [1]
+
+
+def test_failed_batch_leaves_no_guard(seeded, conn, drift):
+    crud.insert_claims_many(seeded, CLAIMS)
+    before = conn.execute("SELECT SUM(Claims) FROM claim_rollups").fetchone()
+    # An archive run with nothing to move creates the archive; a clashing
+    # archived claim then makes the next run fail halfway through its batch
+    archive_expired(conn, cutoff='2000-01-01')
+    conn.execute("INSERT INTO archive.claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp) "
+                 "VALUES (1, 99, 1, 'Completed', '2029-01-01 09:00:00')")
+    with pytest.raises(sqlite3.IntegrityError):
+        archive_expired(conn, cutoff='2031-01-01')
+    conn.execute("DELETE FROM archive.claims")
+    assert conn.execute("SELECT COUNT(*) FROM archiving").fetchone() == (0,)
+    assert conn.execute("SELECT COUNT(*) FROM claims").fetchone() == (4,)
+    assert drift(conn) == {}
+
+    # The guard went with the rollback, so a delete still comes off the history
+    crud.delete_claim(seeded, 2)
+    assert conn.execute("SELECT SUM(Claims) FROM claim_rollups").fetchone()[0] == before[0] - 1
+
+    report = archive_expired(conn, cutoff='2031-01-01')
+    assert (report['food_listings'], report['claims']) == (4, 2)
+    assert conn.execute("SELECT COUNT(*) FROM archiving").fetchone() == (0,)
+    assert drift(conn) == {}
@@ -0,0 +1,75 @@
+"""Delta refreshes from the change feed end up where a full reload does"""
+import pandas as pd
+
+import crud
+from archive import archive_expired
+from changes import CHANGE_KEYS, changes_since, current_cursor, refresh_rows
+
+
+LISTINGS_QUERY = """
+    SELECT fl.Food_ID, fl.Food_Name, fl.Quantity, fl.Provider_ID, p.Name as Provider_Name
+    FROM food_listings fl LEFT JOIN providers p ON p.Provider_ID = fl.Provider_ID
+"""
+CLAIMS_QUERY = """
+    SELECT c.Claim_ID, c.Status, c.Food_ID, fl.Food_Name
+    FROM claims c LEFT JOIN food_listings fl ON fl.Food_ID = c.Food_ID
+"""
+
+
+def refreshed(conn, rows, cursor, query, key, table, dependencies):
+    changes = changes_since(conn, cursor)
+    assert not changes.reset
+    return refresh_rows(conn, rows, query, [], key, table, changes.changed, dependencies), changes.cursor
+
+
+def reloaded(conn, query, key):
+    return pd.read_sql(query, conn).sort_values(key, kind='stable').reset_index(drop=True)
+
+
+def test_delta_refresh_matches_reload(seeded, conn):
+    crud.insert_claims_many(seeded, [(1, 1, 1, 'Completed', '2030-01-01 09:00:00'),
+                                     (2, 2, 2, 'Pending', '2030-01-01 10:00:00')])
+    cursor = current_cursor(conn)
+    listings, claims = reloaded(conn, LISTINGS_QUERY, 'Food_ID'), reloaded(conn, CLAIMS_QUERY, 'Claim_ID')
+
+    crud.claim_food(seeded, 5, 3, quantity=2, claim_id=3, timestamp='2030-01-01 11:00:00')
+    crud.update_claim_status_many(seeded, [(2, 'Cancelled'), (3, 'Completed')])
+    crud.update_provider_contact(seeded, 3, '555-0999')
+    conn.execute("UPDATE providers SET Name = 'Corner Bakery & Cafe' WHERE Provider_ID = 2")
+    crud.delete_food_listing(seeded, 4)
+    crud.insert_food_listing(seeded, 6, 'Rice', 25, '2030-03-01', 2, 'Restaurant', 'Springfield', 'Vegan', 'Dinner')
+    assert archive_expired(conn, cutoff='2030-01-09')['food_listings'] == 2
+    crud.update_food_quantity(seeded, 6, 20)
+
+    listings, cursor_after = refreshed(conn, listings, cursor, LISTINGS_QUERY, 'Food_ID', 'food_listings',
+                                       {'providers': 'Provider_ID'})
+    pd.testing.assert_frame_equal(listings, reloaded(conn, LISTINGS_QUERY, 'Food_ID'))
+    claims, _ = refreshed(conn, claims, cursor, CLAIMS_QUERY, 'Claim_ID', 'claims', {'food_listings': 'Food_ID'})
+    pd.testing.assert_frame_equal(claims, reloaded(conn, CLAIMS_QUERY, 'Claim_ID'))
+    assert changes_since(conn, cursor_after) == (cursor_after, False, {})
+
+
+def test_every_write_is_logged(churned, conn):
+    logged = {(table, row_id) for table, row_id in conn.execute("SELECT Table_Name, Row_ID FROM change_log")}
+    for table, key in CHANGE_KEYS.items():
+        for source in [table] + ([f'archive.{table}'] if table in ('food_listings', 'claims') else []):
+            rows = {(table, row[0]) for row in conn.execute(f"SELECT {key} FROM {source}")}
+            assert rows <= logged, source
+    # Deleted rows are logged too: claim 3, listing 4, receiver 1
+    assert {('claims', 3), ('food_listings', 4), ('receivers', 1)} <= logged
+
+    # Replaying the whole log onto nothing gives the current rows
+    empty = pd.read_sql(LISTINGS_QUERY + " WHERE 0", conn)
+    listings, _ = refreshed(conn, empty, 0, LISTINGS_QUERY, 'Food_ID', 'food_listings', {'providers': 'Provider_ID'})
+    pd.testing.assert_frame_equal(listings, reloaded(conn, LISTINGS_QUERY, 'Food_ID'), check_dtype=False)
+
+
+def test_stale_cursors_reload(churned, conn):
+    latest = current_cursor(conn)
+    assert changes_since(conn, None) == (latest, True, {})
+    assert changes_since(conn, latest + 10) == (latest, True, {})
+    assert changes_since(conn, 0, limit=3) == (latest, True, {})
+    assert not changes_since(conn, latest - 3).reset
+    conn.execute("DELETE FROM change_log WHERE Seq <= 5")
+    assert changes_since(conn, 3).reset
+    assert not changes_since(conn, 5).reset
@@ -0,0 +1,116 @@
+"""Claim reservations: units are never over-claimed and every transition settles them"""
+import sqlite3
+import threading
+
+import pytest
+
+import crud
+from claims import (ClaimError, InsufficientQuantity, InvalidTransition, TRANSITIONS, process_claim, run_immediate,
+                    settle_claim)
+from database import connect
+
+
+def quantity(conn, food_id):
+    return conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = ?", (food_id,)).fetchone()[0]
+
+
+def test_reservation(seeded, conn):
+    # Listing 5 has 8 units
+    claim_id, left = process_claim(conn, 5, 1, quantity=3)
+    assert left == quantity(conn, 5) == 5
+    assert conn.execute("SELECT Status, Claimed_Quantity FROM claims WHERE Claim_ID = ?",
+                        (claim_id,)).fetchone() == ('Pending', 3)
+    with pytest.raises(InsufficientQuantity):
+        process_claim(conn, 5, 1, quantity=6)
+    with pytest.raises(ClaimError, match="at least 1"):
+        process_claim(conn, 5, 1, quantity=0)
+    with pytest.raises(ClaimError, match="Receiver 42 not found"):
+        process_claim(conn, 5, 42)
+    with pytest.raises(ClaimError, match="Food listing 42 not found"):
+        process_claim(conn, 42, 1)
+    # The refused claims wrote nothing
+    assert quantity(conn, 5) == 5
+    assert conn.execute("SELECT COUNT(*) FROM claims").fetchone() == (1,)
+
+
+@pytest.mark.parametrize('old, new', sorted(TRANSITIONS))
+def test_transition_settles_reservation(seeded, conn, old, new):
+    claim_id, _ = process_claim(conn, 1, 1, quantity=4)
+    if old != 'Pending':
+        settle_claim(conn, claim_id, old)
+    before = quantity(conn, 1)
+    settle_claim(conn, claim_id, new)
+    assert quantity(conn, 1) == before + TRANSITIONS[(old, new)] * 4
+    assert conn.execute("SELECT Status FROM claims WHERE Claim_ID = ?", (claim_id,)).fetchone() == (new,)
+
+
+def test_refused_transitions(seeded, conn):
+    claim_id, _ = process_claim(conn, 5, 1, quantity=5)
+    settle_claim(conn, claim_id, 'Cancelled')
+    process_claim(conn, 5, 2, quantity=6)
+    # Its units went to another claim, so it can't be reopened
+    with pytest.raises(InsufficientQuantity):
+        settle_claim(conn, claim_id, 'Pending')
+    with pytest.raises(InvalidTransition):
+        settle_claim(conn, claim_id, 'Lost')
+    assert conn.execute("SELECT Status FROM claims WHERE Claim_ID = ?", (claim_id,)).fetchone() == ('Cancelled',)
+    assert quantity(conn, 5) == 2
+
+    # Claims recorded before reservations hold nothing
+    crud.insert_claim(seeded, 10, 5, 3, 'Pending', '2030-01-01 09:00:00')
+    settle_claim(conn, 10, 'Cancelled')
+    settle_claim(conn, 10, 'Completed')
+    assert quantity(conn, 5) == 2
+
+
+def test_concurrent_claims_never_overdraw(seeded, db_path):
+    # Listing 1 has 20 units; 12 claimers want 3 each
+    results = []
+
+    def claimer(receiver_id):
+        conn = connect(db_path, isolation_level=None)
+        try:
+            process_claim(conn, 1, receiver_id, quantity=3)
+            results.append(True)
+        except InsufficientQuantity:
+            results.append(False)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=claimer, args=(i % 4 + 1,)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 6
+    conn = connect(db_path)
+    assert quantity(conn, 1) == 2
+    assert conn.execute("SELECT SUM(Claimed_Quantity) FROM claims WHERE Food_ID = 1").fetchone() == (18,)
+    conn.close()
+
+
+def hold_write_lock(db_path, seconds):
+    """Take the write lock on another connection and let it go after seconds"""
+    blocker = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(seconds, lambda: (blocker.execute("COMMIT"), blocker.close()))
+    release.start()
+    return release
+
+
+def test_busy_transaction_is_retried(seeded, db_path, conn):
+    conn.execute("PRAGMA busy_timeout = 0")
+    hold_write_lock(db_path, 0.05)
+    assert run_immediate(conn, lambda c: c.execute("UPDATE food_listings SET Quantity = 1 WHERE Food_ID = 1").rowcount) == 1
+
+    release = hold_write_lock(db_path, 5)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        run_immediate(conn, lambda c: None, retries=1)
+    release.cancel()
+    release.function()
+
+    # The writer thread retries its own BEGIN IMMEDIATE the same way
+    seeded.conn.execute("PRAGMA busy_timeout = 0")
+    hold_write_lock(db_path, 0.05)
+    crud.claim_food(seeded, 1, 1, quantity=1)
+    assert quantity(conn, 1) == 0
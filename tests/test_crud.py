@@ -0,0 +1,58 @@
+"""Batch CRUD: one transaction per batch, one outcome per row in input order"""
+import crud
+from ingest import RejectedRow, clean_row
+
+
+def test_batch_outcomes_in_input_order(seeded, conn):
+    written = []
+    crud.add_write_listener(lambda table, action, row: written.append((table, action, row[0])))
+
+    outcomes = crud.insert_providers_many(seeded, [
+        (4, 'Bakery Two', 'Restaurant', '4 Elm St', 'Springfield', '555-0104'),
+        (1, 'Green Grocer', 'Grocery Store', '1 Main St', 'Springfield', '555-0101'),
+        (4, 'Bakery Two', 'Restaurant', '4 Elm St', 'Springfield', '555-0104'),
+        (5, None, 'Restaurant', '5 Elm St', 'Springfield', '555-0105'),
+        (6, 'Deli', 'Restaurant', '6 Elm St', 'Springfield', '555-0106'),
+    ])
+    assert [o['id'] for o in outcomes] == [4, 1, 4, 5, 6]
+    assert [o['ok'] for o in outcomes] == [True, False, False, False, True]
+    assert outcomes[1]['message'] == "Provider_ID 1 already exists"
+    assert outcomes[2]['message'] == "Provider_ID 4 already exists"
+    # SQLite rejected the batch, so it was replayed row by row
+    assert "NOT NULL" in outcomes[3]['message']
+    assert [row[0] for row in conn.execute("SELECT Provider_ID FROM providers ORDER BY Provider_ID")] == [1, 2, 3, 4, 6]
+    # Listeners hear about the written rows only
+    assert written == [('providers', 'insert', 4), ('providers', 'insert', 6)]
+
+    outcomes = crud.update_food_quantities_many(seeded, [(1, 7), (42, 3)])
+    assert [(o['ok'], o['message']) for o in outcomes] == [(True, "Food_ID 1 updated"), (False, "Food_ID 42 not found")]
+    outcomes = crud.delete_receivers_many(seeded, [4, 4, 42])
+    assert [o['ok'] for o in outcomes] == [True, False, False]
+    assert conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID = 1").fetchone() == (7,)
+    assert conn.execute("SELECT COUNT(*) FROM receivers").fetchone() == (3,)
+    assert crud.insert_claims_many(seeded, []) == []
+
+
+def test_bulk_csv_rows_are_cleaned(seeded, conn):
+    # What the CSV upload tabs do with each record before the batch call
+    columns = ['Food_ID', 'Quantity']
+    records = [{'Food_ID': ' 2 ', 'Quantity': '12.0'}, {'Food_ID': '3', 'Quantity': ''},
+               {'Food_ID': 'x', 'Quantity': '1'}, {'Food_ID': '4', 'Quantity': '-1'}]
+    rows, rejected = [], []
+    for record in records:
+        try:
+            rows.append(clean_row(record, columns))
+        except RejectedRow as e:
+            rejected.append(str(e))
+    assert rows == [(2, 12), (3, 0)]
+    assert rejected == ["non-numeric Food_ID", "negative Quantity"]
+
+    assert all(o['ok'] for o in crud.update_food_quantities_many(seeded, rows))
+    assert conn.execute("SELECT Quantity FROM food_listings WHERE Food_ID IN (2, 3) ORDER BY Food_ID").fetchall() == \
+        [(12,), (0,)]
+
+    listing = {'Food_ID': '7', 'Food_Name': ' Rice ', 'Quantity': '4', 'Expiry_Date': '1/15/2030',
+               'Provider_ID': '1', 'Provider_Type': '', 'Location': 'Springfield', 'Food_Type': 'Vegan'}
+    row = clean_row(listing, crud.TABLE_COLUMNS['food_listings'])
+    assert row == (7, 'Rice', 4, '2030-01-15 00:00:00', 1, 'Unknown', 'Springfield', 'Vegan', 'Unknown')
+    assert crud.insert_food_listings_many(seeded, [row])[0]['ok']
@@ -0,0 +1,63 @@
+"""Chunked CSV ingest: rejected rows are counted, interrupted runs resume"""
+import csv
+
+import pytest
+
+import ingest
+from ingest import ingest_csv
+from migrations import TABLE_COLUMNS
+
+
+def write_csv(path, table, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        out = csv.writer(f)
+        out.writerow(TABLE_COLUMNS[table])
+        out.writerows(rows)
+    return str(path)
+
+
+def provider_rows(ids):
+    return [(i, f'Provider {i}', 'Restaurant', f'{i} Main St', 'Springfield', f'555-{i:04}') for i in ids]
+
+
+def test_rejected_rows_are_counted(seeded, conn, tmp_path):
+    path = write_csv(tmp_path / 'claims.csv', 'claims', [
+        (10, 1, 1, 'Pending', '3/5/2030 9:30'),
+        (11, 99, 1, 'Pending', '3/5/2030 9:30'),
+        (12, 1, 1, 'Pending', 'yesterday'),
+        ('', 1, 1, 'Pending', '3/5/2030 9:30'),
+        (13, 1, -2, 'Pending', '3/5/2030 9:30'),
+    ])
+    summary = ingest_csv(conn, 'claims', path)
+    assert (summary['inserted'], summary['rejected']) == (1, 4)
+    assert summary['reasons'] == {'unknown Food_ID': 1, 'unparseable Timestamp': 1,
+                                  'missing Claim_ID': 1, 'negative Receiver_ID': 1}
+    assert conn.execute("SELECT Timestamp FROM claims WHERE Claim_ID = 10").fetchone() == ('2030-03-05 09:30:00',)
+
+
+def test_interrupted_ingest_resumes(conn, tmp_path, monkeypatch):
+    path = write_csv(tmp_path / 'providers.csv', 'providers', provider_rows(range(1, 26)))
+    read_chunks = ingest.read_chunks
+
+    def interrupted(path, chunk_size, skip=0):
+        for n, chunk in enumerate(read_chunks(path, chunk_size, skip)):
+            if n == 2:
+                raise KeyboardInterrupt
+            yield chunk
+
+    monkeypatch.setattr(ingest, 'read_chunks', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        ingest_csv(conn, 'providers', path, chunk_size=10)
+    assert conn.execute("SELECT COUNT(*) FROM providers").fetchone() == (20,)
+    assert not conn.in_transaction
+
+    monkeypatch.setattr(ingest, 'read_chunks', read_chunks)
+    summary = ingest_csv(conn, 'providers', path, chunk_size=10)
+    assert (summary['skipped'], summary['inserted']) == (20, 5)
+    assert ingest_csv(conn, 'providers', path, chunk_size=10)['already_done']
+
+    # A different file under the same name starts over
+    write_csv(tmp_path / 'providers.csv', 'providers', provider_rows(range(1, 28)))
+    summary = ingest_csv(conn, 'providers', path, chunk_size=10)
+    assert (summary['skipped'], summary['inserted']) == (0, 27)
+    assert conn.execute("SELECT COUNT(*) FROM providers").fetchone() == (27,)
@@ -0,0 +1,57 @@
+"""The leaderboards rank like a plain recount of the hot and archived rows"""
+import crud
+from leaderboards import HISTORY_CLAIMED_QUANTITY, reconcile_leaderboards, top_donors_query, top_providers_query, \
+    top_receivers_query
+
+
+def ranking(conn, query):
+    sql, params = query
+    return sorted(tuple(row) for row in conn.execute(sql, params))
+
+
+def recount(conn, key, where='', params=()):
+    """(name, type, city, completed claims, quantity claimed) of each receiver or provider, recounted"""
+    table, alias = ('receivers', 'r') if key == 'Receiver_ID' else ('providers', 'p')
+    return sorted(conn.execute(f"""
+        SELECT {alias}.Name, {alias}.Type, {alias}.City, COUNT(*), SUM({HISTORY_CLAIMED_QUANTITY})
+        FROM all_claim_listings c JOIN {table} {alias} ON {alias}.{key} = c.{key}
+        WHERE c.Status = 'Completed' AND c.Listing_ID IS NOT NULL {where}
+        GROUP BY {alias}.{key}
+    """, params).fetchall())
+
+
+def test_rankings_match_recount(churned, conn, drift):
+    assert drift(conn) == {}
+    assert ranking(conn, top_receivers_query(n=100)) == recount(conn, 'Receiver_ID')
+    assert ranking(conn, top_providers_query(n=100)) == recount(conn, 'Provider_ID')
+    window = "AND date(c.Timestamp) BETWEEN ? AND ?"
+    assert ranking(conn, top_receivers_query(n=100, start='2030-01-01', end='2030-01-31')) == \
+        recount(conn, 'Receiver_ID', window, ('2030-01-01', '2030-01-31'))
+    assert ranking(conn, top_providers_query(n=100, city='Springfield', start='2030-01-01', end='2030-12-31')) == \
+        recount(conn, 'Provider_ID', window + " AND p.City = 'Springfield'", ('2030-01-01', '2030-12-31'))
+
+    donors = conn.execute("""
+        SELECT p.Name, p.Type, p.City, COUNT(fl.Food_ID), SUM(fl.Quantity)
+        FROM providers p LEFT JOIN all_food_listings fl ON fl.Provider_ID = p.Provider_ID
+        GROUP BY p.Provider_ID
+    """).fetchall()
+    assert ranking(conn, top_donors_query(n=100)) == sorted(donors)
+
+
+def test_rank_order_follows_writes(churned, conn):
+    crud.insert_food_listing(churned, 9, 'Pasta', 40, '2030-04-01', 1, 'Grocery Store', 'Springfield', 'Vegan', 'Lunch')
+    crud.claim_food(churned, 9, 4, quantity=40, claim_id=9, timestamp='2030-03-01 09:00:00')
+    crud.update_claim_status(churned, 9, 'Completed')
+    top = conn.execute(*top_receivers_query(n=1)).fetchall()
+    assert top == [('Harbor Charity', 'Charity', 'Shelbyville', 1, 40)]
+    crud.update_claim_status(churned, 9, 'Cancelled')
+    assert conn.execute(*top_receivers_query(n=1)).fetchone()[0] != 'Harbor Charity'
+    assert reconcile_leaderboards(conn) == {}
+
+
+def test_repair_restores_totals(churned, conn):
+    conn.execute("UPDATE receiver_leaderboard SET Quantity_Claimed = Quantity_Claimed + 3")
+    conn.execute("DELETE FROM provider_leaderboard_daily")
+    assert set(reconcile_leaderboards(conn)) >= {'receiver_leaderboard', 'provider_leaderboard_daily'}
+    reconcile_leaderboards(conn, repair=True)
+    assert reconcile_leaderboards(conn) == {}
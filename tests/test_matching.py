@@ -0,0 +1,50 @@
+"""The incrementally maintained MatchIndex must agree with a fresh load()"""
+import crud
+from matching import MatchIndex
+
+
+def snapshot(index):
+    """Everything a lookup can see, in comparable form"""
+    affinity = {r: +counts for r, counts in index._affinity.items() if +counts}
+    food_type_affinity = {r: +counts for r, counts in index._food_type_affinity.items() if +counts}
+    by_listing = {food_id: index.receivers_for_listing(food_id) for food_id in index._listings}
+    by_receiver = {r: index.listings_for_receiver(r, today=0) for r in index._receivers}
+    return affinity, food_type_affinity, by_listing, by_receiver
+
+
+def test_incremental_index_matches_load(seeded, conn):
+    index = MatchIndex.load(conn)
+    crud.add_write_listener(index.apply_write)
+    # Rank every key up front, so the writes below must move receivers in the ranked lists
+    snapshot(index)
+
+    crud.claim_food(seeded, 2, 3, claim_id=1)
+    crud.claim_food(seeded, 2, 3, claim_id=2)
+    crud.claim_food(seeded, 1, 1, claim_id=3)
+    crud.claim_food(seeded, 3, 2, claim_id=4)
+    crud.insert_claims_many(seeded, [(5, 4, 4, 'Completed', '2030-01-01 10:00:00'),
+                                     (6, 5, 4, 'Cancelled', '2030-01-01 11:00:00')])
+    crud.update_claim_status(seeded, 1, 'Cancelled')
+    crud.update_claim_status(seeded, 3, 'Completed')
+    crud.update_claim_status_many(seeded, [(6, 'Pending'), (4, 'Cancelled'), (4, 'Completed')])
+    crud.delete_claim(seeded, 2)
+    crud.delete_food_listing(seeded, 5)
+    crud.insert_food_listing(seeded, 6, 'Rice', 30, '2030-01-08', 2, 'Restaurant', 'Springfield', 'Vegan', 'Dinner')
+    crud.claim_food(seeded, 6, 3, claim_id=7)
+    crud.delete_receiver(seeded, 2)
+
+    assert snapshot(index) == snapshot(MatchIndex.load(conn))
+
+
+def test_cancelled_claim_leaves_affinity(seeded, conn):
+    index = MatchIndex.load(conn)
+    crud.add_write_listener(index.apply_write)
+
+    crud.claim_food(seeded, 2, 3, claim_id=1)
+    assert index._affinity[3][('Vegan', 'Dinner')] == 1
+    crud.update_claim_status(seeded, 1, 'Cancelled')
+    assert index._affinity[3][('Vegan', 'Dinner')] == 0
+    crud.update_claim_status(seeded, 1, 'Pending')
+    assert index._affinity[3][('Vegan', 'Dinner')] == 1
+    crud.delete_claim(seeded, 1)
+    assert index._affinity[3][('Vegan', 'Dinner')] == 0
@@ -0,0 +1,43 @@
+"""The claim rollups stay equal to a recount of the hot and archived claims"""
+import pandas as pd
+import pytest
+
+import crud
+from rollups import GRANULARITIES, claims_trend_query, reconcile_rollups
+
+
+def test_no_drift_after_mixed_writes(churned, conn, drift):
+    assert drift(conn) == {}
+    assert conn.execute("SELECT SUM(Claims) FROM claim_rollups").fetchone() == \
+        conn.execute("SELECT COUNT(*) FROM all_claims").fetchone()
+
+
+@pytest.mark.parametrize('granularity', GRANULARITIES)
+def test_trend_matches_recount(churned, conn, granularity):
+    sql, params = claims_trend_query(granularity)
+    trend = pd.read_sql(sql, conn, params=params).set_index(granularity.capitalize())
+    claims = pd.read_sql("SELECT Status, Timestamp FROM all_claims", conn)
+    claims['Timestamp'] = pd.to_datetime(claims['Timestamp'], errors='coerce')
+    if granularity == 'week':
+        periods = (claims['Timestamp'] - pd.to_timedelta(claims['Timestamp'].dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+    else:
+        periods = claims['Timestamp'].dt.strftime({'hour': '%Y-%m-%d %H:00', 'day': '%Y-%m-%d', 'month': '%Y-%m',
+                                                   'year': '%Y'}[granularity])
+    expected = pd.crosstab(periods.fillna('?'), claims['Status'])
+    assert trend['Total_Claims'].sum() == len(claims)
+    for period, counts in expected.iterrows():
+        row = trend.loc[None if period == '?' else period]
+        assert row['Completed_Claims'] == counts.get('Completed', 0)
+        assert row['Pending_Claims'] == counts.get('Pending', 0)
+        assert row['Cancelled_Claims'] == counts.get('Cancelled', 0)
+
+
+def test_repair_restores_counts(churned, conn):
+    conn.execute("UPDATE claim_rollups SET Claims = Claims + 5")
+    conn.execute("DELETE FROM claim_rollups_hourly")
+    assert reconcile_rollups(conn)
+    reconcile_rollups(conn, repair=True)
+    assert reconcile_rollups(conn) == {}
+    # The triggers carry on from the repaired counts
+    crud.update_claim_status(churned, 7, 'Cancelled')
+    assert reconcile_rollups(conn) == {}
@@ -0,0 +1,59 @@
+"""The FTS5 indexes follow every write and find what a plain scan finds"""
+import re
+import unicodedata
+
+import crud
+from search import SEARCH_TABLES, check_search_index, match_expression, search
+
+
+def folded_words(text):
+    return re.findall(r'\w+', unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower())
+
+
+def scan(conn, table, text):
+    """Keys of the rows whose indexed columns have a word starting with each typed word"""
+    _, key, weights, _ = SEARCH_TABLES[table]
+    found = set()
+    for row in conn.execute(f"SELECT {key}, {', '.join(weights)} FROM {table}"):
+        words = [word for value in row[1:] for word in folded_words(value or '')]
+        if all(any(word.startswith(typed) for word in words) for typed in folded_words(text)):
+            found.add(row[0])
+    return found
+
+
+def test_search_matches_scan(churned, conn):
+    crud.insert_food_listings_many(churned, [
+        (10, 'Crème Brûlée', 6, '2030-03-01', 1, 'Grocery Store', 'Springfield', 'Vegetarian', 'Dinner'),
+        (11, 'Fresh Vegetables', 9, '2030-03-02', 2, 'Restaurant', 'Springfield', 'Vegan', 'Lunch'),
+        (12, 'Brown Rice', 3, '2030-03-03', 3, 'Supermarket', 'Shelbyville', 'Vegan', 'Dinner'),
+    ])
+    crud.update_provider_contact(churned, 2, '555-0777')
+    crud.delete_food_listing(churned, 6)
+    assert check_search_index(conn) == []
+
+    key_of = {table: SEARCH_TABLES[table][1] for table in SEARCH_TABLES}
+    for text in ['creme', 'BRU', 'fre veg', 'ric', 'spring', 'harbor market', 'Night']:
+        results = search(conn, text, limit=100)
+        for table, df in results.items():
+            assert set(df[key_of[table]]) == scan(conn, table, text), (text, table)
+    assert list(search(conn, 'bro')['food_listings']['Food_ID']) == [12]
+
+    # Names weigh more than cities
+    crud.insert_provider(churned, 4, 'Springfield Pantry', 'Restaurant', '9 Elm St', 'Shelbyville', '555-0109')
+    assert search(conn, 'springfield')['providers']['Provider_ID'].iloc[0] == 4
+
+
+def test_typed_operators_are_literal(churned, conn):
+    assert match_expression('a') is None
+    assert search(conn, '  ') == {}
+    for text in ['rice AND', 'NOT rice', '"rice', 'rice*', 'ri-ce (', 'NEAR(rice)']:
+        search(conn, text)
+    assert list(search(conn, 'rice OR')['food_listings']['Food_ID']) == []
+
+
+def test_drifted_index_is_rebuilt(churned, conn):
+    conn.execute("INSERT INTO listings_fts (listings_fts, rowid, Food_Name) VALUES ('delete', 6, 'Rice')")
+    assert check_search_index(conn) == ['listings_fts']
+    assert check_search_index(conn, repair=True) == ['listings_fts']
+    assert check_search_index(conn) == []
+    assert list(search(conn, 'rice')['food_listings']['Food_ID']) == [6]
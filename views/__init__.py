@@ -0,0 +1,37 @@
+"""Page modules for the Streamlit app, imported only when their page is opened.
+
+PAGES maps each sidebar entry to (module, render function). A module's
+first import is recorded as an 'import' call on the Performance page, so
+lazy loading costs stay visible.
+"""
+import importlib
+import sys
+
+from instrumentation import timed
+
+
+PAGES = {
+    "🏠 Dashboard": ('dashboard', 'render'),
+    "📊 SQL Query Results (ALL 15)": ('query_results', 'render'),
+    "📈 Analytics": ('analytics', 'render'),
+    "🍎 Food Listings": ('food_listings', 'render'),
+    "🔗 Matches": ('matches', 'render'),
+    "🔎 Search": ('search', 'render'),
+    "👥 Providers": ('tables', 'render_providers'),
+    "🤝 Receivers": ('tables', 'render_receivers'),
+    "📋 Claims": ('tables', 'render_claims'),
+    "➕ Add Records": ('records', 'render_add'),
+    "✏️ Update Records": ('records', 'render_update'),
+    "🗑️ Delete Records": ('records', 'render_delete'),
+    "⏱️ Performance": ('performance', 'render'),
+}
+
+
+def load_page(choice):
+    """The render function for a sidebar entry, importing its module on first use"""
+    module_name, function_name = PAGES[choice]
+    name = f"{__name__}.{module_name}"
+    if name not in sys.modules:
+        with timed('import', name):
+            importlib.import_module(name)
+    return getattr(sys.modules[name], function_name)
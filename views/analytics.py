@@ -0,0 +1,163 @@
+import datetime
+
+import streamlit as st
+
+from instrumentation import fetch_all, fetch_one
+from leaderboards import top_donors_query, top_providers_query, top_receivers_query
+from queries import PROVIDER_CHART_QUERY, CLAIMS_CHART_QUERY, FOOD_TYPE_CHART_QUERY
+from rollups import GRANULARITIES, claims_trend_query
+from views.resources import figure_cache, get_query_executor, query_cache, reader_pool
+
+
+# Figure builders for the analytics section
+def provider_figure(df):
+    import plotly.express as px
+    return px.bar(df, x='Provider_Type', y='Total_Quantity',
+                  title='Food Contribution by Provider Type')
+
+def claims_figure(df):
+    import plotly.express as px
+    return px.pie(df, values='Count', names='Status',
+                  title='Claims Status Distribution')
+
+def food_type_figure(df):
+    import plotly.express as px
+    return px.bar(df, x='Food_Type', y='Total_Quantity',
+                  title='Food Availability by Type')
+
+def trend_figure(df, period):
+    import plotly.graph_objects as go
+    df = df.sort_values(period)
+    fig = go.Figure()
+    for column, name in [('Total_Claims', 'Total Claims'), ('Completed_Claims', 'Completed'),
+                         ('Pending_Claims', 'Pending'), ('Cancelled_Claims', 'Cancelled')]:
+        fig.add_trace(go.Scatter(x=df[period], y=df[column], mode='lines+markers', name=name))
+    fig.update_layout(title=f'Claims per {period.lower()}', xaxis_title=period, yaxis_title='Number of Claims')
+    return fig
+
+# (tab, subheader, chart id, query, name of its data in messages, figure builder, caption)
+ANALYTICS_CHARTS = [
+    ("Provider Analysis", "Provider Contribution Analysis", 'analytics_provider', PROVIDER_CHART_QUERY,
+     "provider data", provider_figure, "All listings ever made, archived ones included."),
+    ("Claims Analysis", "Claims Status Analysis", 'analytics_claims', CLAIMS_CHART_QUERY,
+     "claims data", claims_figure, "All claims ever made, archived ones included."),
+    ("Food Distribution", "Food Type Distribution", 'analytics_food_type', FOOD_TYPE_CHART_QUERY,
+     "food listings data", food_type_figure, "Listings on offer now; archived listings are not counted."),
+]
+
+
+def render():
+    st.header("📊 Data Analytics")
+
+    # Figures cached at the current data version need no SQL. The others' data
+    # is fetched concurrently; a failed query comes back as its exception
+    keys = [figure_cache.key(chart[2]) for chart in ANALYTICS_CHARTS]
+    figures = [figure_cache.get(key) for key in keys]
+    missing = [i for i, cached in enumerate(figures) if cached is None]
+    results = {}
+    if missing:
+        fetched = query_cache.read_sql_many([ANALYTICS_CHARTS[i][3] for i in missing], get_query_executor(),
+                                            return_exceptions=True)
+        results = dict(zip(missing, fetched))
+
+    tabs = st.tabs([chart[0] for chart in ANALYTICS_CHARTS] + ["Claims Trend", "Leaderboards"])
+    for i, (tab, (_, subheader, _, _, data_name, build, caption)) in enumerate(zip(tabs, ANALYTICS_CHARTS)):
+        with tab:
+            st.subheader(subheader)
+            st.caption(caption)
+            if figures[i] is None:
+                df = results[i]
+                if isinstance(df, Exception):
+                    st.error(f"❌ {data_name.capitalize()} query failed: {df}")
+                    continue
+                if df.empty:
+                    st.warning(f"⚠️ No {data_name} available")
+                    continue
+                figures[i] = [build(df)]
+                figure_cache.put(keys[i], figures[i])
+            st.plotly_chart(figures[i][0], use_container_width=True)
+    with tabs[-2]:
+        display_claims_trend()
+    with tabs[-1]:
+        display_leaderboards()
+
+
+# Claims trend at any granularity, served from the claim rollups (rollups.py);
+# a fragment, so changing its filters reruns only this tab
+@st.fragment
+def display_claims_trend():
+    st.subheader("Claims Trend")
+    with reader_pool.connection() as conn:
+        first, last = fetch_one(conn, "SELECT MIN(Hour), MAX(Hour) FROM claim_rollups_hourly WHERE Hour <> ''")
+        cities = [row[0] for row in fetch_all(conn, "SELECT DISTINCT City FROM claim_rollups WHERE City <> '' ORDER BY City")]
+        meal_types = [row[0] for row in fetch_all(conn, "SELECT DISTINCT Meal_Type FROM claim_rollups WHERE Meal_Type <> '' ORDER BY Meal_Type")]
+    if first is None:
+        st.warning("⚠️ No claims data available")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        granularity = st.selectbox("Granularity", GRANULARITIES, index=GRANULARITIES.index('day'), key="trend_granularity")
+    with col2:
+        days = st.date_input("Date range", value=(datetime.date.fromisoformat(first[:10]),
+                                                  datetime.date.fromisoformat(last[:10])), key="trend_range")
+    # Hourly rollups are kept by status only
+    with col3:
+        city = st.selectbox("City", ["All"] + cities, key="trend_city", disabled=granularity == 'hour')
+    with col4:
+        meal_type = st.selectbox("Meal Type", ["All"] + meal_types, key="trend_meal", disabled=granularity == 'hour')
+    # While a range is being picked only its first day is set
+    start, end = (days[0], days[-1]) if days else (None, None)
+    if granularity == 'hour':
+        city = meal_type = "All"
+
+    query, params = claims_trend_query(granularity, start, end, city=None if city == "All" else city,
+                                       meal_type=None if meal_type == "All" else meal_type)
+    period = granularity.capitalize()
+    figure_key = figure_cache.key(f"trend_{granularity}_{start}_{end}_{city}_{meal_type}")
+    with reader_pool.connection() as conn:
+        df = query_cache.read_sql(query, conn, params)
+    if df.empty:
+        st.warning("⚠️ No claims in this range")
+        return
+    figures = figure_cache.figures(figure_key, lambda: [trend_figure(df, period)])
+    st.plotly_chart(figures[0], use_container_width=True)
+    st.dataframe(df, use_container_width=True)
+
+
+# Windows end on the latest claim day, so older data still shows
+LEADERBOARD_WINDOWS = {"All time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 365 days": 365}
+
+# Top receivers and providers, served from the trigger-maintained leaderboards
+# (leaderboards.py); a fragment, so changing its filters reruns only this tab
+@st.fragment
+def display_leaderboards():
+    st.subheader("Leaderboards")
+    with reader_pool.connection() as conn:
+        cities = query_cache.read_sql("SELECT City FROM providers UNION SELECT City FROM receivers ORDER BY City", conn)
+        last = fetch_one(conn, "SELECT MAX(Day) FROM receiver_leaderboard_daily WHERE Day <> ''")[0]
+
+    col1, col2 = st.columns(2)
+    with col1:
+        city = st.selectbox("City", ["All"] + cities['City'].tolist(), key="leaderboard_city")
+    with col2:
+        window = st.selectbox("Claims window", list(LEADERBOARD_WINDOWS), key="leaderboard_window")
+    city = None if city == "All" else city
+    start = end = None
+    if LEADERBOARD_WINDOWS[window] and last:
+        end = datetime.date.fromisoformat(last)
+        start = end - datetime.timedelta(days=LEADERBOARD_WINDOWS[window] - 1)
+
+    boards = [
+        ("🏆 Top Receivers by Quantity Claimed", top_receivers_query(10, city, start, end)),
+        ("🤝 Top Providers by Completed Claims", top_providers_query(10, city, start, end)),
+        ("📦 Top Donors by Quantity Listed (all time)", top_donors_query(15, city)),
+    ]
+    with reader_pool.connection() as conn:
+        for title, (query, params) in boards:
+            st.markdown(f"**{title}**")
+            df = query_cache.read_sql(query, conn, params)
+            if df.empty:
+                st.info("No data for these filters")
+            else:
+                st.dataframe(df, use_container_width=True)
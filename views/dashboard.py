@@ -0,0 +1,70 @@
+import streamlit as st
+
+from dashboard_stats import STATS_COLUMNS, read_stats
+from expiry import count_near_expiry, near_expiry
+from instrumentation import read_sql
+from views.resources import reader_pool
+
+
+def render():
+    st.header("📈 System Overview")
+    
+    # Metrics (one row lookup in the trigger-maintained stats table)
+    try:
+        with reader_pool.connection() as conn:
+            stats = read_stats(conn)
+    except Exception as e:
+        st.error(f"❌ Could not load dashboard metrics: {e}")
+        stats = dict.fromkeys(STATS_COLUMNS, 0)
+
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Providers", stats['Total_Providers'])
+    
+    with col2:
+        st.metric("Total Receivers", stats['Total_Receivers'])
+    
+    with col3:
+        st.metric("Food Listings", stats['Total_Food_Listings'])
+    
+    with col4:
+        st.metric("Total Claims", stats['Total_Claims'])
+
+    # Recent activity
+    st.subheader("📰 Recent Food Listings")
+    try:
+        with reader_pool.connection() as conn:
+            recent_food = read_sql("""
+                SELECT Food_Name, Quantity, Location, Food_Type, Meal_Type 
+                FROM food_listings 
+                ORDER BY Food_ID DESC LIMIT 5
+            """, conn)
+        st.dataframe(recent_food, use_container_width=True)
+    except Exception as e:
+        st.error(f"❌ Could not load recent food listings: {e}")
+
+    # Food about to expire, from the indexed Expiry_Day range
+    st.subheader("⏰ Expiring Within 7 Days")
+    try:
+        with reader_pool.connection() as conn:
+            expiring_count = count_near_expiry(conn, days=7)
+            expiring = near_expiry(conn, days=7, limit=5)
+        if expiring_count:
+            st.error(f"**{expiring_count} food listings** expire within 7 days. The soonest:")
+            st.dataframe(expiring, use_container_width=True)
+        else:
+            st.success("✅ No food items are expiring within 7 days.")
+    except Exception as e:
+        st.warning(f"⚠️ Could not load expiring listings: {e}")
+
+    # Quick stats
+    st.subheader("🎯 Quick Statistics")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        total_quantity = stats['Total_Quantity']
+        st.info(f"**Total Food Quantity Available:** {total_quantity:,} units" if total_quantity else "**Total Food Quantity Available:** 0 units")
+    
+    with col2:
+        st.warning(f"**Pending Claims:** {stats['Pending_Claims']}")
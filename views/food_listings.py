@@ -0,0 +1,64 @@
+import streamlit as st
+
+from listings import FACET_COLUMNS, PAGE_SIZE, count_listings_query, facet_counts_query, listings_page_query
+from views.live import live_refresh, live_rows
+from views.resources import query_cache, reader_pool
+
+
+def render():
+    st.header("🍎 Available Food Listings")
+
+    try:
+        # Current selections; widget values are already in session state at the start of a rerun
+        filters = {}
+        for column in FACET_COLUMNS:
+            selected = st.session_state.get(f"listing_filter_{column}", 'All')
+            filters[column] = None if selected == 'All' else selected
+
+        # Filters, with options and counts from indexed GROUP BY lookups
+        col1, col2, col3 = st.columns(3)
+        labels = {'Location': "Filter by City", 'Food_Type': "Filter by Food Type", 'Meal_Type': "Filter by Meal Type"}
+        with reader_pool.connection() as conn:
+            for column, col in zip(FACET_COLUMNS, (col1, col2, col3)):
+                query, params = facet_counts_query(column, filters)
+                counts = dict(query_cache.read_sql(query, conn, params).values.tolist())
+                with col:
+                    st.selectbox(
+                        labels[column], ['All'] + list(counts), key=f"listing_filter_{column}",
+                        format_func=lambda v, counts=counts: v if v == 'All' else f"{v} ({counts[v]})",
+                    )
+
+        # Start from the first page whenever the filters change
+        filter_key = tuple(filters.get(column) for column in FACET_COLUMNS)
+        if st.session_state.get('listing_filter_key') != filter_key:
+            st.session_state['listing_filter_key'] = filter_key
+            st.session_state['listing_page_starts'] = [None]
+        page_starts = st.session_state['listing_page_starts']
+
+        with reader_pool.connection() as conn:
+            query, params = count_listings_query(filters)
+            total = int(query_cache.read_sql(query, conn, params).iloc[0, 0])
+        # The page's rows stay current from the change feed while it is open
+        live = ('listings', *listings_page_query(filters, after_id=page_starts[-1], page_size=PAGE_SIZE),
+                'Food_ID', 'food_listings')
+        page_df = live_rows(*live, limit=PAGE_SIZE)
+
+        if not page_df.empty:
+            first = (len(page_starts) - 1) * PAGE_SIZE + 1
+            st.markdown(f"**📋 Showing {first}–{first + len(page_df) - 1} of {total} listings**")
+            st.dataframe(page_df, use_container_width=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if len(page_starts) > 1 and st.button("◀ Previous"):
+                    page_starts.pop()
+                    st.rerun()
+            with col2:
+                if len(page_df) == PAGE_SIZE and first + len(page_df) - 1 < total and st.button("Next ▶"):
+                    page_starts.append(int(page_df['Food_ID'].iloc[-1]))
+                    st.rerun()
+        else:
+            st.warning("⚠️ No food listings available")
+        live_refresh(*live, limit=PAGE_SIZE)
+    except Exception as e:
+        st.error(f"❌ Error loading food listings: {e}")
@@ -0,0 +1,59 @@
+"""Tables that stay current while their page is open.
+
+A live table keeps its rows in session state with the change-feed cursor
+they are current to (changes.py). Every REFRESH_SECONDS a small fragment
+asks the feed what changed since then. If any shown row changed, it re-reads
+just those rows, merges them in and reruns the page; otherwise nothing is
+read or redrawn.
+"""
+import time
+
+import streamlit as st
+
+from changes import changes_since, current_cursor, refresh_rows
+from instrumentation import read_sql
+from views.resources import reader_pool
+
+
+REFRESH_SECONDS = 5
+
+
+def _sync(name, query, params, key, table, dependencies=None, limit=None):
+    """Bring the stored rows of a live table up to date; True if they changed"""
+    state = st.session_state.get(f"live_{name}")
+    source = (query, tuple(params))
+    with reader_pool.connection() as conn:
+        changes = changes_since(conn, state['cursor']) if state and state['source'] == source else None
+        if changes is None or changes.reset:
+            # Read the cursor first: a write landing during the load is just re-read next time
+            cursor = current_cursor(conn)
+            rows = read_sql(query, conn, params=list(params)).sort_values(key, kind='stable').reset_index(drop=True)
+            st.session_state[f"live_{name}"] = {'source': source, 'cursor': cursor, 'rows': rows, 'checked': time.time()}
+            return state is not None
+        state['cursor'], state['checked'] = changes.cursor, time.time()
+        if not any(changes.changed.get(t) for t in [table, *(dependencies or {})]):
+            return False
+        rows = refresh_rows(conn, state['rows'], query, params, key, table, changes.changed, dependencies)
+    state['rows'] = rows.head(limit) if limit is not None else rows
+    return True
+
+
+def live_rows(name, query, params, key, table, dependencies=None, limit=None):
+    """The rows of query, read once and then kept current from the change feed.
+
+    key is the column identifying a row of table; dependencies maps other
+    tables the query joins to the column that refers to them; limit trims
+    a page that changes would otherwise grow. Call live_refresh() with the
+    same arguments after showing the rows.
+    """
+    _sync(name, query, params, key, table, dependencies, limit)
+    return st.session_state[f"live_{name}"]['rows']
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live_refresh(name, query, params, key, table, dependencies=None, limit=None):
+    """Poll the change feed and rerun the page when the rows on screen changed"""
+    if _sync(name, query, params, key, table, dependencies, limit):
+        st.rerun()
+    checked = time.strftime('%H:%M:%S', time.localtime(st.session_state[f"live_{name}"]['checked']))
+    st.caption(f"🔄 Live: checked for changes at {checked}, every {REFRESH_SECONDS}s")
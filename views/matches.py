@@ -0,0 +1,57 @@
+import time
+
+import streamlit as st
+
+from instrumentation import read_sql
+from views.resources import get_match_index, reader_pool
+
+
+def render():
+    st.header("🔗 Listing & Receiver Matches")
+    st.markdown("Suggested receivers for a listing, or listings for a receiver, in the same city. "
+                "Receivers are ranked by how often they claimed that kind of food; listings also by how soon they expire.")
+
+    match_index = get_match_index()
+    tab1, tab2 = st.tabs(["Receivers for a Listing", "Listings for a Receiver"])
+
+    with tab1:
+        food_id = st.number_input("Food ID", min_value=1, step=1, key="match_food_id")
+        start = time.perf_counter()
+        matches = match_index.receivers_for_listing(int(food_id), limit=10)
+        elapsed_us = (time.perf_counter() - start) * 1_000_000
+        if matches:
+            ids = [receiver_id for receiver_id, _ in matches]
+            with reader_pool.connection() as conn:
+                details = read_sql(
+                    f"SELECT Receiver_ID, Name, Type, City, Contact FROM receivers WHERE Receiver_ID IN ({', '.join('?' for _ in ids)})",
+                    conn, params=ids,
+                ).set_index('Receiver_ID')
+            ranked = details.loc[[i for i in ids if i in details.index]]
+            ranked['Score'] = [score for receiver_id, score in matches if receiver_id in details.index]
+            st.dataframe(ranked.reset_index(), use_container_width=True)
+        else:
+            st.info("No receivers found for this listing (unknown ID, no stock, or no receivers in its city).")
+        st.caption(f"⏱️ Match lookup took {elapsed_us:.0f} µs")
+
+    with tab2:
+        receiver_id = st.number_input("Receiver ID", min_value=1, step=1, key="match_receiver_id")
+        start = time.perf_counter()
+        matches = match_index.listings_for_receiver(int(receiver_id), limit=10)
+        elapsed_us = (time.perf_counter() - start) * 1_000_000
+        if matches:
+            ids = [food_id for food_id, _ in matches]
+            with reader_pool.connection() as conn:
+                details = read_sql(
+                    f"SELECT Food_ID, Food_Name, Quantity, Expiry_Date, Location, Food_Type, Meal_Type FROM food_listings WHERE Food_ID IN ({', '.join('?' for _ in ids)})",
+                    conn, params=ids,
+                ).set_index('Food_ID')
+            ranked = details.loc[[i for i in ids if i in details.index]]
+            ranked['Score'] = [score for food_id, score in matches if food_id in details.index]
+            st.dataframe(ranked.reset_index(), use_container_width=True)
+        else:
+            st.info("No current listings found for this receiver (unknown ID, or nothing unexpired in their city).")
+        st.caption(f"⏱️ Match lookup took {elapsed_us:.0f} µs")
+
+    index_stats = match_index.stats()
+    st.caption(f"Match index: {index_stats['listings']} listings, {index_stats['receivers']} receivers, "
+               f"{index_stats['listing_keys']} (city, food type, meal type) keys")
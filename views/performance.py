@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from instrumentation import performance_log
+from views.resources import figure_cache, get_columnar_snapshot, query_cache
+
+
+# Performance panel; a fragment re-run on a timer so the numbers stay live
+@st.fragment(run_every=5)
+def display_performance_panel():
+    records = performance_log.records()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Calls recorded", performance_log.total)
+    col2.metric("In buffer", len(records))
+    col3.metric("Errors in buffer", sum(1 for r in records if r.error))
+    col4.metric("Slow calls", len(performance_log.slow_log()))
+
+    threshold = st.number_input("Slow threshold (ms)", min_value=1.0, step=10.0,
+                                value=float(performance_log.slow_threshold_ms), key="perf_slow_threshold")
+    performance_log.slow_threshold_ms = threshold
+
+    st.subheader("📊 Latency by Statement")
+    summary = performance_log.summary()
+    if summary:
+        kinds = sorted({row['Kind'] for row in summary})
+        shown = st.multiselect("Kinds", kinds, default=kinds, key="perf_kinds")
+        summary_df = pd.DataFrame([row for row in summary if row['Kind'] in shown])
+        st.dataframe(summary_df.round(2), use_container_width=True)
+    else:
+        st.caption("Nothing recorded yet. Open another page to generate some traffic.")
+
+    def records_frame(rows):
+        return pd.DataFrame([{
+            'Time': datetime.fromtimestamp(r.started_at).strftime("%H:%M:%S"),
+            'Kind': r.kind, 'Name': r.name, 'Duration (ms)': round(r.duration_ms, 2),
+            'Rows': r.rows, 'Error': r.error or '',
+        } for r in rows])
+
+    st.subheader(f"🐢 Slow Log (≥ {threshold:.0f} ms)")
+    slow = performance_log.slow_log()
+    if slow:
+        st.dataframe(records_frame(slow), use_container_width=True)
+    else:
+        st.caption("No slow calls.")
+
+    st.subheader("❌ Recent Failures")
+    failures = [r for r in reversed(records) if r.error][:50]
+    if failures:
+        st.dataframe(records_frame(failures), use_container_width=True)
+    else:
+        st.caption("No failures.")
+
+    cache_stats = query_cache.stats()
+    st.caption(f"Query cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+               f"({cache_stats['hit_rate']:.0%} hit rate); cache hits run no SQL and are not recorded above.")
+    figure_stats = figure_cache.stats()
+    st.caption(f"Figure cache: {figure_stats['hits']} hits, {figure_stats['misses']} misses "
+               f"({figure_stats['hit_rate']:.0%} hit rate), {figure_stats['entries']} entries "
+               f"({figure_stats['bytes'] / 1024:.0f} KB).")
+    columnar_stats = get_columnar_snapshot().stats()
+    refreshes = ', '.join(f"{count} {kind}" for kind, count in sorted(columnar_stats['refreshes'].items()))
+    st.caption(f"Columnar snapshot: {columnar_stats['listings']:,} listings, {columnar_stats['claims']:,} claims "
+               f"({columnar_stats['bytes'] / 1024:.0f} KB mapped) at data version {columnar_stats['data_version']}; "
+               f"refreshes: {refreshes or 'none'}.")
+    if st.button("🧹 Clear recorded timings"):
+        performance_log.clear()
+
+
+def render():
+    st.header("⏱️ Performance")
+    st.markdown("Timings of every SQL statement, CRUD call and page render in this app process. "
+                "The panel refreshes every few seconds.")
+    display_performance_panel()
@@ -0,0 +1,233 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from columnar import COLUMNAR_QUERIES
+from queries import CURRENT_LISTINGS_QUERIES, QUERY_CHARTS, chart_frame, chart_query, queries, query_descriptions
+from views.resources import figure_cache, get_query_executor, query_cache, read_query, reader_pool
+
+
+# Figures for each of the 15 queries: one chart, or two shown side by side.
+# df is the chart's data: chart_query() aggregated in SQL, or the query result
+def build_query_figures(df, query_index, description):
+    """Create appropriate visualization for each of the 15 queries"""
+    # Plotting libraries load on the first chart built, not at app start
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    if query_index == 0:  # Query 1: Providers and receivers by city
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=df['City'], y=df['Total_Providers'], name='Providers', marker_color='lightblue'))
+        fig.add_trace(go.Bar(x=df['City'], y=df['Total_Receivers'], name='Receivers', marker_color='lightcoral'))
+        fig.update_layout(title=description, barmode='group', xaxis_title='City', yaxis_title='Count')
+        return [fig]
+        
+    elif query_index == 1:  # Query 2: Provider type contribution
+        return [px.bar(df, x='Provider_Type', y='Total_Quantity', title='Total Quantity by Provider Type'),
+                px.pie(df, values='Total_Food_Listings', names='Provider_Type', title='Food Listings Distribution')]
+            
+    elif query_index == 2:  # Query 3: Provider contact info
+        # Create a simple summary chart
+        return [px.bar(df, x='City', y='Providers', title='Number of Providers by City')]
+        
+    elif query_index == 3:  # Query 4: Top receivers by quantity claimed
+        return [px.bar(df, x='Total_Quantity_Claimed', y='Receiver_Name', orientation='h', 
+                       title=description, color='Total_Quantity_Claimed', color_continuous_scale='Blues')]
+        
+    elif query_index == 4:  # Query 5: Overall food availability
+        labels = ['Total Food Items', 'Total Active Providers']
+        values = [df['Total_Food_Items'].iloc[0], df['Total_Active_Providers'].iloc[0]]
+        return [px.pie(values=values, names=labels, title=description)]
+        
+    elif query_index == 5:  # Query 6: Food listings by city
+        return [px.bar(df, x='City', y='Total_Listings', title=description, 
+                       color='Total_Listings', color_continuous_scale='Greens')]
+        
+    elif query_index == 6:  # Query 7: Food type availability
+        return [px.bar(df, x='Food_Type', y='Total_Quantity', title='Total Quantity by Food Type'),
+                px.pie(df, values='Total_Listings', names='Food_Type', title='Food Type Distribution')]
+            
+    elif query_index == 7:  # Query 8: Claims per food item
+        return [px.bar(df, x='Total_Claims', y='Food_Name', orientation='h', 
+                       title='Top 10 Food Items by Claims', color='Total_Claims', color_continuous_scale='Oranges')]
+        
+    elif query_index == 8:  # Query 9: Top providers by successful claims
+        return [px.bar(df, x='Successful_Claims', y='Provider_Name', orientation='h', 
+                       title=description, color='Successful_Claims', color_continuous_scale='Purples')]
+        
+    elif query_index == 9:  # Query 10: Claims status distribution
+        return [px.pie(df, values='Count', names='Status', title='Claims Status Distribution'),
+                px.bar(df, x='Status', y='Percentage', title='Claims Status Percentage')]
+            
+    elif query_index == 10:  # Query 11: Average quantity by receiver type
+        return [px.bar(df, x='Receiver_Type', y='Average_Quantity_Per_Claim', 
+                       title=description, color='Average_Quantity_Per_Claim', color_continuous_scale='Reds')]
+        
+    elif query_index == 11:  # Query 12: Meal type claims
+        return [px.bar(df, x='Meal_Type', y='Total_Claims', title='Total Claims by Meal Type'),
+                px.bar(df, x='Meal_Type', y='Total_Quantity_Claimed', title='Total Quantity by Meal Type')]
+            
+    elif query_index == 12:  # Query 13: Food donation by provider
+        return [px.bar(df, x='Total_Quantity_Donated', y='Provider_Name', orientation='h', 
+                       title='Top 10 Providers by Donation', color='Total_Quantity_Donated', color_continuous_scale='Viridis')]
+        
+    elif query_index == 13:  # Query 14: Food items expiring soon
+        return [px.bar(df, x='Bin', y='Rows', title=description, color='Quantity', color_continuous_scale='Reds',
+                       labels={'Bin': 'Days until expiry', 'Rows': 'Listings'})]
+            
+    elif query_index == 14:  # Query 15: Monthly claims trend
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=df['Month'], y=df['Total_Claims'], 
+                                 mode='lines+markers', name='Total Claims', line=dict(width=3)))
+        fig.add_trace(go.Scatter(x=df['Month'], y=df['Completed_Claims'], 
+                                 mode='lines+markers', name='Completed'))
+        fig.add_trace(go.Scatter(x=df['Month'], y=df['Pending_Claims'], 
+                                 mode='lines+markers', name='Pending'))
+        fig.add_trace(go.Scatter(x=df['Month'], y=df['Cancelled_Claims'], 
+                                 mode='lines+markers', name='Cancelled'))
+        fig.update_layout(title=description, xaxis_title='Month', yaxis_title='Number of Claims')
+        return [fig]
+
+def chart_data(df, query_index, n):
+    """The rows query_index's chart draws: top n / n bins from SQL, or the query result df"""
+    # Columnar results are aggregated in memory rather than re-run in SQL
+    if queries[query_index] in COLUMNAR_QUERIES:
+        frame = chart_frame(query_index, df, n)
+        if frame is not None:
+            return frame
+    query = chart_query(query_index, n)
+    if query is None:
+        return df
+    with reader_pool.connection() as conn:
+        return query_cache.read_sql(query[0], conn, query[1])
+
+# Function to show ALL 15 visualizations; figure_key is taken before the data is read
+def create_all_15_visualizations(df, query_index, description, figure_key, n=None):
+    """Show the visualization for one of the 15 queries, from the figure cache when possible"""
+    
+    if df.empty:
+        st.warning(f"⚠️ No data available for visualization: {description}")
+        return None
+    
+    st.markdown(f"### 📊 Visualization {query_index + 1}")
+    if query_index == 2:
+        st.info("📋 Provider contact information is best displayed in table format above")
+    
+    try:
+        figures = figure_cache.figures(
+            figure_key, lambda: build_query_figures(chart_data(df, query_index, n), query_index, description))
+        if len(figures) == 1:
+            st.plotly_chart(figures[0], use_container_width=True)
+        else:
+            for col, fig in zip(st.columns(len(figures)), figures):
+                with col:
+                    st.plotly_chart(fig, use_container_width=True)
+                
+    except Exception as e:
+        st.error(f"❌ Error creating visualization: {e}")
+
+# One query section; a fragment, so toggling it reruns only this section
+@st.fragment
+def display_query_section(i):
+    query, description = queries[i], query_descriptions[i]
+
+    # Query header with numbering
+    st.markdown(f"## **{description}**")
+    if i in CURRENT_LISTINGS_QUERIES:
+        st.caption("Listings on offer now; archived listings are not counted.")
+    
+    # Expandable SQL query viewer
+    with st.expander(f"🔍 View SQL Query {i+1}"):
+        st.code(query, language='sql')
+    
+    # Nothing is executed until the section is opened
+    if not st.toggle("▶️ Run query and show visualization", key=f"run_query_{i}"):
+        return
+    
+    # Bars (or bins) in the chart; the aggregation runs in SQL
+    n = None
+    if QUERY_CHARTS[i] is not None:
+        kind, spec = QUERY_CHARTS[i]
+        n = int(st.number_input("Bins in chart" if kind == 'binned' else "Top N in chart", min_value=1, max_value=500,
+                                value=spec['n'], step=1, key=f"chart_n_{i}"))
+    
+    try:
+        # Execute query (served from the cache until the next write)
+        figure_key = figure_cache.key(f"query_{i + 1}_{n}")
+        start = time.perf_counter()
+        with reader_pool.connection() as conn:
+            df = read_query(query, conn)
+        query_ms = (time.perf_counter() - start) * 1000
+        
+        if not df.empty:
+            # Display results summary
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.markdown(f"**📋 Query Results:** {len(df)} records returned")
+            with col2:
+                st.markdown(f"**📊 Columns:** {len(df.columns)}")
+            
+            # Display data table
+            st.dataframe(df, use_container_width=True)
+            
+            # Create and display visualization
+            start = time.perf_counter()
+            create_all_15_visualizations(df, i, description, figure_key, n)
+            chart_ms = (time.perf_counter() - start) * 1000
+        else:
+            st.warning(f"⚠️ No data available for {description}")
+            chart_ms = 0.0
+        
+        st.session_state.setdefault('query_timings', {})[i] = (query_ms, chart_ms)
+        st.caption(f"⏱️ Query {i+1}: SQL {query_ms:.1f} ms, visualization {chart_ms:.1f} ms")
+            
+    except Exception as e:
+        st.error(f"❌ Error executing Query {i+1}: {e}")
+
+# Function to display ALL 15 query sections (each one runs on demand)
+def render():
+    st.header("📊 Complete Analysis: ALL 15 SQL Query Results & Visualizations")
+    st.markdown("### 🎯 This section displays the output of all 15 SQL queries along with their corresponding visualizations")
+    st.info("💡 Switch on a section to run its query and build its visualization. Sections run independently.")
+    
+    if st.button("⚡ Run all 15 queries"):
+        # Fetch every result and chart aggregate concurrently into the cache, then open all sections.
+        # The columnar queries and their charts are answered by the snapshot when their sections run
+        start = time.perf_counter()
+        sql_queries = [i for i in range(len(queries)) if queries[i] not in COLUMNAR_QUERIES]
+        chart_queries = [chart_query(i, st.session_state.get(f"chart_n_{i}")) for i in sql_queries]
+        query_cache.read_sql_many([queries[i] for i in sql_queries] + [query for query in chart_queries if query is not None],
+                                  get_query_executor(), return_exceptions=True)
+        st.session_state['run_all_ms'] = (time.perf_counter() - start) * 1000
+        for i in range(len(queries)):
+            st.session_state[f"run_query_{i}"] = True
+    if 'run_all_ms' in st.session_state:
+        st.caption(f"⏱️ All 15 queries fetched in parallel in {st.session_state['run_all_ms']:.1f} ms")
+    st.markdown("---")
+    
+    for i in range(len(queries)):
+        display_query_section(i)
+        
+        # Add separator between queries
+        st.markdown("---")
+    
+    # Timings of the sections run so far in this session
+    st.markdown("## ⏱️ Section Timings")
+    timings = st.session_state.get('query_timings', {})
+    if timings:
+        timings_df = pd.DataFrame(
+            [(query_descriptions[i], query_ms, chart_ms, query_ms + chart_ms)
+             for i, (query_ms, chart_ms) in sorted(timings.items())],
+            columns=['Query', 'SQL (ms)', 'Visualization (ms)', 'Total (ms)']
+        )
+        st.dataframe(timings_df.round(1), use_container_width=True)
+    else:
+        st.caption("No sections have been run yet.")
+    cache_stats = query_cache.stats()
+    st.caption(f"Query cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+               f"{cache_stats['entries']} entries ({cache_stats['bytes'] / 1024:.0f} KB), "
+               f"data version {cache_stats['data_version']}")
+    figure_stats = figure_cache.stats()
+    st.caption(f"Figure cache: {figure_stats['hits']} hits, {figure_stats['misses']} misses, "
+               f"{figure_stats['entries']} entries ({figure_stats['bytes'] / 1024:.0f} KB)")
@@ -0,0 +1,308 @@
+import csv
+import io
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from claims import CLAIM_STATUSES
+from crud import (
+    insert_provider, insert_receiver, insert_food_listing, claim_food,
+    update_provider_contact, update_receiver_contact, update_food_quantity, update_claim_status,
+    delete_provider, delete_receiver, delete_food_listing, delete_claim,
+    insert_providers_many, insert_receivers_many, insert_food_listings_many, insert_claims_many,
+    update_provider_contacts_many, update_receiver_contacts_many, update_food_quantities_many, update_claim_status_many,
+    delete_providers_many, delete_receivers_many, delete_food_listings_many, delete_claims_many,
+)
+from ingest import RejectedRow, clean_row
+from views.resources import db_writer
+
+
+# Bulk CSV upload: record type -> (batch function from crud.py, CSV columns)
+BULK_OPERATIONS = {
+    'add': {
+        "Providers": (insert_providers_many, ['Provider_ID', 'Name', 'Type', 'Address', 'City', 'Contact']),
+        "Receivers": (insert_receivers_many, ['Receiver_ID', 'Name', 'Type', 'City', 'Contact']),
+        "Food Listings": (insert_food_listings_many, ['Food_ID', 'Food_Name', 'Quantity', 'Expiry_Date', 'Provider_ID',
+                                                      'Provider_Type', 'Location', 'Food_Type', 'Meal_Type']),
+        "Claims": (insert_claims_many, ['Claim_ID', 'Food_ID', 'Receiver_ID', 'Status', 'Timestamp']),
+    },
+    'update': {
+        "Provider Contacts": (update_provider_contacts_many, ['Provider_ID', 'Contact']),
+        "Receiver Contacts": (update_receiver_contacts_many, ['Receiver_ID', 'Contact']),
+        "Food Quantities": (update_food_quantities_many, ['Food_ID', 'Quantity']),
+        "Claim Statuses": (update_claim_status_many, ['Claim_ID', 'Status']),
+    },
+    'delete': {
+        "Providers": (delete_providers_many, ['Provider_ID']),
+        "Receivers": (delete_receivers_many, ['Receiver_ID']),
+        "Food Listings": (delete_food_listings_many, ['Food_ID']),
+        "Claims": (delete_claims_many, ['Claim_ID']),
+    },
+}
+
+def bulk_csv_upload(mode):
+    operations = BULK_OPERATIONS[mode]
+    record_type = st.selectbox("Record Type", list(operations), key=f"bulk_{mode}_type")
+    batch_function, columns = operations[record_type]
+    st.caption(f"Expected CSV columns: {', '.join(columns)}")
+    uploaded = st.file_uploader("CSV file", type=['csv'], key=f"bulk_{mode}_file")
+    confirm = st.checkbox("I confirm I want to delete these records", key=f"bulk_{mode}_confirm") if mode == 'delete' else True
+    
+    if uploaded is not None and st.button(f"Apply {record_type} CSV", key=f"bulk_{mode}_apply"):
+        if not confirm:
+            st.error("Please confirm deletion by checking the checkbox")
+            return
+        try:
+            reader = csv.DictReader(io.TextIOWrapper(uploaded, encoding='utf-8'))
+            missing = [c for c in columns if c not in (reader.fieldnames or [])]
+            if missing:
+                st.error(f"Error: CSV is missing columns: {', '.join(missing)}")
+                return
+            
+            # Rows that fail cleaning are reported alongside the database outcomes
+            rows, rejected = [], []
+            for line, record in enumerate(reader, start=2):
+                try:
+                    rows.append(clean_row(record, columns))
+                except RejectedRow as e:
+                    rejected.append({'id': record.get(columns[0]), 'ok': False, 'message': f"line {line}: {e}"})
+            
+            if mode == 'delete':
+                outcomes = batch_function(db_writer, [row[0] for row in rows])
+            else:
+                outcomes = batch_function(db_writer, rows)
+            outcomes += rejected
+            
+            applied = sum(outcome['ok'] for outcome in outcomes)
+            st.success(f"✅ {applied} of {len(outcomes)} rows applied in one transaction")
+            failed = [outcome for outcome in outcomes if not outcome['ok']]
+            if failed:
+                st.warning(f"⚠️ {len(failed)} rows were not applied")
+                st.dataframe(pd.DataFrame(failed), use_container_width=True)
+        except Exception as e:
+            st.error(f"Error: {e}")
+
+
+def render_add():
+    st.header("➕ Add New Records")
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Add Provider", "Add Receiver", "Add Food Listing", "Add Claim", "📤 CSV Upload"])
+
+    with tab1:
+        st.subheader("Add New Provider")
+        with st.form("add_provider"):
+            provider_id = st.number_input("Provider ID", min_value=1, step=1)
+            name = st.text_input("Provider Name")
+            type_ = st.selectbox("Provider Type", ["Restaurant", "Grocery Store", "Supermarket", "Cafeteria"])
+            address = st.text_input("Address")
+            city = st.text_input("City")
+            contact = st.text_input("Contact")
+
+            if st.form_submit_button("Add Provider"):
+                try:
+                    msg = insert_provider(db_writer, provider_id, name, type_, address, city, contact)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab2:
+        st.subheader("Add New Receiver")
+        with st.form("add_receiver"):
+            receiver_id = st.number_input("Receiver ID", min_value=1, step=1)
+            name = st.text_input("Receiver Name")
+            type_ = st.selectbox("Receiver Type", ["NGO", "Community Center", "Individual"])
+            city = st.text_input("City")
+            contact = st.text_input("Contact")
+
+            if st.form_submit_button("Add Receiver"):
+                try:
+                    msg = insert_receiver(db_writer, receiver_id, name, type_, city, contact)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab3:
+        st.subheader("Add New Food Listing")
+        with st.form("add_food"):
+            food_id = st.number_input("Food ID", min_value=1, step=1)
+            food_name = st.text_input("Food Name")
+            quantity = st.number_input("Quantity", min_value=1, step=1)
+            expiry_date = st.date_input("Expiry Date")
+            provider_id = st.number_input("Provider ID", min_value=1, step=1)
+            provider_type = st.selectbox("Provider Type", ["Restaurant", "Grocery Store", "Supermarket", "Cafeteria"])
+            location = st.text_input("Location (City)")
+            food_type = st.selectbox("Food Type", ["Vegetarian", "Non-Vegetarian", "Vegan"])
+            meal_type = st.selectbox("Meal Type", ["Breakfast", "Lunch", "Dinner", "Snacks"])
+
+            if st.form_submit_button("Add Food Listing"):
+                try:
+                    msg = insert_food_listing(db_writer, food_id, food_name, quantity, expiry_date.strftime("%Y-%m-%d"), 
+                                            provider_id, provider_type, location, food_type, meal_type)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab4:
+        st.subheader("Add New Claim")
+        st.caption("New claims start as Pending and reserve their quantity from the listing; "
+                   "cancelling a pending claim gives it back.")
+        with st.form("add_claim"):
+            claim_id = st.number_input("Claim ID", min_value=1, step=1)
+            food_id = st.number_input("Food ID", min_value=1, step=1)
+            receiver_id = st.number_input("Receiver ID", min_value=1, step=1)
+            claimed_quantity = st.number_input("Quantity", min_value=1, step=1)
+            claim_date = st.date_input("Claim Date", datetime.today())
+            claim_time = st.time_input("Claim Time", datetime.now().time())
+
+            if st.form_submit_button("Add Claim"):
+                try:
+                    timestamp = datetime.combine(claim_date, claim_time)
+                    msg = claim_food(db_writer, food_id, receiver_id, claimed_quantity, claim_id,
+                                     timestamp.strftime("%Y-%m-%d %H:%M:%S"))
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab5:
+        st.subheader("Add Records from CSV")
+        bulk_csv_upload('add')
+
+
+def render_update():
+    st.header("✏️ Update Records")
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Update Provider", "Update Receiver", "Update Food Quantity", "Update Claim Status", "📤 CSV Upload"])
+
+    with tab1:
+        st.subheader("Update Provider Contact")
+        with st.form("update_provider"):
+            provider_id = st.number_input("Provider ID", min_value=1, step=1)
+            new_contact = st.text_input("New Contact")
+
+            if st.form_submit_button("Update Provider Contact"):
+                try:
+                    msg = update_provider_contact(db_writer, provider_id, new_contact)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab2:
+        st.subheader("Update Receiver Contact")
+        with st.form("update_receiver"):
+            receiver_id = st.number_input("Receiver ID", min_value=1, step=1)
+            new_contact = st.text_input("New Contact")
+
+            if st.form_submit_button("Update Receiver Contact"):
+                try:
+                    msg = update_receiver_contact(db_writer, receiver_id, new_contact)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab3:
+        st.subheader("Update Food Quantity")
+        with st.form("update_quantity"):
+            food_id = st.number_input("Food ID", min_value=1, step=1)
+            new_quantity = st.number_input("New Quantity", min_value=0, step=1)
+
+            if st.form_submit_button("Update Quantity"):
+                try:
+                    msg = update_food_quantity(db_writer, food_id, new_quantity)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab4:
+        st.subheader("Update Claim Status")
+        st.caption("Cancelling a claim gives its units back to the listing; reopening a cancelled "
+                   "claim takes them again, if the listing still has them.")
+        with st.form("update_status"):
+            claim_id = st.number_input("Claim ID", min_value=1, step=1)
+            new_status = st.selectbox("New Status", CLAIM_STATUSES)
+
+            if st.form_submit_button("Update Status"):
+                try:
+                    msg = update_claim_status(db_writer, claim_id, new_status)
+                    st.success(msg)
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    with tab5:
+        st.subheader("Update Records from CSV")
+        bulk_csv_upload('update')
+
+
+def render_delete():
+    st.header("🗑️ Delete Records")
+    st.warning("⚠️ **Warning:** Deletion is permanent and cannot be undone!")
+
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Delete Provider", "Delete Receiver", "Delete Food Listing", "Delete Claim", "📤 CSV Upload"])
+
+    with tab1:
+        st.subheader("Delete Provider")
+        with st.form("delete_provider"):
+            provider_id = st.number_input("Provider ID to Delete", min_value=1, step=1)
+            confirm = st.checkbox("I confirm I want to delete this provider")
+
+            if st.form_submit_button("Delete Provider"):
+                if confirm:
+                    try:
+                        msg = delete_provider(db_writer, provider_id)
+                        st.success(msg)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+                else:
+                    st.error("Please confirm deletion by checking the checkbox")
+
+    with tab2:
+        st.subheader("Delete Receiver")
+        with st.form("delete_receiver"):
+            receiver_id = st.number_input("Receiver ID to Delete", min_value=1, step=1)
+            confirm = st.checkbox("I confirm I want to delete this receiver")
+
+            if st.form_submit_button("Delete Receiver"):
+                if confirm:
+                    try:
+                        msg = delete_receiver(db_writer, receiver_id)
+                        st.success(msg)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+                else:
+                    st.error("Please confirm deletion by checking the checkbox")
+
+    with tab3:
+        st.subheader("Delete Food Listing")
+        with st.form("delete_food"):
+            food_id = st.number_input("Food ID to Delete", min_value=1, step=1)
+            confirm = st.checkbox("I confirm I want to delete this record")
+
+            if st.form_submit_button("Delete Food Listing"):
+                if confirm:
+                    try:
+                        msg = delete_food_listing(db_writer, food_id)
+                        st.success(msg)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+                else:
+                    st.error("Please confirm deletion by checking the checkbox")
+
+    with tab4:
+        st.subheader("Delete Claim")
+        with st.form("delete_claim"):
+            claim_id = st.number_input("Claim ID to Delete", min_value=1, step=1)
+            confirm = st.checkbox("I confirm I want to delete this record")
+
+            if st.form_submit_button("Delete Claim"):
+                if confirm:
+                    try:
+                        msg = delete_claim(db_writer, claim_id)
+                        st.success(msg)
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+                else:
+                    st.error("Please confirm deletion by checking the checkbox")
+
+    with tab5:
+        st.subheader("Delete Records from CSV")
+        bulk_csv_upload('delete')
@@ -0,0 +1,81 @@
+"""Database resources shared by every page, session and rerun.
+
+The reader pool, writer, query cache and figure cache are created on first
+import. The parallel query executor, the match index and the columnar
+snapshot are built only when a page that uses them is first opened.
+"""
+import logging
+
+import streamlit as st
+
+from columnar import COLUMNAR_QUERIES, ColumnarSnapshot
+from crud import add_write_listener
+from database import DB_PATH, ConnectionPool, DatabaseWriter, connect
+from figure_cache import FigureCache
+from matching import MatchIndex
+from migrations import migrate
+from query_cache import QueryCache, stored_data_version
+from query_executor import ParallelQueryExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+# Database connections: a pool of readers and one writer thread, shared by all sessions
+@st.cache_resource
+def init_connection():
+    # Bring the schema up to date (primary keys, indexes) before first use
+    conn = connect(DB_PATH)
+    migrate(conn)
+    conn.close()
+    return ConnectionPool(DB_PATH, max_size=8), DatabaseWriter(DB_PATH)
+
+reader_pool, db_writer = init_connection()
+
+# Shared across sessions; keyed on the stored data version, so writes made
+# by other processes (the JSON API, ingest) invalidate entries too
+def current_data_version():
+    with reader_pool.connection() as conn:
+        return stored_data_version(conn)
+
+@st.cache_resource
+def init_query_cache():
+    return QueryCache(max_entries=128, max_bytes=64 * 1024 * 1024, version_source=current_data_version)
+
+query_cache = init_query_cache()
+
+# Thread pool of read-only connections for running independent queries at once
+@st.cache_resource
+def get_query_executor():
+    return ParallelQueryExecutor(DB_PATH, max_workers=4)
+
+# Listing/receiver match index, kept current by the CRUD write listeners
+@st.cache_resource
+def get_match_index():
+    with reader_pool.connection() as conn:
+        index = MatchIndex.load(conn)
+    add_write_listener(index.apply_write)
+    return index
+
+# Serialized chart figures, keyed on the same data version as the query cache
+@st.cache_resource
+def init_figure_cache():
+    return FigureCache(max_entries=256, max_bytes=32 * 1024 * 1024, version_source=current_data_version)
+
+figure_cache = init_figure_cache()
+
+# Columnar copy of listings and claims answering the group-by queries
+# (columnar.py); its files sit next to the database and other processes can map them
+@st.cache_resource
+def get_columnar_snapshot():
+    return ColumnarSnapshot(DB_PATH + '.columnar')
+
+def read_query(query, conn):
+    """Cached result of one of the 15 queries, from the columnar snapshot when it answers it"""
+    if query in COLUMNAR_QUERIES:
+        try:
+            return query_cache.read_sql(query, conn, load=get_columnar_snapshot().read_sql)
+        except OSError as e:
+            # No writable directory for the snapshot: the SQL gives the same result
+            logger.warning("Columnar snapshot unavailable, using SQL: %s", e)
+    return query_cache.read_sql(query, conn)
@@ -0,0 +1,53 @@
+import inspect
+import time
+
+import streamlit as st
+
+from search import search
+from views.resources import reader_pool
+
+
+# Newer Streamlit commits a search box while the user types; older versions
+# search on Enter
+LIVE_INPUT = {'type': 'search', 'live': True} if 'live' in inspect.signature(st.text_input).parameters else {}
+
+SECTIONS = [
+    ('food_listings', "🍎 Food Listings"),
+    ('providers', "👥 Providers"),
+    ('receivers', "🤝 Receivers"),
+]
+
+
+def render():
+    st.header("🔎 Search")
+    st.markdown("Search food names, provider names, addresses and cities, and receiver names and cities. "
+                "Words match as prefixes, so partial words work, and the best matches come first.")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        text = st.text_input("Search", key="search_text", placeholder="e.g. rice, fresh veg, Kellytown", **LIVE_INPUT)
+    with col2:
+        limit = st.number_input("Results per section", min_value=5, max_value=200, value=20, step=5, key="search_limit")
+    if not text:
+        return
+
+    start = time.perf_counter()
+    try:
+        with reader_pool.connection() as conn:
+            results = search(conn, text, limit=int(limit))
+    except Exception as e:
+        st.error(f"❌ Search failed: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not results:
+        st.warning("⚠️ Type a word of at least two letters or digits to search")
+        return
+
+    for table, title in SECTIONS:
+        df = results[table]
+        st.subheader(f"{title} ({len(df)})")
+        if df.empty:
+            st.info("No matches")
+        else:
+            st.dataframe(df, use_container_width=True)
+    st.caption(f"⏱️ Search took {elapsed_ms:.1f} ms")
@@ -0,0 +1,47 @@
+import streamlit as st
+
+from instrumentation import read_sql
+from views.live import live_refresh, live_rows
+from views.resources import reader_pool
+
+
+def render_providers():
+    st.header("👥 Food Providers")
+    try:
+        with reader_pool.connection() as conn:
+            df_providers = read_sql("SELECT * FROM providers", conn)
+        st.dataframe(df_providers, use_container_width=True)
+    except Exception as e:
+        st.error(f"❌ Could not load providers: {e}")
+
+
+def render_receivers():
+    st.header("🤝 Food Receivers")
+    try:
+        with reader_pool.connection() as conn:
+            df_receivers = read_sql("SELECT * FROM receivers", conn)
+        st.dataframe(df_receivers, use_container_width=True)
+    except Exception as e:
+        st.error(f"❌ Could not load receivers: {e}")
+
+
+CLAIMS_QUERY = """
+    SELECT c.Claim_ID, c.Food_ID, fl.Food_Name, c.Receiver_ID, 
+           r.Name as Receiver_Name, c.Status, c.Timestamp
+    FROM claims c
+    JOIN food_listings fl ON c.Food_ID = fl.Food_ID
+    JOIN receivers r ON c.Receiver_ID = r.Receiver_ID
+"""
+# Read once per session, then kept current from the change feed; a listing
+# or receiver change re-reads the claims showing its name
+LIVE_CLAIMS = ('claims', CLAIMS_QUERY, (), 'Claim_ID', 'claims', {'food_listings': 'Food_ID', 'receivers': 'Receiver_ID'})
+
+
+def render_claims():
+    st.header("📋 Food Claims")
+    try:
+        df_claims = live_rows(*LIVE_CLAIMS)
+        st.dataframe(df_claims, use_container_width=True)
+        live_refresh(*LIVE_CLAIMS)
+    except Exception as e:
+        st.error(f"❌ Could not load claims: {e}")